@@ -1,7 +1,23 @@
-from flask import Flask
+import os
+from flask import Flask, Request, current_app
 from flask_cors import CORS
 from flaskext.mysql import MySQL
 from config import FlaskConfig
+from ingest import IngestJobStore
+from pool import ConnectionPool
+from prediction_cache import create_prediction_cache
+from storage import SpooledUpload, create_media_store
+from uploads import UploadSessionStore
+from verification import VerificationClaims, VerificationWakeup
+
+# UploadRequest Class
+# A request class whose multipart parser writes each uploaded file straight
+# into a SpooledUpload, so files are hashed and sized as they arrive instead
+# of being buffered in memory.
+class UploadRequest(Request):
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return SpooledUpload(current_app.config["MEDIA_SPOOL_DIR"])
 
 class FlaskApp:
 
@@ -13,7 +29,40 @@ class FlaskApp:
         CORS(self.app)
 
         self.mysql = MySQL()
-        self.mysql.init_app(app=self.app)        
+        self.mysql.init_app(app=self.app)
+
+        self.pool = ConnectionPool(
+            self.mysql.connect,
+            size=self.app.config["MYSQL_POOL_SIZE"],
+            max_overflow=self.app.config["MYSQL_POOL_MAX_OVERFLOW"],
+            timeout=self.app.config["MYSQL_POOL_TIMEOUT"],
+            recycle=self.app.config["MYSQL_POOL_RECYCLE"],
+            pre_ping=self.app.config["MYSQL_POOL_PRE_PING"]
+        )
+
+        self.media_store = create_media_store(self.app.config)
+        if not self.app.config.get("MEDIA_SPOOL_DIR"):
+            self.app.config["MEDIA_SPOOL_DIR"] = self.media_store.spool_dir
+        self.app.request_class = UploadRequest
+
+        self.upload_sessions = UploadSessionStore(
+            self.app.config.get("MEDIA_UPLOAD_SESSION_DIR") or os.path.join(self.app.config["MEDIA_SPOOL_DIR"], "sessions"),
+            ttl=self.app.config["MEDIA_UPLOAD_SESSION_TTL"],
+            max_chunk_size=self.app.config["MEDIA_UPLOAD_CHUNK_SIZE"]
+        )
+        self.ingest_jobs = IngestJobStore(
+            self.app.config.get("REPORT_INGEST_DIR") or os.path.join(self.app.config["MEDIA_SPOOL_DIR"], "ingest"),
+            ttl=self.app.config["REPORT_INGEST_JOB_TTL"]
+        )
+
+        self.verification_claims = VerificationClaims(
+            self.pool,
+            lease_seconds=self.app.config["VERIFICATION_LEASE_SECONDS"],
+            requeue_interval=self.app.config["VERIFICATION_REQUEUE_INTERVAL"],
+            max_attempts=self.app.config["VERIFICATION_MAX_ATTEMPTS"]
+        )
+        self.verification_wakeup = VerificationWakeup()
+        self.prediction_cache = create_prediction_cache(self.app)
 
     def run(self, *args, **kwargs):
         self.app.run(*args, **kwargs)
@@ -22,3 +71,10 @@ class FlaskApp:
 app_instance = FlaskApp()
 app = app_instance.app
 mysql = app_instance.mysql
+pool = app_instance.pool
+media_store = app_instance.media_store
+upload_sessions = app_instance.upload_sessions
+ingest_jobs = app_instance.ingest_jobs
+verification_claims = app_instance.verification_claims
+verification_wakeup = app_instance.verification_wakeup
+prediction_cache = app_instance.prediction_cache
@@ -14,6 +14,147 @@ class FlaskConfig:
     MYSQL_DATABASE_HOST = "localhost"
     MYSQL_DATABASE_DB = "apollo_system"
 
+    # Connection pool shared by the request handlers and the verification thread.
+    # Up to MYSQL_POOL_SIZE connections stay open; bursts may open up to
+    # MYSQL_POOL_MAX_OVERFLOW more, after which callers wait MYSQL_POOL_TIMEOUT seconds.
+    MYSQL_POOL_SIZE = 10
+    MYSQL_POOL_MAX_OVERFLOW = 5
+    MYSQL_POOL_TIMEOUT = 30
+    MYSQL_POOL_RECYCLE = 3600
+    MYSQL_POOL_PRE_PING = True
 
+    # Media bytes live outside MySQL; media_storage only keeps metadata and the
+    # storage key. "local" writes under MEDIA_STORAGE_ROOT, "s3" targets any
+    # S3-compatible service (set MEDIA_S3_ENDPOINT_URL for MinIO).
+    MEDIA_STORAGE_BACKEND = os.environ.get("MEDIA_STORAGE_BACKEND", "local")
+    MEDIA_STORAGE_ROOT = os.environ.get("MEDIA_STORAGE_ROOT", "storage/media")
+    MEDIA_S3_ENDPOINT_URL = os.environ.get("MEDIA_S3_ENDPOINT_URL")
+    MEDIA_S3_BUCKET = os.environ.get("MEDIA_S3_BUCKET", "apollo-media")
+    MEDIA_S3_ACCESS_KEY = os.environ.get("MEDIA_S3_ACCESS_KEY")
+    MEDIA_S3_SECRET_KEY = os.environ.get("MEDIA_S3_SECRET_KEY")
+    MEDIA_S3_REGION = os.environ.get("MEDIA_S3_REGION")
+    MEDIA_S3_PREFIX = "media"
 
-    
+    # Media downloads are streamed in chunks of this many bytes; clients may
+    # cache them for MEDIA_CACHE_MAX_AGE seconds and revalidate by ETag.
+    MEDIA_STREAM_CHUNK_SIZE = 256 * 1024
+    MEDIA_CACHE_MAX_AGE = 86400
+
+    # Uploads larger than MAX_CONTENT_LENGTH are rejected with 413 before the
+    # body is read. Accepted files are spooled to MEDIA_SPOOL_DIR (defaults to
+    # the media store's own temp directory) instead of being held in memory.
+    MAX_CONTENT_LENGTH = 256 * 1024 * 1024
+    MEDIA_SPOOL_DIR = None
+
+    # Resumable video uploads. Chunks may be at most MEDIA_UPLOAD_CHUNK_SIZE
+    # bytes; sessions idle for MEDIA_UPLOAD_SESSION_TTL seconds are removed by
+    # a cleanup thread that runs every MEDIA_UPLOAD_GC_INTERVAL seconds.
+    MEDIA_UPLOAD_SESSION_DIR = None
+    MEDIA_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+    MEDIA_UPLOAD_SESSION_TTL = 24 * 60 * 60
+    MEDIA_UPLOAD_GC_INTERVAL = 10 * 60
+
+    # Report ingestion. "sync" stores the media and report inside the upload
+    # request; "queue" persists the upload, answers 202 with a job ID and lets
+    # REPORT_INGEST_WORKERS workers do the inserts. At most
+    # REPORT_INGEST_MAX_PENDING jobs may wait before uploads get a 503.
+    # REPORT_INGEST_BACKEND picks in-process threads ("local") or "celery".
+    # Accepted uploads are kept in REPORT_INGEST_DIR with their job until the
+    # report is inserted; the local backend enqueues them again on startup, so
+    # that directory must belong to a single API process. A failed job is
+    # retried up to REPORT_INGEST_MAX_ATTEMPTS times, REPORT_INGEST_RETRY_BACKOFF
+    # seconds after the first failure and twice as long after each next one.
+    # Jobs untouched for REPORT_INGEST_JOB_TTL seconds are removed by the
+    # cleanup thread.
+    REPORT_INGEST_MODE = os.environ.get("REPORT_INGEST_MODE", "sync")
+    REPORT_INGEST_BACKEND = os.environ.get("REPORT_INGEST_BACKEND", "local")
+    REPORT_INGEST_WORKERS = 2
+    REPORT_INGEST_MAX_PENDING = 32
+    REPORT_INGEST_DIR = None
+    REPORT_INGEST_MAX_ATTEMPTS = 5
+    REPORT_INGEST_RETRY_BACKOFF = 5
+    REPORT_INGEST_JOB_TTL = 7 * 24 * 60 * 60
+    # Largest number of reports /reports/upload/bulk accepts in one request;
+    # the whole batch is committed as a single transaction.
+    REPORT_BULK_MAX_ITEMS = 100
+
+    # Automated verification runs the model on batches of up to
+    # VERIFICATION_BATCH_SIZE reports. Once the first report of a batch is
+    # decoded, the worker waits at most VERIFICATION_BATCH_MAX_WAIT seconds for
+    # more to arrive before running the batch.
+    VERIFICATION_BATCH_SIZE = 8
+    VERIFICATION_BATCH_MAX_WAIT = 2.0
+
+    # Each process runs VERIFICATION_WORKERS verification threads. Workers
+    # claim reports for VERIFICATION_LEASE_SECONDS; claims not finished by then
+    # are requeued by whichever worker next sweeps for expired leases, at most
+    # every VERIFICATION_REQUEUE_INTERVAL seconds. A report claimed
+    # VERIFICATION_MAX_ATTEMPTS times without a verdict is marked failed.
+    VERIFICATION_WORKERS = 1
+    VERIFICATION_LEASE_SECONDS = 120
+    VERIFICATION_REQUEUE_INTERVAL = 30
+    VERIFICATION_MAX_ATTEMPTS = 3
+
+    # VERIFICATION_ENGINE "pipeline" splits verification into stages joined by
+    # bounded queues: one thread claims reports and fetches their media,
+    # VERIFICATION_DECODE_WORKERS threads decode it (OpenCV releases the GIL),
+    # one thread runs batched inference and one records the results. A full
+    # queue holds back the stage before it, so claims never run far ahead of
+    # the model. "serial" runs VERIFICATION_WORKERS threads that each do all
+    # of the steps in turn.
+    VERIFICATION_ENGINE = os.environ.get("VERIFICATION_ENGINE", "pipeline")
+    VERIFICATION_DECODE_WORKERS = 4
+    VERIFICATION_DECODE_QUEUE_SIZE = 16
+
+    # Uploads wake verification workers in the same process immediately. When
+    # idle, workers re-check the queue after VERIFICATION_IDLE_BACKOFF_MIN
+    # seconds, doubling up to VERIFICATION_IDLE_BACKOFF_MAX; this is also how
+    # they pick up reports uploaded through other processes.
+    VERIFICATION_IDLE_BACKOFF_MIN = 0.5
+    VERIFICATION_IDLE_BACKOFF_MAX = 5.0
+
+    # Model used by the verification workers, picked from the builds in
+    # HERMES_MODEL_DIR. HERMES_MODEL_VERSION (a file name there) wins; otherwise
+    # the version last activated through /models/load is used, falling back to
+    # HERMES_DEFAULT_MODEL_VERSION. A .tflite export (see model/src/export.py)
+    # runs on the TFLite interpreter instead of Keras; HERMES_MODEL_BACKEND
+    # overrides the choice made from the file extension.
+    HERMES_MODEL_DIR = os.environ.get("HERMES_MODEL_DIR", "model/models/deployed")
+    HERMES_MODEL_VERSION = os.environ.get("HERMES_MODEL_VERSION") or None
+    HERMES_DEFAULT_MODEL_VERSION = "HermesSavedBuild_20250530-155556.keras"
+    HERMES_MODEL_BACKEND = os.environ.get("HERMES_MODEL_BACKEND") or None
+    # CPU thread pools for inference; None keeps TensorFlow's defaults. The
+    # intra-op count also sizes the TFLite interpreter.
+    HERMES_INTRA_OP_THREADS = int(os.environ["HERMES_INTRA_OP_THREADS"]) if os.environ.get("HERMES_INTRA_OP_THREADS") else None
+    HERMES_INTER_OP_THREADS = int(os.environ["HERMES_INTER_OP_THREADS"]) if os.environ.get("HERMES_INTER_OP_THREADS") else None
+
+    # Prediction cache keyed by media checksum, model version and detection
+    # threshold, so identical clips are only run through the model once. The
+    # in-memory tier keeps PREDICTION_CACHE_MAX_ENTRIES results per process;
+    # setting PREDICTION_CACHE_SQLITE_PATH adds a persistent tier of up to
+    # PREDICTION_CACHE_SQLITE_MAX_ENTRIES results shared by processes on the host.
+    PREDICTION_CACHE_ENABLED = os.environ.get("PREDICTION_CACHE_ENABLED", "1") != "0"
+    PREDICTION_CACHE_MAX_ENTRIES = 1024
+    PREDICTION_CACHE_SQLITE_PATH = os.environ.get("PREDICTION_CACHE_SQLITE_PATH") or None
+    PREDICTION_CACHE_SQLITE_MAX_ENTRIES = 100000
+
+    CELERY = dict(
+        broker_url=os.environ.get("CELERY_BROKER_URL", "redis://localhost:6379/0"),
+        result_backend=os.environ.get("CELERY_RESULT_BACKEND", "redis://localhost:6379/0"),
+        task_ignore_result=False,
+    )
+
+# celery_init_app Function
+# Creates a Celery app whose tasks run inside the Flask application context,
+# so task code can use the same handlers as the routes.
+def celery_init_app(app: Flask) -> Celery:
+    class FlaskTask(Task):
+        def __call__(self, *args, **kwargs):
+            with app.app_context():
+                return self.run(*args, **kwargs)
+
+    celery_app = Celery(app.name, task_cls=FlaskTask)
+    celery_app.config_from_object(app.config["CELERY"])
+    celery_app.set_default()
+    app.extensions["celery"] = celery_app
+    return celery_app
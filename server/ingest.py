@@ -0,0 +1,295 @@
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+# IngestQueueFull Class
+# Raised when the ingest queue is at capacity. Routes answer with 503 and a
+# Retry-After header so clients back off instead of piling on more uploads.
+class IngestQueueFull(Exception):
+    pass
+
+# IngestJobStore Class
+# Keeps accepted report uploads on disk until they are ingested. Each job is a
+# pair of files in `root`: `<job_id>.upload`, the media, and `<job_id>.json`,
+# the job's payload. Both are written before the upload is answered and kept
+# until the report is inserted, so jobs accepted before a restart can be
+# enqueued again from pending(). Jobs untouched for longer than `ttl` seconds
+# are removed by collect_garbage().
+class IngestJobStore:
+
+    def __init__(self, root, ttl=7 * 86400):
+        self.root = os.path.abspath(root)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _meta_path(self, job_id):
+        return os.path.join(self.root, f"{job_id}.json")
+
+    def upload_path(self, job_id):
+        return os.path.join(self.root, f"{job_id}.upload")
+
+    def _write_meta(self, job):
+        tmp_path = self._meta_path(job["job_id"]) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(job, f)
+        os.replace(tmp_path, self._meta_path(job["job_id"]))
+
+    def create(self, job_id, payload):
+        """DESC: Records a job whose upload is already at upload_path(job_id). Returns the job dict."""
+        now = time.time()
+        job = dict(payload, job_id=job_id, created_at=now, updated_at=now)
+        self._write_meta(job)
+        return job
+
+    def get(self, job_id):
+        """DESC: Loads a job by ID, or returns None once it has been discarded."""
+        try:
+            with open(self._meta_path(job_id)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def update(self, job_id, **fields):
+        """DESC: Merges `fields` into a job's record. Returns the updated job, or None if it no longer exists."""
+        with self._lock:
+            job = self.get(job_id)
+            if job is None:
+                return None
+            job.update(fields, updated_at=time.time())
+            self._write_meta(job)
+        return job
+
+    def discard(self, job_id):
+        for path in (self._meta_path(job_id), self.upload_path(job_id)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def pending(self):
+        """DESC: Returns every job still on disk, oldest first."""
+        jobs = []
+        for name in os.listdir(self.root):
+            if name.endswith(".json"):
+                try:
+                    job = self.get(name[:-len(".json")])
+                except ValueError:
+                    continue
+                if job:
+                    jobs.append(job)
+        return sorted(jobs, key=lambda job: job["created_at"])
+
+    def collect_garbage(self):
+        """DESC: Removes jobs not updated within the TTL, and uploads whose record is missing. Returns the number of jobs removed."""
+        cutoff = time.time() - self.ttl
+        removed = 0
+        for job in self.pending():
+            if job["updated_at"] < cutoff:
+                print(f"[INGEST] Discarding job {job['job_id']}, untouched since {time.ctime(job['updated_at'])}")
+                self.discard(job["job_id"])
+                removed += 1
+
+        # Uploads whose record was never written, e.g. after a crash between the two.
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.endswith(".upload") and not os.path.exists(self._meta_path(name[:-len(".upload")])):
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+        return removed
+
+# LocalIngestQueue Class
+# An in-process job queue drained by a fixed pool of worker threads. The queue
+# is bounded by `max_pending`, which is what gives upload routes backpressure,
+# and `workers` bounds how many jobs touch the media store and database at
+# once. A failed job is retried up to `max_attempts` times, waiting
+# `retry_backoff` seconds before the first retry and twice as long before each
+# next one. Job states are kept in memory for the last `retain` jobs.
+class LocalIngestQueue:
+
+    def __init__(self, handler, workers=2, max_pending=32, retain=1000, max_attempts=1, retry_backoff=5):
+        self._handler = handler
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self._retain = retain
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads = []
+
+        self._completed = 0
+        self._failed = 0
+        self._retried = 0
+        self._rejected = 0
+
+    def start(self):
+        """DESC: Starts the worker threads. Safe to call more than once."""
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, daemon=True, name=f"IngestWorker-{i + 1}")
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, payload, job_id=None, block=False):
+        """DESC: Enqueues a job, under `job_id` if given. Returns its job ID, or raises IngestQueueFull
+        unless `block` is set, in which case it waits for room."""
+        job_id = job_id or uuid.uuid4().hex
+        with self._lock:
+            self._jobs[job_id] = {"job_id": job_id, "status": "queued", "attempts": 0, "submitted_at": time.time()}
+            while len(self._jobs) > self._retain:
+                self._jobs.popitem(last=False)
+        try:
+            self._queue.put((job_id, payload, 1), block=block)
+        except queue.Full:
+            with self._lock:
+                self._jobs.pop(job_id, None)
+                self._rejected += 1
+            raise IngestQueueFull(f"Ingest queue is full ({self.max_pending} jobs pending)")
+        return job_id
+
+    def status(self, job_id):
+        """DESC: Returns a copy of the job's state, or None if the job is unknown or has aged out."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": "local",
+                "workers": self.workers,
+                "pending": self._queue.qsize(),
+                "max_pending": self.max_pending,
+                "completed": self._completed,
+                "failed": self._failed,
+                "retried": self._retried,
+                "rejected": self._rejected,
+            }
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def _retry(self, job_id, payload, attempt):
+        # Waits on a timer thread, so a worker is not held up by the backoff; the put may block while the queue is full.
+        delay = self.retry_backoff * 2 ** (attempt - 2)
+        timer = threading.Timer(delay, self._queue.put, args=((job_id, payload, attempt),))
+        timer.daemon = True
+        timer.start()
+        return delay
+
+    def _work(self):
+        while True:
+            job_id, payload, attempt = self._queue.get()
+            self._update(job_id, status="processing", attempts=attempt, started_at=time.time())
+            try:
+                result = self._handler(payload)
+                self._update(job_id, status="done", result=result, finished_at=time.time())
+                with self._lock:
+                    self._jobs.get(job_id, {}).pop("error", None)
+                    self._completed += 1
+            except Exception as e:
+                if attempt < self.max_attempts:
+                    delay = self._retry(job_id, payload, attempt + 1)
+                    print(f"[INGEST] Job {job_id} failed (attempt {attempt}/{self.max_attempts}), retrying in {delay}s: {str(e)}")
+                    self._update(job_id, status="queued", error=str(e))
+                    with self._lock:
+                        self._retried += 1
+                else:
+                    print(f"[INGEST] Job {job_id} failed after {attempt} attempt(s): {str(e)}")
+                    self._update(job_id, status="failed", error=str(e), finished_at=time.time())
+                    with self._lock:
+                        self._failed += 1
+            finally:
+                self._queue.task_done()
+
+# CeleryIngestQueue Class
+# Hands jobs to Celery workers instead of local threads. Job state comes from
+# the Celery result backend. Backpressure is left to the broker, so submit()
+# never raises IngestQueueFull, and failed jobs are retried by Celery with the
+# same attempts and backoff as LocalIngestQueue. Workers must share the ingest
+# directory with the API process. Celery reports any task ID it has no result
+# for as PENDING, so submit() stores a SENT state for every job first; a job ID
+# still PENDING was never submitted, or its result has expired.
+class CeleryIngestQueue:
+
+    STATES = {
+        "SENT": "queued",
+        "RECEIVED": "queued",
+        "STARTED": "processing",
+        "RETRY": "processing",
+        "SUCCESS": "done",
+        "FAILURE": "failed",
+    }
+
+    def __init__(self, celery_app, handler, max_attempts=1, retry_backoff=5):
+        self._celery = celery_app
+        self._task = celery_app.task(
+            name="apollo.ingest_report",
+            track_started=True,
+            autoretry_for=(Exception,),
+            max_retries=max_attempts - 1,
+            retry_backoff=retry_backoff,
+            retry_jitter=False
+        )(handler)
+
+    def start(self):
+        pass
+
+    def submit(self, payload, job_id=None, block=False):
+        job_id = job_id or uuid.uuid4().hex
+        # Stored before publishing, so a worker's STARTED cannot be overwritten by it.
+        self._celery.backend.store_result(job_id, None, "SENT")
+        try:
+            self._task.apply_async(args=(payload,), task_id=job_id)
+        except Exception as e:
+            self._celery.backend.mark_as_failure(job_id, e)
+            raise
+        return job_id
+
+    def status(self, job_id):
+        """DESC: Returns the job's state, or None if the job is unknown or its result has expired."""
+        result = self._celery.AsyncResult(job_id)
+        if result.state == "PENDING":
+            return None
+        job = {"job_id": job_id, "status": self.STATES.get(result.state, result.state.lower())}
+        if result.state == "SUCCESS":
+            job["result"] = result.result
+        elif result.state == "FAILURE":
+            job["error"] = str(result.result)
+        return job
+
+    def stats(self):
+        return {"backend": "celery"}
+
+
+def create_ingest_queue(app, handler):
+    """DESC: Builds the ingest queue selected by REPORT_INGEST_BACKEND in the Flask config."""
+    backend = app.config.get("REPORT_INGEST_BACKEND", "local")
+
+    if backend == "local":
+        return LocalIngestQueue(
+            handler,
+            workers=app.config.get("REPORT_INGEST_WORKERS", 2),
+            max_pending=app.config.get("REPORT_INGEST_MAX_PENDING", 32),
+            max_attempts=app.config.get("REPORT_INGEST_MAX_ATTEMPTS", 1),
+            retry_backoff=app.config.get("REPORT_INGEST_RETRY_BACKOFF", 5)
+        )
+    if backend == "celery":
+        from config import celery_init_app
+        return CeleryIngestQueue(
+            celery_init_app(app),
+            handler,
+            max_attempts=app.config.get("REPORT_INGEST_MAX_ATTEMPTS", 1),
+            retry_backoff=app.config.get("REPORT_INGEST_RETRY_BACKOFF", 5)
+        )
+    raise ValueError(f"Unknown ingest backend '{backend}'")
@@ -1,26 +1,39 @@
 import base64
+import hashlib
+import io
 from datetime import datetime, timedelta, timezone
 import queue
 import re
 import time
 import json
 import os
+import shutil
 import threading
+import uuid
 
 import flask
 import psutil
-from model.src.inference import HermesModel
+from uploads import UploadSessionError
+from ingest import IngestQueueFull, create_ingest_queue
 
 import pymysql.cursors
 from flask import Response, jsonify, redirect, render_template, url_for, request
-
-from app import app, mysql
+from werkzeug.datastructures import ContentRange
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from app import app, pool, media_store, upload_sessions, ingest_jobs, verification_claims, verification_wakeup, prediction_cache
+from verification import VERIFICATION_REQUEUE_FIELDS, LatencyTracker, claim_owner_id
+from serving import ModelHolder, ModelNotReady, ModelRegistry
+from prediction_cache import prediction_cache_key
+from pipeline import Pipeline
 from pprint import pprint
 
 pms_DictCursor = pymysql.cursors.DictCursor
 
 philippines_timezone = timezone(timedelta(hours=8))  
 automated_verification_enabled = threading.Event()
+report_to_verdict_latency = LatencyTracker()
+batch_inference_latency = LatencyTracker()
 notifications_queue = queue.Queue()
 
 ##### ================[[ HANDLER FUNCTIONS ]]================ #####
@@ -32,7 +45,7 @@ def get_users():
     conn, cursor = None, None
     
     try:
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor(pms_DictCursor)
         cursor.execute("SELECT * FROM `user_accounts`")
         users = cursor.fetchall()
@@ -48,7 +61,7 @@ def get_users_responders():
     conn, cursor = None, None
     
     try:
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor(pms_DictCursor)
         cursor.execute("SELECT * FROM `user_accounts` WHERE UA_user_role = 'responder'")
         users = cursor.fetchall()
@@ -69,7 +82,7 @@ def get_one_user(request):
 
     conn, cursor = None, None
     try:
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor(pms_DictCursor)
         cursor.execute("SELECT * FROM user_accounts WHERE UA_user_id = %s", (UA_user_id,))
         user = cursor.fetchone()
@@ -119,7 +132,7 @@ def add_user(request):
 
     conn, cursor = None, None
     try:
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor(pms_DictCursor)
         cursor.execute(query, tuple(values))
         conn.commit()
@@ -139,7 +152,7 @@ def update_user(request):
 
     conn, cursor = None, None
     try:
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor(pms_DictCursor)
         cursor.execute("SELECT * FROM `user_accounts` WHERE UA_user_id = %s", (UA_user_id,))
         user = cursor.fetchone()
@@ -190,7 +203,7 @@ def patch_user(request):
     
     conn, cursor = None, None
     try:
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor(pms_DictCursor)
 
         cursor.execute("SELECT * FROM `user_accounts` WHERE UA_user_id = %s", (UA_user_id,))
@@ -273,7 +286,7 @@ def delete_user(request):
 
     conn, cursor = None, None
     try:
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor(pms_DictCursor)
 
         cursor.execute("SELECT * FROM `user_accounts` WHERE UA_user_id = %s", (UA_user_id,))
@@ -304,7 +317,7 @@ def calculate_user_reputation_score(request):
 
     conn, cursor = None, None
     try:
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor(pms_DictCursor)
         cursor.execute("SELECT * FROM user_accounts WHERE UA_user_id = %s", (UA_user_id,))
         user = cursor.fetchone()
@@ -362,7 +375,7 @@ def get_postverified_reports():
     """DESC: Fetches all postverified reports from the database."""
     conn, cursor = None, None
     try:
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor(pms_DictCursor)
         cursor.execute("SELECT * FROM `postverified_reports`")
         reports = cursor.fetchall()
@@ -395,39 +408,19 @@ def add_postverified_report(request):
         print(f"[DEBUG] Missing fields: {missing_fields}")
         return jsonify({"error": f"Missing required fields: {', '.join(missing_fields)}"}), 400
 
-    VR_severity_level = data.get("VR_severity_level")
-    VR_spread_potential = data.get("VR_spread_potential")
-    VR_fire_type = data.get("VR_fire_type")
-
     # print(request)
 
-    # print("[DEBUG] VR_severity_level:", VR_severity_level)
-    # print("[DEBUG] VR_spread_potential:", VR_spread_potential)
-    # print("[DEBUG] VR_fire_type:", VR_fire_type)
-
     conn, cursor = None, None
     try:
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor(pms_DictCursor)
         # print("[DEBUG] Executing INSERT INTO postverified_reports ...")
-        cursor.execute("""
-            INSERT INTO postverified_reports
-            (VR_report_id, VR_confidence_score, VR_detected, VR_verification_timestamp, VR_severity_level, VR_spread_potential, VR_fire_type)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """, (
-            data["VR_report_id"],
-            data["VR_confidence_score"],
-            data["VR_detected"],
-            data["VR_verification_timestamp"],
-            VR_severity_level,
-            VR_spread_potential,
-            VR_fire_type
-        ))
+        verification_id = execute_postverified_report_insert(cursor, data)
         conn.commit()
-        # print("[DEBUG] Insert successful, lastrowid:", cursor.lastrowid)
+        # print("[DEBUG] Insert successful, lastrowid:", verification_id)
         return jsonify({
             "message": "Postverified report added",
-            "verification_id": cursor.lastrowid
+            "verification_id": verification_id
         }), 201
     except Exception as e:
         print("[DEBUG] Exception occurred:", str(e))
@@ -436,6 +429,23 @@ def add_postverified_report(request):
         if cursor: cursor.close()
         if conn: conn.close()
 
+def execute_postverified_report_insert(cursor, data):
+    """DESC: Runs the postverified_reports INSERT on an open cursor without committing. Returns the new VR_verification_id."""
+    cursor.execute("""
+        INSERT INTO postverified_reports
+        (VR_report_id, VR_confidence_score, VR_detected, VR_verification_timestamp, VR_severity_level, VR_spread_potential, VR_fire_type)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, (
+        data["VR_report_id"],
+        data["VR_confidence_score"],
+        data["VR_detected"],
+        data["VR_verification_timestamp"],
+        data.get("VR_severity_level"),
+        data.get("VR_spread_potential"),
+        data.get("VR_fire_type")
+    ))
+    return cursor.lastrowid
+
 def update_postverified_report(request):
     pass
 
@@ -457,7 +467,7 @@ def delete_postverified_report(request):
 
     conn, cursor = None, None
     try:
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor(pms_DictCursor)
 
         cursor.execute("SELECT * FROM postverified_reports WHERE VR_verification_id = %s", (VR_verification_id,))
@@ -484,7 +494,7 @@ def get_preverified_reports():
     """DESC: Fetches all preverified reports from the database."""
     conn, cursor = None, None
     try:
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor(pms_DictCursor)
         cursor.execute("SELECT * FROM `preverified_reports`")
         reports = cursor.fetchall()
@@ -499,7 +509,7 @@ def get_preverified_reports_by_session(request):
     """DESC: Fetches all preverified reports from the database."""
     conn, cursor = None, None
     try:
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor(pms_DictCursor)
 
         UA_user_id = request.get("UA_user_id")
@@ -524,7 +534,7 @@ def get_one_preverified_report(request):
 
     conn, cursor = None, None
     try:
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor(pms_DictCursor)
         cursor.execute("SELECT * FROM preverified_reports WHERE PR_report_id = %s", (PR_report_id,))
         report = cursor.fetchone()
@@ -558,21 +568,34 @@ def add_preverified_report(request):
 
     conn, cursor = None, None
     try:
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor(pms_DictCursor)
-        cursor.execute("""
-            INSERT INTO `preverified_reports`
-            (PR_user_id, PR_image, PR_video, PR_latitude, PR_longitude, PR_address, PR_timestamp, PR_verified, PR_report_status)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (user_id, image, video, latitude, longitude, address, timestamp, verified, report_status))
+        report_id = execute_preverified_report_insert(cursor, data)
         conn.commit()
-        return {"message": "Report added", "report_id": cursor.lastrowid}, 201
+        return {"message": "Report added", "report_id": report_id}, 201
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     finally:
         if cursor: cursor.close()
         if conn: conn.close()
 
+def execute_preverified_report_insert(cursor, data):
+    """DESC: Runs the preverified_reports INSERT on an open cursor without committing. Returns the new PR_report_id."""
+    cursor.execute("""
+        INSERT INTO `preverified_reports`
+        (PR_user_id, PR_image, PR_video, PR_latitude, PR_longitude, PR_address, PR_timestamp, PR_verified, PR_report_status)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, (
+        data.get("PR_user_id"), data.get("PR_image"), data.get("PR_video"),
+        data.get("PR_latitude"), data.get("PR_longitude"), data.get("PR_address"),
+        data.get("PR_timestamp"), data.get("PR_verified"), data.get("PR_report_status")
+    ))
+    return cursor.lastrowid
+
+def is_unverified_value(value):
+    """DESC: Whether a PR_verified value from a request (bool, int or string) means "not verified"."""
+    return not value or str(value).strip().lower() in ("0", "false")
+
 def update_preverified_report(request):
     """DESC: Updates fields of a preverified report dynamically based on provided keys."""
     data = request.json if hasattr(request, "json") and request.json else request
@@ -599,6 +622,11 @@ def update_preverified_report(request):
     if not update_fields:
         return jsonify({"error": "No valid fields to update"}), 400
 
+    # Setting PR_verified back to 0 asks for re-verification, so the report goes back on the claim queue.
+    requeued = "PR_verified" in data and is_unverified_value(data["PR_verified"])
+    if requeued:
+        update_fields.extend(VERIFICATION_REQUEUE_FIELDS)
+
     update_query = f"""
         UPDATE preverified_reports
         SET {', '.join(update_fields)}
@@ -608,10 +636,13 @@ def update_preverified_report(request):
 
     conn, cursor = None, None
     try:
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor(pms_DictCursor)
         cursor.execute(update_query, tuple(update_values))
         conn.commit()
+        if requeued:
+            # Idle verification workers pick the report up now rather than after their backoff.
+            verification_wakeup.notify()
         message = jsonify({"message": f"Preverified report {PR_report_id} updated successfully."})
         return message, 200
     except Exception as e:
@@ -631,7 +662,7 @@ def delete_preverified_report(request):
 
     conn, cursor = None, None
     try:
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor(pms_DictCursor)
 
         # Check if the report exists
@@ -665,7 +696,7 @@ def patch_preverified_report(request):
 
 #     conn, cursor = None, None
 #     try:
-#         conn = mysql.connect()
+#         conn = pool.connect()
 #         cursor = conn.cursor(pms_DictCursor)
 #         cursor.execute("DELETE FROM postverified_reports WHERE VR_report_id = %s", (PR_report_id,))
 #         cursor.execute("SELECT * FROM preverified_reports WHERE PR_report_id = %s", (PR_report_id,))
@@ -721,7 +752,7 @@ def update_fire_statistic(request):
 
     conn, cursor = None, None
     try:
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor(pms_DictCursor)
         cursor.execute("SELECT * FROM `fire_statistics` WHERE FS_statistic_id = %s", (FS_statistic_id,))
         stat = cursor.fetchone()
@@ -751,6 +782,12 @@ def delete_fire_statistic(request):
     pass
 
 ### === MEDIA STORAGE ===
+def read_media_bytes(media_row):
+    """DESC: Returns the bytes of a media row, from the media store or from the legacy MS_file_data column."""
+    if media_row.get("MS_storage_key"):
+        return media_store.read(media_row["MS_storage_key"])
+    return media_row.get("MS_file_data")
+
 def get_all_media_files():
     pass
 
@@ -759,10 +796,10 @@ def get_all_media_file_details():
     cursor = None
 
     try:
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor(pms_DictCursor)
 
-        cursor.execute("SELECT MS_media_id, MS_user_owner, MS_file_name, MS_file_type FROM media_storage")
+        cursor.execute("SELECT MS_media_id, MS_user_owner, MS_file_name, MS_file_type, MS_file_size, MS_checksum FROM media_storage")
         media_rows = cursor.fetchall()
         if not media_rows:
             return jsonify({"error": "No media files found"}), 404
@@ -789,10 +826,10 @@ def get_one_media_file_details(request):
 
     try:
         
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor(pms_DictCursor)
 
-        cursor.execute("SELECT MS_media_id, MS_user_owner, MS_file_name, MS_file_type FROM media_storage WHERE MS_media_id = %s", (MS_media_id, ))
+        cursor.execute("SELECT MS_media_id, MS_user_owner, MS_file_name, MS_file_type, MS_file_size, MS_checksum FROM media_storage WHERE MS_media_id = %s", (MS_media_id, ))
         media_row = cursor.fetchone()
         if not media_row:
             return jsonify({"error": f"Media row with ID {MS_media_id} not found"}), 404
@@ -818,11 +855,11 @@ def get_one_media_file_blob(request):
         return jsonify({"error": "Missing MS_media_id"}), 400
 
     try:
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor(pms_DictCursor)
 
         cursor.execute("""
-            SELECT MS_file_data 
+            SELECT MS_storage_key, MS_file_data 
             FROM media_storage 
             WHERE MS_media_id = %s
         """, (MS_media_id,))
@@ -832,7 +869,7 @@ def get_one_media_file_blob(request):
             return jsonify({"error": "Media not found"}), 404
 
         return Response(
-            media_row['MS_file_data'],  
+            read_media_bytes(media_row),  
             mimetype="application/octet-stream"  
         )
 
@@ -851,113 +888,181 @@ def get_one_media_file_blob_download(request):
     if not MS_media_id:
         return jsonify({"error": "Missing MS_media_id"}), 400
 
-    conn = None
-    cursor = None
+    try:
+        return stream_media_file(MS_media_id, download=True)
+    except Exception as e:
+        print(f"Error fetching BLOB: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
 
+def stream_media_file(MS_media_id, download=False):
+    """DESC: Streams a media file in fixed-size chunks. Honors Range (206 partial content),
+    If-Range, If-None-Match and If-Modified-Since so clients can seek and cache."""
+    conn, cursor = None, None
     try:
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor(pms_DictCursor)
-
         cursor.execute("""
-            SELECT MS_file_data, MS_file_type 
-            FROM media_storage 
+            SELECT MS_storage_key, MS_file_type, MS_checksum,
+                   IF(MS_storage_key IS NULL, MS_file_data, NULL) AS MS_file_data
+            FROM media_storage
             WHERE MS_media_id = %s
         """, (MS_media_id,))
         media_row = cursor.fetchone()
-
-        if not media_row:
-            return jsonify({"error": "Media not found"}), 404
-
-        return Response(
-            media_row["MS_file_data"],
-            mimetype=media_row.get("MS_file_type", "application/octet-stream"),
-            headers={
-                "Content-Disposition": f"attachment; filename=media_{MS_media_id}"
-            }
-        )
-
-    except Exception as e:
-        print(f"Error fetching BLOB: {str(e)}")
-        return jsonify({"error": "Internal server error"}), 500
-
     finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+        # The connection goes back to the pool before any bytes are streamed.
+        if cursor: cursor.close()
+        if conn: conn.close()
 
-def add_media_file(request):
-    """Handles raw media file uploads (video or image) into MySQL."""
-    conn = None
-    cursor = None
+    if not media_row:
+        return jsonify({"error": "Media not found"}), 404
 
+    storage_key = media_row["MS_storage_key"]
+    if storage_key:
+        size, last_modified = media_store.stat(storage_key)
+        etag = media_row["MS_checksum"] or storage_key.rsplit("/", 1)[-1]
+        open_range = lambda start, length: media_store.open(storage_key, start, length)
+    else:
+        # Legacy row that still keeps its bytes in MS_file_data.
+        legacy_data = media_row["MS_file_data"] or b""
+        size, last_modified = len(legacy_data), None
+        etag = hashlib.sha256(legacy_data).hexdigest()
+        open_range = lambda start, length: io.BytesIO(legacy_data[start:start + length])
+
+    if last_modified is not None:
+        last_modified = last_modified.replace(microsecond=0)
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Cache-Control": f"private, max-age={app.config['MEDIA_CACHE_MAX_AGE']}",
+    }
+    if download:
+        headers["Content-Disposition"] = f"attachment; filename=media_{MS_media_id}"
+
+    def finish(response):
+        response.set_etag(etag)
+        if last_modified is not None:
+            response.last_modified = last_modified
+        response.headers.update(headers)
+        return response
+
+    if_none_match = request.if_none_match
+    if if_none_match:
+        if if_none_match.contains_weak(etag):
+            return finish(Response(status=304))
+    elif request.if_modified_since and last_modified and last_modified <= request.if_modified_since:
+        return finish(Response(status=304))
+
+    byte_range = request.range
+    if_range = request.if_range
+    if byte_range and (if_range.etag or if_range.date):
+        # A stale If-Range validator means the client's partial copy is outdated: send everything.
+        if if_range.etag and if_range.etag != etag:
+            byte_range = None
+        elif if_range.date and (last_modified is None or if_range.date != last_modified):
+            byte_range = None
+
+    status = 200
+    start, stop = 0, size
+    if byte_range:
+        bounds = byte_range.range_for_length(size)
+        if bounds is None:
+            response = finish(Response(status=416))
+            response.headers["Content-Range"] = f"bytes */{size}"
+            return response
+        start, stop = bounds
+        status = 206
+
+    chunk_size = app.config["MEDIA_STREAM_CHUNK_SIZE"]
+    length = stop - start
+
+    def generate():
+        remaining = length
+        with open_range(start, length) as f:
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    response = Response(
+        generate(),
+        status=status,
+        mimetype=media_row.get("MS_file_type") or "application/octet-stream",
+        direct_passthrough=True
+    )
+    response.content_length = length
+    if status == 206:
+        response.content_range = ContentRange("bytes", start, stop, size)
+    return finish(response)
+
+def execute_media_insert(cursor, user_id, media_type, content_type, stored):
+    """Runs the media_storage INSERT on an open cursor without committing. Returns (MS_media_id, file_name)."""
+    storage_key, file_size, checksum = stored
+
+    current_date = datetime.now().strftime("%Y%m%d") 
+    current_time = datetime.now().strftime("%H%M%S")
+    extension = 'mp4' if media_type == 'video' else 'jpg'
+    file_name = f"ID{user_id}TIME{current_time}DATE{current_date}{media_type.upper()}.{extension}"
+
+    cursor.execute("""
+        INSERT INTO media_storage 
+        (MS_user_owner, MS_file_type, MS_file_name, MS_storage_key, MS_file_size, MS_checksum)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, (
+        user_id, 
+        content_type, 
+        file_name, 
+        storage_key,
+        file_size,
+        checksum
+    ))
+    return cursor.lastrowid, file_name
+
+def insert_report_with_media(report, content_type, stored):
+    """Inserts a validated report's media_storage row and preverified_reports row in one transaction."""
+    results, status = insert_reports_with_media([(report, content_type, stored)])
+    if status != 201:
+        return results, status
+    return results[0], 201
+
+def insert_reports_with_media(items):
+    """
+    Unit of work for report ingestion. Each item is (report, content_type, stored), where `stored` is the
+    media store's (storage_key, size, checksum). Every media and report row is inserted on one pooled
+    connection and committed once, so either all rows land or none do and no orphaned media rows are left.
+    """
+    conn, cursor = None, None
     try:
-        video_file = request.files.get("video")
-        image_file = request.files.get("image")
-        
-        if not video_file and not image_file:
-            raise ValueError("No media file uploaded (expected video or image)")
-        
-        media_type = 'video' if video_file else 'image'
-        media_file = video_file if video_file else image_file
-        
-        report_data = request.form.get("report")
-        if not report_data:
-            raise ValueError("No report data provided")
-            
-        report = json.loads(report_data)
-        user_id = report['reporter']['id']
-        
-        current_date = datetime.now().strftime("%Y%m%d") 
-        current_time = datetime.now().strftime("%H%M%S")
-        extension = 'mp4' if media_type == 'video' else 'jpg'
-        file_name = f"ID{user_id}TIME{current_time}DATE{current_date}{media_type.upper()}.{extension}"
-
-        file_data_bytes = media_file.read()
-
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor(pms_DictCursor)
 
-        cursor.execute("SET SESSION wait_timeout = 600")
-        cursor.execute("SET SESSION interactive_timeout = 600")
-        cursor.execute("SET SESSION net_read_timeout = 300")
-        cursor.execute("SET SESSION net_write_timeout = 300")
-
-        cursor.execute("""
-            INSERT INTO media_storage 
-            (MS_user_owner, MS_file_type, MS_file_name, MS_file_data)
-            VALUES (%s, %s, %s, %s)
-        """, (
-            user_id, 
-            media_file.content_type, 
-            file_name, 
-            file_data_bytes
-        ))
+        results = []
+        for report, content_type, stored in items:
+            media_id, file_name = execute_media_insert(
+                cursor, report['reporter']['id'], report['media_type'], content_type, stored
+            )
+            report_data = build_preverified_report_data(report, media_id)
+            report_id = execute_preverified_report_insert(cursor, report_data)
+            results.append({
+                "report_id": report_id,
+                "media_id": media_id,
+                "file_name": file_name,
+                "reporter_id": report['reporter']['id'],
+                "timestamp": report_data['PR_timestamp']
+            })
 
         conn.commit()
-
-        media_id = cursor.lastrowid
-
-        return {
-            "message": f"{media_type.capitalize()} upload successful",
-            "media_id": media_id,
-            "media_type": media_type,
-            "file_size": len(file_data_bytes),
-            "file_name": file_name
-        }, 201
-
-    except json.JSONDecodeError as e:
-        return {"error": f"Invalid report data: {str(e)}"}, 400
+        verification_wakeup.notify()
+        return results, 201
     except Exception as e:
         if conn:
             conn.rollback()
-        print(str(e))
+        print(f"Error inserting reports with media: {str(e)}")
         return {"error": str(e)}, 500
     finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+        if cursor: cursor.close()
+        if conn: conn.close()
 
 def update_media_file(request):
     pass 
@@ -970,7 +1075,7 @@ def handle_login(data):
 
     conn, cursor = None, None
     try:
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor()
 
         UA_username = data.get("UA_username")
@@ -1035,7 +1140,7 @@ def handle_login(data):
 def handle_registration(data):
     conn, cursor = None, None
     try:
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor()
 
         UA_username = data.get("UA_username")
@@ -1118,17 +1223,37 @@ def process_report_request(request):
         return None, {"error": "Cannot provide both video and image"}, 400
 
     if video_file:
-        report['media_type'] = 'video'
-        report['file_received'] = True
+        media_type = 'video'
         # print("Video file detected")
     elif image_file:
-        report['media_type'] = 'image'
-        report['file_received'] = True
+        media_type = 'image'
         # print("Image file detected")
     else:
         # print("ERROR: No media file provided")
         return None, {"error": "No media file provided (video or image required)"}, 400
 
+    return validate_report(report, media_type)
+
+# Leading bytes of the image formats the model decodes; uploads without a usable MIME type are sniffed for them.
+IMAGE_SIGNATURES = (b'\xFF\xD8\xFF', b'\x89PNG')
+
+def detect_upload_media_type(media_file):
+    """Returns 'video' or 'image' for an uploaded file: from its MIME type if that names one, otherwise from its leading bytes."""
+    content_type = media_file.content_type or ""
+    if content_type.startswith(("video/", "image/")):
+        return content_type.split("/", 1)[0]
+    head = media_file.stream.read(8)
+    media_file.stream.seek(0)
+    return 'image' if head.startswith(IMAGE_SIGNATURES) else 'video'
+
+def validate_report(report, media_type):
+    """Validates the required report fields for a received media file of the given type."""
+    if not isinstance(report, dict):
+        return None, {"error": "Report data must be a JSON object"}, 400
+
+    report['media_type'] = media_type
+    report['file_received'] = True
+
     # print("Validating required fields...")
     required_fields = {
         'reporter': ['id'],
@@ -1151,6 +1276,123 @@ def process_report_request(request):
     # print(f"=== {report['media_type'].upper()} REPORT VALIDATION SUCCESSFUL ===")
     return report, {"message": f"{report['media_type'].capitalize()} report validated successfully"}, 200
 
+def build_preverified_report_data(report, media_id):
+    """Builds the preverified_reports row for a validated report whose media is stored as `media_id`."""
+    return {
+        "PR_user_id": report['reporter']['id'],
+        "PR_image": media_id if report['media_type'] == 'image' else None,
+        "PR_video": media_id if report['media_type'] == 'video' else None,
+        "PR_latitude": report['location']['coordinates']['latitude'],
+        "PR_longitude": report['location']['coordinates']['longitude'],
+        "PR_address": report['location']['address'],
+        "PR_timestamp": datetime.now(philippines_timezone).strftime("%Y-%m-%d %H:%M:%S"),
+        "PR_verified": False,
+        "PR_report_status": "pending"
+    }
+
+def persist_upload_for_ingest(media_file, path):
+    """Moves an uploaded file out of the request's spool to `path` in REPORT_INGEST_DIR so it outlives the request."""
+
+    stream = media_file.stream
+    if hasattr(stream, "finalize"):
+        checksum, size = stream.checksum, stream.size
+        shutil.move(stream.finalize(), path)
+    else:
+        digest, size = hashlib.sha256(), 0
+        with open(path, "wb") as f:
+            for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+                digest.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+        checksum = digest.hexdigest()
+
+    return {"path": path, "checksum": checksum, "size": size}
+
+def enqueue_report_upload(report, media_file):
+    """Persists the upload and queues it for ingestion. Returns the 202 response, or 503 when the queue is full."""
+    job_id = uuid.uuid4().hex
+    job = persist_upload_for_ingest(media_file, ingest_jobs.upload_path(job_id))
+    job.update({
+        "report": report,
+        "media_type": report['media_type'],
+        "content_type": media_file.content_type,
+    })
+    # Recorded on disk before the 202, so an accepted report survives a restart.
+    job = ingest_jobs.create(job_id, job)
+
+    try:
+        ingest_queue.submit(job, job_id=job_id)
+    except IngestQueueFull as e:
+        ingest_jobs.discard(job_id)
+        response = jsonify({"status": "error", "error": str(e)})
+        response.headers["Retry-After"] = "5"
+        return response, 503
+    except Exception:
+        # The client gets an error and will retry, so the job must not also run from disk.
+        ingest_jobs.discard(job_id)
+        raise
+
+    return jsonify({
+        "status": "accepted",
+        "message": f"{report['media_type'].capitalize()} report queued for processing",
+        "job_id": job_id,
+        "status_url": url_for("route_get_ingest_job", job_id=job_id),
+        "reporter_id": report['reporter']['id']
+    }), 202
+
+def process_ingest_job(job):
+    """
+    Worker side of queued ingestion: stores the media, then inserts the media and preverified report rows.
+    The job's files are removed only once the report is inserted; a failure raises, leaving them for the retry.
+    """
+    job_id = job["job_id"]
+    try:
+        with app.app_context():
+            stored = (ingest_jobs.get(job_id) or {}).get("stored")
+            if not stored and not os.path.exists(job["path"]):
+                # Stored by an attempt that died before recording it; the store adopts the file by rename.
+                key = media_store.key_for(job["checksum"])
+                if not media_store.exists(key):
+                    raise RuntimeError(f"Upload of job {job_id} is missing from {job['path']}")
+                stored = (key, job["size"], job["checksum"])
+            if not stored:
+                stored = media_store.put_path(job["path"], job["checksum"], job["size"])
+                ingest_jobs.update(job_id, stored=list(stored))
+
+            result, result_status = insert_report_with_media(job["report"], job["content_type"], tuple(stored))
+            if result_status != 201:
+                raise RuntimeError(result.get("error", "Report insert failed"))
+    except Exception as e:
+        ingest_jobs.update(job_id, last_error=str(e))
+        raise
+
+    ingest_jobs.discard(job_id)
+    return result
+
+def recover_ingest_jobs():
+    """Enqueues the jobs left in REPORT_INGEST_DIR by a previous run. Returns the thread submitting them, or None."""
+    jobs = ingest_jobs.pending()
+    if not jobs:
+        return None
+    print(f"[INGEST] Re-enqueueing {len(jobs)} job(s) accepted before the last shutdown.")
+
+    # Listed up front so uploads accepted from now on are not enqueued twice; submitted from a thread since
+    # there may be more jobs than the queue holds.
+    def submit_all():
+        for job in jobs:
+            ingest_queue.submit(job, job_id=job["job_id"], block=True)
+
+    thread = threading.Thread(target=submit_all, daemon=True, name="IngestRecoveryThread")
+    thread.start()
+    return thread
+
+ingest_queue = create_ingest_queue(app, process_ingest_job)
+if app.config["REPORT_INGEST_MODE"] == "queue":
+    ingest_queue.start()
+    # Celery's broker keeps its own pending jobs; only the local backend loses them on restart.
+    if app.config["REPORT_INGEST_BACKEND"] == "local":
+        recover_ingest_jobs()
+
 def prepare_report_blob(request):
     """Processes the request and prepares data for BLOB storage"""
     try:
@@ -1210,6 +1452,11 @@ def log_report_details(report):
     print(f"File Received: {'Yes' if report.get('file_received') else 'No'}")
     print("======================\n")
 
+def payload_too_large_response():
+    """Builds the JSON 413 response for uploads over MAX_CONTENT_LENGTH."""
+    limit_mb = app.config["MAX_CONTENT_LENGTH"] // (1024 * 1024)
+    return jsonify({"error": f"Upload exceeds the maximum allowed size of {limit_mb}MB"}), 413
+
 ### === NOTIFICATIONS ===
 def queue_newly_validated_notification():
     notifications_queue.put({
@@ -1240,7 +1487,7 @@ def retrieve_server_statistics():
     """Returns meta statistics about the API server for the MetaPanel."""
     conn, cursor = None, None
     try:
-        conn = mysql.connect()
+        conn = pool.connect()
         cursor = conn.cursor(pms_DictCursor)
 
         uptime = "--"
@@ -1274,6 +1521,9 @@ def retrieve_server_statistics():
             "api_status": api_status,
             "memory_usage": memory_usage,
             "cpu_usage": cpu_usage,
+            "database_pool": pool.stats(),
+            "ingest_queue": ingest_queue.stats(),
+            "verification": verification_statistics(),
         }, 200)
     except Exception as e:
         # Always return a tuple (dict, status_code) on error
@@ -1282,8 +1532,31 @@ def retrieve_server_statistics():
         if cursor: cursor.close()
         if conn: conn.close()
 
+def verification_statistics():
+    """Returns the verification workers' claim counters, wakeups and latencies."""
+    return {
+        **verification_claims.stats(),
+        "wakeups": verification_wakeup.stats(),
+        "report_to_verdict_latency": report_to_verdict_latency.stats(),
+        "batch_inference_latency": batch_inference_latency.stats(),
+        "single_clip_model_latency": model_holder.model.latency_stats() if model_holder.model else None,
+        "prediction_cache": prediction_cache.stats() if prediction_cache else None,
+        "pipeline": verification_pipeline.stats() if verification_pipeline else None,
+    }
+
 ##### ===================[[ ROUTES ]]=================== #####
 
+@app.before_request
+def reject_oversized_uploads():
+    """DESC: Rejects requests whose declared Content-Length exceeds MAX_CONTENT_LENGTH before any of the body is read."""
+    limit = app.config.get("MAX_CONTENT_LENGTH")
+    if limit and request.content_length and request.content_length > limit:
+        return payload_too_large_response()
+
+@app.errorhandler(RequestEntityTooLarge)
+def handle_oversized_upload(e):
+    return payload_too_large_response()
+
 ## === DEFAULT ROUTE ===
 @app.route('/', methods=["GET"])
 def route_default():
@@ -1299,6 +1572,19 @@ def route_ping():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/health', methods=["GET"])
+def route_health():
+    """DESC: Liveness check. Answers as soon as the HTTP layer is up and includes the model's loading state."""
+    return jsonify({"status": "ok", "model": model_holder.status()}), 200
+
+@app.route('/health/ready', methods=["GET"])
+def route_health_ready():
+    """DESC: Readiness check. 200 once the model is loaded and warmed up, 503 while loading or after a failed load."""
+    model_status = model_holder.status()
+    if not model_holder.ready or model_status["status"] != "ready":
+        return jsonify({"status": "not_ready", "model": model_status}), 503
+    return jsonify({"status": "ready", "model": model_status}), 200
+
 ## === AUTHENTICATION RESOURCE ===
 
 @app.route('/auth/login', methods=["POST"])
@@ -1422,38 +1708,28 @@ def route_upload_report_video():
         if not report:
             return jsonify(response), status
 
-        # Upload media file
-        media_response, media_status = add_media_file(request)
-        if media_status != 201:
-            return jsonify(media_response), media_status
-
-        # Create report record
-        report_data = {
-            "PR_user_id": report['reporter']['id'],
-            "PR_image": None,
-            "PR_video": media_response['media_id'],
-            "PR_latitude": report['location']['coordinates']['latitude'],
-            "PR_longitude": report['location']['coordinates']['longitude'],
-            "PR_address": report['location']['address'],
-            "PR_timestamp": datetime.now(philippines_timezone).strftime("%Y-%m-%d %H:%M:%S"),
-            "PR_verified": False,
-            "PR_report_status": "pending"
-        }
-        
-        report_response, report_status = add_preverified_report(report_data)
-        if report_status != 201:
-            return jsonify(report_response), report_status
+        if app.config["REPORT_INGEST_MODE"] == "queue":
+            return enqueue_report_upload(report, request.files.get("video"))
+
+        # Store the media file, then insert its media and report rows in one transaction
+        media_file = request.files.get("video")
+        stored = media_store.put_upload(media_file.stream)
+        result, result_status = insert_report_with_media(report, media_file.content_type, stored)
+        if result_status != 201:
+            return jsonify(result), result_status
 
         # Success response
         return jsonify({
             "status": "success",
             "message": "Video report processed successfully",
-            "report_id": report_response.get('report_id'),
-            "media_id": media_response['media_id'],
-            "reporter_id": report['reporter']['id'],
-            "timestamp": report_data['PR_timestamp']
+            "report_id": result['report_id'],
+            "media_id": result['media_id'],
+            "reporter_id": result['reporter_id'],
+            "timestamp": result['timestamp']
         }), 200
 
+    except RequestEntityTooLarge:
+        return payload_too_large_response()
     except Exception as e:
         print(f"Error processing video report: {str(e)}")
         return jsonify({
@@ -1469,35 +1745,27 @@ def route_upload_report_image():
         if not report:
             return jsonify(response), status
 
-        media_response, media_status = add_media_file(request)
-        if media_status != 201:
-            return jsonify(media_response), media_status
-
-        report_data = {
-            "PR_user_id": report['reporter']['id'],
-            "PR_image": media_response['media_id'],
-            "PR_video": None,
-            "PR_latitude": report['location']['coordinates']['latitude'],
-            "PR_longitude": report['location']['coordinates']['longitude'],
-            "PR_address": report['location']['address'],
-            "PR_timestamp": datetime.now(philippines_timezone).strftime("%Y-%m-%d %H:%M:%S"),
-            "PR_verified": False,
-            "PR_report_status": "pending"
-        }
-        
-        report_response, report_status = add_preverified_report(report_data)
-        if report_status != 201:
-            return jsonify(report_response), report_status
+        if app.config["REPORT_INGEST_MODE"] == "queue":
+            return enqueue_report_upload(report, request.files.get("image"))
+
+        # Store the media file, then insert its media and report rows in one transaction
+        media_file = request.files.get("image")
+        stored = media_store.put_upload(media_file.stream)
+        result, result_status = insert_report_with_media(report, media_file.content_type, stored)
+        if result_status != 201:
+            return jsonify(result), result_status
 
         return jsonify({
             "status": "success",
             "message": "Image report processed successfully",
-            "report_id": report_response.get('report_id'),
-            "media_id": media_response['media_id'],
-            "reporter_id": report['reporter']['id'],
-            "timestamp": report_data['PR_timestamp']
+            "report_id": result['report_id'],
+            "media_id": result['media_id'],
+            "reporter_id": result['reporter_id'],
+            "timestamp": result['timestamp']
         }), 200
 
+    except RequestEntityTooLarge:
+        return payload_too_large_response()
     except Exception as e:
         print(f"Error processing image report: {str(e)}")
         return jsonify({
@@ -1506,6 +1774,216 @@ def route_upload_report_image():
             "error": str(e)
         }), 500
     
+@app.route('/reports/upload/bulk', methods=["POST"])
+def route_upload_reports_bulk():
+    """
+    DESC: Imports a backlog of reports in one request. The `reports` form field is a JSON array; each entry is a
+    regular report plus a `file` key naming the multipart field holding its media, and optionally a `media_type`
+    of "video" or "image". Without one, the type comes from the file's MIME type, or from its leading bytes when
+    that is missing or generic. Every report is validated and its media stored before any row is written, then all
+    media and report rows are committed in one transaction.
+    """
+    try:
+        reports = json.loads(request.form.get("reports") or "null")
+        if not isinstance(reports, list) or not reports:
+            return jsonify({"error": "Missing reports (expected a non-empty JSON array)"}), 400
+
+        max_items = app.config["REPORT_BULK_MAX_ITEMS"]
+        if len(reports) > max_items:
+            return jsonify({"error": f"At most {max_items} reports can be imported per request"}), 400
+
+        validated = []
+        for index, report in enumerate(reports):
+            media_file = request.files.get(report.get("file", "")) if isinstance(report, dict) else None
+            if not media_file:
+                return jsonify({"error": f"Report {index}: no media file provided"}), 400
+
+            media_type = report.get("media_type") or detect_upload_media_type(media_file)
+            if media_type not in ('video', 'image'):
+                return jsonify({"error": f"Report {index}: media_type must be 'video' or 'image'"}), 400
+            report, response, status = validate_report(report, media_type)
+            if not report:
+                return jsonify({"error": f"Report {index}: {response['error']}"}), status
+            validated.append((report, media_file))
+
+        items = [
+            (report, media_file.content_type, media_store.put_upload(media_file.stream))
+            for report, media_file in validated
+        ]
+        results, status = insert_reports_with_media(items)
+        if status != 201:
+            return jsonify(results), status
+
+        return jsonify({
+            "status": "success",
+            "message": f"{len(results)} reports imported successfully",
+            "reports": results
+        }), 200
+
+    except RequestEntityTooLarge:
+        return payload_too_large_response()
+    except json.JSONDecodeError:
+        return jsonify({"error": "Invalid reports JSON"}), 400
+    except Exception as e:
+        print(f"Error importing reports: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "Failed to import reports",
+            "error": str(e)
+        }), 500
+
+@app.route('/reports/upload/jobs/<job_id>', methods=["GET"])
+def route_get_ingest_job(job_id):
+    """DESC: Returns the state of a queued report upload: queued, processing, done (with IDs) or failed."""
+    if request.method != 'GET':
+        return jsonify({"error": "Invalid request method. Expected GET method."}), 405
+
+    try:
+        job = ingest_queue.status(job_id)
+        if not job:
+            return jsonify({"error": f"Upload job '{job_id}' not found"}), 404
+        return jsonify(job), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+## === RESUMABLE VIDEO UPLOADS ===
+# 1. POST   /reports/upload/video/resumable                          -> opens a session
+# 2. PUT    /reports/upload/video/resumable/<id>/chunk/<n>?offset=N  -> raw chunk bytes
+# 3. GET    /reports/upload/video/resumable/<id>                     -> received byte ranges
+# 4. POST   /reports/upload/video/resumable/<id>/finalize            -> stores media and report
+@app.route('/reports/upload/video/resumable', methods=["POST"])
+def route_init_resumable_video_upload():
+    """
+    DESC: Opens a resumable video upload session.
+
+    Args: request.json
+        {
+            "report": <object>,        # Same report object as the multipart `report` field
+            "total_size": <int>,       # Size of the whole video in bytes
+            "content_type": <str>,     # Optional, defaults to video/mp4
+            "checksum": <str>          # Optional SHA-256 hex digest, checked on finalize
+        }
+    """
+    if request.method != 'POST':
+        return jsonify({"error": "Invalid request method. Expected POST method."}), 405
+
+    try:
+        data = request.json or {}
+        total_size = data.get("total_size")
+        if not isinstance(total_size, int) or total_size <= 0:
+            return jsonify({"error": "total_size must be a positive integer"}), 400
+        if total_size > app.config["MAX_CONTENT_LENGTH"]:
+            return payload_too_large_response()
+
+        report, response, status = validate_report(data.get("report"), 'video')
+        if not report:
+            return jsonify(response), status
+
+        session = upload_sessions.create(
+            report,
+            'video',
+            data.get("content_type") or "video/mp4",
+            total_size,
+            checksum=data.get("checksum")
+        )
+        return jsonify({
+            "upload_id": session["upload_id"],
+            "total_size": total_size,
+            "chunk_size": upload_sessions.max_chunk_size,
+            "expires_in": upload_sessions.ttl
+        }), 201
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/reports/upload/video/resumable/<upload_id>/chunk/<int:chunk_index>', methods=["PUT"])
+def route_put_resumable_video_chunk(upload_id, chunk_index):
+    """DESC: Writes one chunk of a resumable upload. The body is the raw chunk; `offset` is its byte position."""
+    if request.method != 'PUT':
+        return jsonify({"error": "Invalid request method. Expected PUT method."}), 405
+
+    try:
+        offset = request.args.get("offset", type=int)
+        if offset is None:
+            return jsonify({"error": "Missing offset query parameter"}), 400
+
+        session = upload_sessions.write_chunk(upload_id, offset, request.stream, request.content_length)
+        received_bytes = sum(end - start for start, end in session["received"])
+        return jsonify({
+            "upload_id": upload_id,
+            "chunk_index": chunk_index,
+            "received": session["received"],
+            "received_bytes": received_bytes,
+            "complete": received_bytes == session["total_size"]
+        }), 200
+    except UploadSessionError as e:
+        return jsonify({"error": str(e)}), e.status
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/reports/upload/video/resumable/<upload_id>', methods=["GET"])
+def route_get_resumable_video_upload(upload_id):
+    """DESC: Reports which byte ranges of a resumable upload have been received, so a client can resume."""
+    if request.method != 'GET':
+        return jsonify({"error": "Invalid request method. Expected GET method."}), 405
+
+    try:
+        session = upload_sessions.get(upload_id)
+        received_bytes = sum(end - start for start, end in session["received"])
+        return jsonify({
+            "upload_id": upload_id,
+            "total_size": session["total_size"],
+            "received": session["received"],
+            "received_bytes": received_bytes,
+            "complete": received_bytes == session["total_size"]
+        }), 200
+    except UploadSessionError as e:
+        return jsonify({"error": str(e)}), e.status
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/reports/upload/video/resumable/<upload_id>/finalize', methods=["POST"])
+def route_finalize_resumable_video_upload(upload_id):
+    """DESC: Assembles a completed resumable upload and creates its media and preverified report records."""
+    if request.method != 'POST':
+        return jsonify({"error": "Invalid request method. Expected POST method."}), 405
+
+    try:
+        session = upload_sessions.get(upload_id)
+
+        report, response, status = validate_report(session["report"], session["media_type"])
+        if not report:
+            return jsonify(response), status
+
+        stored = session.get("stored")
+        if not stored:
+            session, part_path, checksum, size = upload_sessions.assemble(upload_id)
+            stored = media_store.put_path(part_path, checksum, size)
+            upload_sessions.mark_stored(upload_id, stored)
+
+        result, result_status = insert_report_with_media(report, session["content_type"], stored)
+        if result_status != 201:
+            return jsonify(result), result_status
+
+        upload_sessions.discard(upload_id)
+
+        return jsonify({
+            "status": "success",
+            "message": "Video report processed successfully",
+            "report_id": result['report_id'],
+            "media_id": result['media_id'],
+            "reporter_id": result['reporter_id'],
+            "timestamp": result['timestamp']
+        }), 200
+    except UploadSessionError as e:
+        return jsonify({"error": str(e)}), e.status
+    except Exception as e:
+        print(f"Error finalizing resumable upload {upload_id}: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "Failed to process video report",
+            "error": str(e)
+        }), 500
+
 @app.route('/reports/preverified/all', methods=['GET'])
 def route_get_preverified_reports():
     if request.method != 'GET':
@@ -1622,7 +2100,25 @@ def route_get_one_media_blob():
         return jsonify({"error": "Invalid request method."}), 405
     
     try: 
-        return get_one_media_file_blob(request)
+        MS_media_id = (request.json or {}).get("MS_media_id")
+        if not MS_media_id:
+            return jsonify({"error": "Missing MS_media_id"}), 400
+        return stream_media_file(MS_media_id)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/media/blob/<int:MS_media_id>', methods=['GET'])
+def route_stream_media_blob(MS_media_id):
+    """
+    DESC: Streams a media file by MS_media_id with HTTP Range and caching support.
+
+    Query: download=1 sends the file as an attachment.
+    """
+    if request.method != 'GET':
+        return jsonify({"error": "Invalid request method. Expected GET method."}), 405
+
+    try:
+        return stream_media_file(MS_media_id, download=request.args.get("download") == "1")
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -1653,6 +2149,7 @@ def route_toggle_automated_verification():
         if toggle_state is True: 
             print("[HERMES] Automated verification system is now enabled!")
             automated_verification_enabled.set()
+            verification_wakeup.notify()
         else:
             print("[HERMES] Automated verification system is now disabled!")
             automated_verification_enabled.clear()
@@ -1661,6 +2158,69 @@ def route_toggle_automated_verification():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/verification/stats', methods=['GET'])
+def route_get_verification_stats():
+    """DESC: Returns verification throughput and report-to-verdict latency percentiles."""
+    if request.method != 'GET':
+        return jsonify({"error": "Invalid request method. Expected GET method."}), 405
+
+    try:
+        return jsonify(verification_statistics()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+## === MODELS RESOURCE ===
+@app.route('/models', methods=['GET'])
+def route_get_models():
+    """DESC: Lists the deployed model versions and the active/loading/previous version."""
+    if request.method != 'GET':
+        return jsonify({"error": "Invalid request method. Expected GET method."}), 405
+
+    try:
+        return jsonify({"versions": model_registry.versions(), "serving": model_holder.status()}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/models/load', methods=['POST'])
+def route_load_model():
+    """
+    DESC: Loads a deployed model version in the background, warms it up and swaps it in. Verification keeps
+    running on the current model until the swap.
+
+    Body: {"version": "<file name in the deployed folder>"}
+    """
+    if request.method != 'POST':
+        return jsonify({"error": "Invalid request method. Expected POST method."}), 405
+
+    try:
+        version = (request.json or {}).get("version")
+        if not version:
+            return jsonify({"error": "Missing version"}), 400
+        try:
+            model_registry.path_for(version)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 404
+
+        if not model_holder.load(version):
+            return jsonify({"error": "Another model version is already loading", "serving": model_holder.status()}), 409
+        return jsonify({"message": f"Loading {version}", "serving": model_holder.status()}), 202
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/models/rollback', methods=['POST'])
+def route_rollback_model():
+    """DESC: Swaps the previously active model version back in."""
+    if request.method != 'POST':
+        return jsonify({"error": "Invalid request method. Expected POST method."}), 405
+
+    try:
+        version = model_holder.rollback()
+        return jsonify({"message": f"Rolled back to {version}", "serving": model_holder.status()}), 200
+    except ModelNotReady as e:
+        return jsonify({"error": str(e)}), 409
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 ## === NOTIFICATIONS RESOURCE ===
 @app.route('/notifications/stream', methods=["GET"])
 def stream():
@@ -1686,216 +2246,450 @@ def retrieve_metastatistics():
         return jsonify({"error": str(e)}), 500
 
 ##### ===================[[ THREADS ]]=================== #####
-def start_background_verification(interval=10):
-    print("[THREAD] Booting up verification background check with ML!")
+def fetch_report_media_blob(report):
+    """
+    DESC: Returns the media bytes attached to a preverified report, or None if the report has no retrievable
+    media. Raises RuntimeError when the fetch failed on the server side and may succeed on a later attempt.
+    """
+    MS_media_id = report["PR_video"] or report["PR_image"]
+    blob_response = get_one_media_file_blob({"MS_media_id": MS_media_id})
+
+    status = 200
+    if isinstance(blob_response, tuple):
+        blob_response, status = blob_response
+    if isinstance(blob_response, Response):
+        if blob_response.mimetype == "application/json":
+            error = (blob_response.get_json(silent=True) or {}).get("error")
+            if status >= 500:
+                raise RuntimeError(error)
+            print(f"[THREAD] Error fetching BLOB for report {report['PR_report_id']}: {error}")
+            return None
+        return blob_response.get_data()
+    if isinstance(blob_response, dict):
+        if status >= 500:
+            raise RuntimeError(blob_response.get("error"))
+        print(f"[THREAD] Error fetching BLOB for report {report['PR_report_id']}: {blob_response.get('error')}")
+        return None
+    return blob_response
+
+def decode_report_clip(model, report, blob, out=None):
+    """DESC: Decodes a report's media bytes into a model input clip, written into `out` if given, or returns None if that fails."""
+    # Decoded straight from memory; nothing is written to disk.
+    clip = model.load_clip_from_blob(blob, content_type="video/mp4" if report["PR_video"] else "image/jpeg", out=out)
+    if clip.shape != (3, 224, 224, 3):
+        print(f"[THREAD] Report {report['PR_report_id']} decoded to an unexpected shape {clip.shape}")
+        return None
+    return clip
+
+def record_verification_result(report, prediction_output, owner):
+    """
+    DESC: Stores a prediction as a postverified report and marks the claimed preverified report as verified,
+    in one transaction. Returns False without writing anything if `owner` has lost the claim.
+    """
+    fire_detected = prediction_output.get("fire_detected")
+
+    postverified = {
+        "VR_report_id": report["PR_report_id"],
+        "VR_detected": fire_detected,
+        "VR_confidence_score": prediction_output.get("confidence_percentage"),
+        "VR_verification_timestamp": datetime.now(philippines_timezone).strftime("%Y-%m-%d %H:%M:%S")
+    }
+    # The fire attributes are only predicted when a fire is detected.
+    if fire_detected:
+        postverified.update({
+            "VR_fire_type": prediction_output.get("fire_type"),
+            "VR_severity_level": prediction_output.get("severity_level"),
+            "VR_spread_potential": prediction_output.get("spread_potential"),
+        })
+
+    conn, cursor = None, None
+    try:
+        conn = pool.connect()
+        cursor = conn.cursor(pms_DictCursor)
 
-    CURRENT_MODEL = "HermesSavedBuild_20250530-155556.keras"
-    model = HermesModel(f'model/models/deployed/{CURRENT_MODEL}')
+        report_status = "verified" if fire_detected else "false_alarm"
+        if not verification_claims.finish(cursor, report["PR_report_id"], owner, report_status):
+            conn.rollback()
+            print(f"[THREAD] Lost the claim on report {report['PR_report_id']}; leaving it to its new owner.")
+            return False
+
+        verification_id = execute_postverified_report_insert(cursor, postverified)
+        conn.commit()
+
+        # PR_timestamp is stored in Philippine time without a zone.
+        if isinstance(report.get("PR_timestamp"), datetime):
+            verdict_at = datetime.now(philippines_timezone).replace(tzinfo=None)
+            report_to_verdict_latency.record(max(0.0, (verdict_at - report["PR_timestamp"]).total_seconds()))
+        print(f"[THREAD] Preverified report {report['PR_report_id']} verified as {report_status} (verification ID {verification_id}).")
+        return True
+    except Exception:
+        if conn: conn.rollback()
+        raise
+    finally:
+        if cursor: cursor.close()
+        if conn: conn.close()
+
+def fetch_claimed_media(report, owner, model, model_version):
+    """
+    DESC: Fetches a claimed report's media and looks up a cached prediction for it. Returns (blob, checksum,
+    prediction): blob is None if the report was marked failed or could not be fetched, checksum is None without a
+    prediction cache, and prediction is None on a cache miss. Both verification engines go through this.
+    """
+    try:
+        blob = fetch_report_media_blob(report)
+    except Exception as e:
+        # Possibly transient; the report is claimed again once its lease expires.
+        print(f"[THREAD] Could not fetch the BLOB of report {report['PR_report_id']}: {str(e)}")
+        return None, None, None
+    if not blob or not isinstance(blob, (bytes, bytearray)):
+        verification_claims.fail(report["PR_report_id"], owner, "no valid BLOB data")
+        return None, None, None
+
+    if not prediction_cache:
+        return blob, None, None
+    # Legacy rows migrated without a checksum are the only ones hashed here.
+    checksum = report.get("MS_checksum") or hashlib.sha256(blob).hexdigest()
+    return blob, checksum, prediction_cache.get(prediction_cache_key(checksum, model_version, model.DETECTION_THRESHOLD))
+
+def decode_claimed_clip(model, report, blob, owner, out=None):
+    """DESC: Decodes a claimed report's media into a clip, marking the report failed and returning None if it cannot be."""
+    try:
+        clip = decode_report_clip(model, report, blob, out)
+    except Exception as e:
+        verification_claims.fail(report["PR_report_id"], owner, f"media failed to decode ({str(e)})")
+        return None
+    if clip is None:
+        verification_claims.fail(report["PR_report_id"], owner, "media decoded to an unexpected shape")
+    return clip
+
+def collect_verification_batch(model, model_version, owner, batch_size, max_wait, poll_interval=0.5, buffer=None):
+    """
+    DESC: Claims and decodes reports until `batch_size` clips are ready or `max_wait` seconds have passed
+    since the first clip was decoded. With `buffer` (from model.allocate_batch), the i-th clip is decoded
+    straight into buffer[i]. Reports whose media already has a cached prediction for this model
+    version are not decoded. Returns (reports, clips, cache_keys, cached), where `cached` holds
+    (report, prediction) pairs; all are empty when nothing is queued. Reports whose media is missing or
+    fails to decode are marked failed rather than left to be retried.
+    """
+    reports, clips, cache_keys, cached = [], [], [], []
+    deadline = None
+
+    # Cache hits count toward the batch so their claims are recorded well before the lease runs out.
+    while len(clips) + len(cached) < batch_size and automated_verification_enabled.is_set():
+        wanted = batch_size - len(clips) - len(cached)
+        sequence = verification_wakeup.sequence
+        rows = verification_claims.claim(owner, wanted)
+        for report in rows:
+            blob, checksum, prediction = fetch_claimed_media(report, owner, model, model_version)
+            if blob is None:
+                continue
+            if prediction is not None:
+                cached.append((report, prediction))
+                continue
+
+            clip = decode_claimed_clip(model, report, blob, owner, None if buffer is None else buffer[len(clips)])
+            if clip is None:
+                continue
+            reports.append(report)
+            clips.append(clip)
+            cache_keys.append(prediction_cache_key(checksum, model_version, model.DETECTION_THRESHOLD) if checksum else None)
+
+        if len(clips) + len(cached) >= batch_size:
+            break
+        if len(rows) == wanted:
+            # More reports may already be waiting; claim them without sleeping.
+            continue
+        if not clips:
+            break
+
+        if deadline is None:
+            deadline = time.monotonic() + max_wait
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        verification_wakeup.wait(sequence, min(poll_interval, remaining))
+
+    return reports, clips, cache_keys, cached
+
+def release_verification_claims(claims, reason):
+    """DESC: Hands a failed batch's claims, given as (report, owner) pairs, back to the queue without counting an attempt."""
+    by_owner = {}
+    for report, owner in claims:
+        by_owner.setdefault(owner, []).append(report["PR_report_id"])
+    for owner, report_ids in by_owner.items():
+        try:
+            verification_claims.release(report_ids, owner, reason)
+        except Exception as e:
+            # The leases still run out, so the reports are requeued later rather than lost.
+            print(f"[THREAD] Could not requeue reports {report_ids}: {str(e)}")
+
+def load_hermes_model(version):
+    """DESC: Builds and warms up a deployed HermesModel version. TensorFlow is imported here, not at server startup."""
+    from model.src.inference import HermesModel
+    return HermesModel(
+        model_registry.path_for(version),
+        backend=app.config["HERMES_MODEL_BACKEND"],
+        num_threads=app.config["HERMES_INTRA_OP_THREADS"],
+        inter_op_threads=app.config["HERMES_INTER_OP_THREADS"]
+    )
+
+model_registry = ModelRegistry(app.config["HERMES_MODEL_DIR"])
+model_holder = ModelHolder(
+    load_hermes_model,
+    app.config["HERMES_MODEL_VERSION"] or model_registry.active_version() or app.config["HERMES_DEFAULT_MODEL_VERSION"],
+    on_swap=model_registry.set_active_version
+)
+verification_model_lock = threading.Lock()
+
+def start_background_verification():
+    print(f"[THREAD] Booting up verification background check with ML on {threading.current_thread().name}!")
+
+    owner = claim_owner_id()
+
+    batch_size = app.config["VERIFICATION_BATCH_SIZE"]
+    # Clips are decoded straight into this buffer, which is handed to the model without stacking or copying.
+    # Allocated from the first model that loads, so a failed initial load does not end the thread.
+    batch_buffer = None
+    max_wait = app.config["VERIFICATION_BATCH_MAX_WAIT"]
+    min_backoff = app.config["VERIFICATION_IDLE_BACKOFF_MIN"]
+    max_backoff = app.config["VERIFICATION_IDLE_BACKOFF_MAX"]
 
     with app.app_context():
         i = 1 # Iteration counter!
+        backoff = min_backoff
         while True: 
-            if automated_verification_enabled.is_set():
-                print(f"[THREAD] Iteration {i} started!")
-                conn, cursor = None, None
-                try: 
-                    conn = mysql.connect()
-                    cursor = conn.cursor(pms_DictCursor)
-
-                    query = "SELECT * FROM preverified_reports WHERE PR_verified = 0 ORDER BY PR_report_id ASC LIMIT 5"
-                    cursor.execute(query) 
-                    five_pr_reports = cursor.fetchall()
-
-                    if not five_pr_reports:
-                        print("[THREAD] No preverified reports left to verify. Sleeping...")
-                        time.sleep(interval)
-                        i += 1
-                        continue
-
-                    print(f"[THREAD] Found {len(five_pr_reports)} preverified reports to verify.")
-
-                    # Function to save blob to file
-                    def save_blob_to_file(report, blob, output_dir="tmp/media"):
-                            
-                            os.makedirs(output_dir, exist_ok=True)
-                        
-                            if report["PR_video"]:
-                                ext = ".mp4"
-                                filename = f"report_{report['PR_report_id']}_video{ext}"
-                            else:
-                                ext = ".jpg"
-                                filename = f"report_{report['PR_report_id']}_image{ext}"
-                            filepath = os.path.join(output_dir, filename)
-                            
-                            with open(filepath, "wb") as f:
-                                f.write(blob)
-                            return filepath
-                            
-
-                    for report in five_pr_reports:
-                        if automated_verification_enabled.is_set():
-                            # dalawa lang naman yan
-                            media_type = report["PR_video"] or report["PR_image"]
-                            media_info = get_one_media_file_details({"MS_media_id": media_type})
-
-                            blob_response = get_one_media_file_blob({"MS_media_id": media_type})
-
-                            # response type debugging
-                            if isinstance(blob_response, tuple):
-                                resp_obj, status_code = blob_response
-                                if isinstance(resp_obj, Response):
-                                    try:
-                                        data = resp_obj.get_json(force=True, silent=True)
-                                        if data and "error" in data:
-                                            print(f"[THREAD] Error fetching BLOB for report {report['PR_report_id']}: {data['error']}")
-                                            continue
-                                        blob = resp_obj.get_data()
-                                    except Exception:
-                                        blob = resp_obj.get_data()
-                                else:
-                                    print(f"[THREAD] Error fetching BLOB for report {report['PR_report_id']}: {resp_obj}")
-                                    continue
-                            elif isinstance(blob_response, Response):
-                                try:
-                                    data = blob_response.get_json(force=True, silent=True)
-                                    if data and "error" in data:
-                                        print(f"[THREAD] Error fetching BLOB for report {report['PR_report_id']}: {data['error']}")
-                                        continue
-                                    blob = blob_response.get_data()
-                                except Exception:
-                                    blob = blob_response.get_data()
-                            else:
-                                blob = blob_response
-
-                            if not blob or not isinstance(blob, (bytes, bytearray)):
-                                print(f"[THREAD] No valid BLOB data found for report {report['PR_report_id']}")
-                                continue
-
-                            file_path = save_blob_to_file(report, blob)
-                            if not file_path:
-                                print(f"[THREAD] Failed to save BLOB data for report {report['PR_report_id']}")
-                                continue    
-
-                            # prediction area
-                            prediction_output = model.predict_from_path(file_path)
-                            print(f"[THREAD] Prediction output for report {report['PR_report_id']}")
-
-                            if prediction_output is None:
-                                print(f"[THREAD] No prediction output for report {report['PR_report_id']}")
-                                continue
-
-                            # Update SQL with the output 
-                            fire_detected = prediction_output.get("fire_detected")
-                            confidence_percentage = prediction_output.get("confidence_percentage")
-                            fire_type = prediction_output.get("fire_type") 
-                            severity_level = prediction_output.get("severity_level")
-                            spread_potential = prediction_output.get("spread_potential")
-
-                            tuple_outputs = (fire_detected, confidence_percentage, fire_type, severity_level, spread_potential)
-                            print(f"Predictions: {tuple_outputs}")
-
-                            # Case 1: If fire is detected
-                            if tuple_outputs[0] == True:
-                                add_new_postverified = add_postverified_report({
-                                    "VR_report_id": report["PR_report_id"],
-                                    "VR_detected": tuple_outputs[0],
-                                    "VR_confidence_score": tuple_outputs[1],
-                                    "VR_fire_type": tuple_outputs[2],
-                                    "VR_severity_level": tuple_outputs[3],
-                                    "VR_spread_potential": tuple_outputs[4],
-                                    "VR_verification_timestamp": datetime.now(philippines_timezone).strftime("%Y-%m-%d %H:%M:%S")
-                                })
-
-                                response_obj = add_new_postverified[0]  
-                                response_json = response_obj.get_data(as_text=True)  
-                                response_dict = json.loads(response_json)            
-
-                                verification_id = response_dict.get("verification_id")
-                                print(f"Verification ID: {verification_id}")
-
-                                pr_update_status = "verified" if tuple_outputs[0] else "false_alarm"
-                                result = update_preverified_report({
-                                    "PR_report_id": report["PR_report_id"],
-                                    "PR_verified": 1,
-                                    "PR_report_status": pr_update_status
-                                })
-
-                                if isinstance(result, tuple):
-                                    upd_pr_response, upd_pr_code = result
-                                else:
-                                    upd_pr_response = result
-                                    upd_pr_code = getattr(result, "status_code", None)
-
-                                if upd_pr_code is None or not (200 <= upd_pr_code < 300):
-                                    try:
-                                        error_msg = upd_pr_response.get_data(as_text=True)
-                                    except Exception:
-                                        error_msg = str(upd_pr_response)
-                                    print(f"[THREAD] Failed to update preverified report {report['PR_report_id']}: {error_msg}")
-                                else:
-                                    print(f"[THREAD] Preverified report {report['PR_report_id']} updated successfully!")
-
-                                    print("Validation notification sent to frontend! Validation is complete.")
-                                    
-                            # Case 2: If fire is not detected
-                            else: 
-                                add_new_postverified = add_postverified_report({
-                                    "VR_report_id": report["PR_report_id"],
-                                    "VR_detected": tuple_outputs[0],
-                                    "VR_confidence_score": tuple_outputs[1],
-                                    "VR_verification_timestamp": datetime.now(philippines_timezone).strftime("%Y-%m-%d %H:%M:%S")
-                                }) 
-                                
-                                response_obj = add_new_postverified[0]  
-                                response_json = response_obj.get_data(as_text=True)  
-                                response_dict = json.loads(response_json)            
-
-                                verification_id = response_dict.get("verification_id")
-                                print(f"Verification ID: {verification_id}")
-
-                                pr_update_status = "verified" if tuple_outputs[0] else "false_alarm"
-                                result = update_preverified_report({
-                                    "PR_report_id": report["PR_report_id"],
-                                    "PR_verified": 1,
-                                    "PR_report_status": pr_update_status
-                                })
-
-                                if isinstance(result, tuple):
-                                    upd_pr_response, upd_pr_code = result
-                                else:
-                                    upd_pr_response = result
-                                    upd_pr_code = getattr(result, "status_code", None)
-
-                                if upd_pr_code is None or not (200 <= upd_pr_code < 300):
-                                    try:
-                                        error_msg = upd_pr_response.get_data(as_text=True)
-                                    except Exception:
-                                        error_msg = str(upd_pr_response)
-                                    print(f"[THREAD] Failed to update preverified report {report['PR_report_id']}: {error_msg}")
-                                else: 
-                                    print(f"[THREAD] Preverified report {report['PR_report_id']} updated successfully!")
-                                
-                                    print("Validation is complete! No fire detected.")
-                    
-                    # Push notification for newly validated reports
+            # Read before looking for work so a report committed meanwhile still wakes us.
+            sequence = verification_wakeup.sequence
+
+            if not automated_verification_enabled.is_set():
+                verification_wakeup.wait(sequence, max_backoff)
+                continue
+
+            try:
+                verification_claims.requeue_expired()
+                # Fetched per batch so a hot-swapped model takes over at the next batch.
+                model, model_version = model_holder.get_versioned()
+                if batch_buffer is None:
+                    batch_buffer = model.allocate_batch(batch_size)
+                reports, clips, cache_keys, cached = collect_verification_batch(
+                    model, model_version, owner, batch_size, max_wait, buffer=batch_buffer
+                )
+
+                for report, prediction_output in cached:
+                    try:
+                        record_verification_result(report, prediction_output, owner)
+                    except Exception as e:
+                        print(f"[THREAD] Failed to record verification for report {report['PR_report_id']}: {str(e)}")
+                if cached:
+                    print(f"[THREAD] Verified {len(cached)} report(s) from the prediction cache.")
                     queue_newly_validated_notification()
 
-                except Exception as e:
-                    print(f"[THREAD] Error during iteration {i}: {str(e)}")
-                    time.sleep(interval)
-                    i += 1
+                if not clips and cached:
+                    backoff = min_backoff
                     continue
-                finally:
-                    if cursor: cursor.close()
-                    if conn: conn.close()
+                if not clips:
+                    # Idle: sleep until an upload wakes us, backing off while nothing arrives.
+                    if verification_wakeup.wait(sequence, backoff):
+                        backoff = min_backoff
+                    else:
+                        backoff = min(backoff * 2, max_backoff)
+                    continue
+
+                backoff = min_backoff
+                print(f"[THREAD] Iteration {i} started with {len(clips)} reports!")
 
-                print(f"[THREAD] Iteration {i} finished!")
-                time.sleep(interval) 
+                # prediction area: one forward pass for the whole batch
+                started = time.perf_counter()
+                try:
+                    with verification_model_lock:
+                        prediction_outputs = model.predict_batch(batch_buffer[:len(clips)])
+                except Exception as e:
+                    release_verification_claims([(report, owner) for report in reports], f"inference failed ({str(e)})")
+                    raise
+                elapsed = time.perf_counter() - started
+                batch_inference_latency.record(elapsed)
+                print(f"[THREAD] Predicted {len(clips)} reports in {elapsed * 1000:.1f}ms")
+
+                for report, prediction_output, cache_key in zip(reports, prediction_outputs, cache_keys):
+                    if cache_key:
+                        prediction_cache.put(cache_key, prediction_output)
+                    try:
+                        record_verification_result(report, prediction_output, owner)
+                    except Exception as e:
+                        print(f"[THREAD] Failed to record verification for report {report['PR_report_id']}: {str(e)}")
+
+                # Push notification for newly validated reports
+                queue_newly_validated_notification()
+
+            except ModelNotReady as e:
+                # The load failed; keep waiting, since a version can still be loaded through /models/load.
+                print(f"[THREAD] {threading.current_thread().name} waiting for the model: {str(e)}")
+                time.sleep(max_backoff)
+                continue
+            except Exception as e:
+                print(f"[THREAD] Error during iteration {i}: {str(e)}")
+                time.sleep(max_backoff)
                 i += 1
+                continue
+
+            print(f"[THREAD] Iteration {i} finished!")
+            i += 1
+
+def start_verification_workers(workers=1):
+    """DESC: Starts `workers` verification threads. Reports are claimed, so workers in other processes can run alongside."""
+    for n in range(workers):
+        threading.Thread(
+            target=start_background_verification, daemon=True, name=f"VerificationWorker-{n + 1}"
+        ).start()
+
+verification_pipeline = None
+
+def make_verification_fetch_stage(batch_size, min_backoff, max_backoff):
+    """
+    DESC: Builds the pipeline's source stage. It claims only as many reports as the decode queue has room
+    for, so claimed reports do not sit in queues while their leases run out. Media with a cached prediction
+    goes straight to the write stage; the rest goes to the decode stage.
+    """
+    backoff = min_backoff
+
+    def fetch(pipeline):
+        nonlocal backoff
+        # Read before looking for work so a report committed meanwhile still wakes us.
+        sequence = verification_wakeup.sequence
+
+        if not automated_verification_enabled.is_set():
+            pipeline.idle(verification_wakeup.wait, sequence, max_backoff)
+            return 0
+
+        verification_claims.requeue_expired()
+        model, model_version = pipeline.idle(model_holder.get_versioned)
+
+        limit = min(batch_size, pipeline.free_slots("decode"))
+        if limit == 0:
+            pipeline.idle(time.sleep, min_backoff)
+            return 0
+
+        owner = claim_owner_id()
+        rows = verification_claims.claim(owner, limit)
+        if not rows:
+            # Idle: sleep until an upload wakes us, backing off while nothing arrives.
+            if pipeline.idle(verification_wakeup.wait, sequence, backoff):
+                backoff = min_backoff
+            else:
+                backoff = min(backoff * 2, max_backoff)
+            return 0
+
+        backoff = min_backoff
+        for report in rows:
+            blob, checksum, prediction = fetch_claimed_media(report, owner, model, model_version)
+            if blob is None:
+                continue
+            if prediction is not None:
+                pipeline.emit("write", (report, prediction, owner))
+                continue
+            pipeline.emit("decode", (report, blob, checksum, owner))
+        return len(rows)
+
+    return fetch
+
+def verification_decode_stage(item, pipeline):
+    """DESC: Decodes one report's media into a clip for the inference stage."""
+    report, blob, checksum, owner = item
+    clip = decode_claimed_clip(model_holder.get(), report, blob, owner)
+    if clip is None:
+        return
+    pipeline.emit("infer", (report, clip, checksum, owner))
+
+def make_verification_infer_stage(batch_size):
+    """DESC: Builds the inference stage, which runs each batch of decoded clips in one forward pass."""
+    batch_buffer = None
+
+    def infer(items, pipeline):
+        nonlocal batch_buffer
+        try:
+            # Fetched per batch so a hot-swapped model takes over at the next batch.
+            model, model_version = model_holder.get_versioned()
+            if batch_buffer is None:
+                batch_buffer = model.allocate_batch(batch_size)
+            for i, (_, clip, _, _) in enumerate(items):
+                batch_buffer[i] = clip
+
+            started = time.perf_counter()
+            with verification_model_lock:
+                prediction_outputs = model.predict_batch(batch_buffer[:len(items)])
+        except Exception as e:
+            # The batch is dropped, so its claims are handed back now instead of when their leases run out.
+            release_verification_claims([(report, owner) for report, _, _, owner in items], f"inference failed ({str(e)})")
+            pipeline.idle(time.sleep, 1)
+            raise
+        elapsed = time.perf_counter() - started
+        batch_inference_latency.record(elapsed)
+        print(f"[THREAD] Predicted {len(items)} reports in {elapsed * 1000:.1f}ms")
+
+        for (report, _, checksum, owner), prediction_output in zip(items, prediction_outputs):
+            if checksum and prediction_cache:
+                prediction_cache.put(
+                    prediction_cache_key(checksum, model_version, model.DETECTION_THRESHOLD), prediction_output
+                )
+            pipeline.emit("write", (report, prediction_output, owner))
+
+    return infer
+
+def verification_write_stage(items, pipeline):
+    """DESC: Records a batch of predictions and sends one notification for it."""
+    recorded = 0
+    for report, prediction_output, owner in items:
+        try:
+            recorded += record_verification_result(report, prediction_output, owner)
+        except Exception as e:
+            print(f"[THREAD] Failed to record verification for report {report['PR_report_id']}: {str(e)}")
+
+    # Push notification for newly validated reports
+    if recorded:
+        queue_newly_validated_notification()
+
+def start_verification_pipeline():
+    """DESC: Starts the staged verification engine; see VERIFICATION_ENGINE in config.py."""
+    global verification_pipeline
+    batch_size = app.config["VERIFICATION_BATCH_SIZE"]
+
+    verification_pipeline = (
+        Pipeline("VerificationPipeline")
+        .add_stage("fetch", make_verification_fetch_stage(
+            batch_size, app.config["VERIFICATION_IDLE_BACKOFF_MIN"], app.config["VERIFICATION_IDLE_BACKOFF_MAX"]
+        ), source=True)
+        .add_stage("decode", verification_decode_stage,
+                   workers=app.config["VERIFICATION_DECODE_WORKERS"], queue_size=app.config["VERIFICATION_DECODE_QUEUE_SIZE"])
+        .add_stage("infer", make_verification_infer_stage(batch_size),
+                   queue_size=2 * batch_size, batch_size=batch_size, max_wait=app.config["VERIFICATION_BATCH_MAX_WAIT"])
+        .add_stage("write", verification_write_stage, queue_size=2 * batch_size, batch_size=batch_size)
+    )
+    verification_pipeline.start()
+    print(f"[THREAD] Verification pipeline started with {app.config['VERIFICATION_DECODE_WORKERS']} decode workers.")
+
+def start_upload_session_cleanup(interval=600):
+    """DESC: Periodically removes abandoned resumable upload sessions and stale ingest jobs."""
+    print("[THREAD] Booting up upload session cleanup!")
+    while True:
+        try:
+            removed = upload_sessions.collect_garbage()
+            if removed:
+                print(f"[THREAD] Removed {removed} abandoned upload session(s).")
+            removed = ingest_jobs.collect_garbage()
+            if removed:
+                print(f"[THREAD] Removed {removed} stale ingest job(s).")
+        except Exception as e:
+            print(f"[THREAD] Error during upload session cleanup: {str(e)}")
+        time.sleep(interval)
 
 ### === BOILERPLATE CODE ===
 if __name__ == "__main__":
-    threading.Thread(target=start_background_verification, daemon=True, kwargs={"interval": 5}, name="VerificationThread").start()
+    model_holder.start()
+    if app.config["VERIFICATION_ENGINE"] == "pipeline":
+        start_verification_pipeline()
+    else:
+        start_verification_workers(app.config["VERIFICATION_WORKERS"])
+    threading.Thread(target=start_upload_session_cleanup, daemon=True, kwargs={"interval": app.config["MEDIA_UPLOAD_GC_INTERVAL"]}, name="UploadCleanupThread").start()
     # Threading runs twice if debug=True!
     app.run(debug=False, host="0.0.0.0", port=5821)
     
\ No newline at end of file
@@ -0,0 +1,102 @@
+import argparse
+
+import pymysql.cursors
+
+from app import pool, media_store
+
+"""
+TITLE: Media Storage Migration Script
+
+Moves media bytes still held in the `media_storage.MS_file_data` LONGBLOB into the
+configured media store, filling in MS_storage_key, MS_file_size and MS_checksum
+and clearing the blob. Rows are migrated in batches, one blob in memory at a
+time, and each batch is committed on its own so the script can be stopped and
+re-run safely.
+
+Usage (from the server directory):
+    python migrate_media.py --batch-size 20
+    python migrate_media.py --dry-run
+"""
+
+pms_DictCursor = pymysql.cursors.DictCursor
+
+SCHEMA_UPGRADE = [
+    "ALTER TABLE media_storage ADD COLUMN IF NOT EXISTS MS_storage_key varchar(255) DEFAULT NULL",
+    "ALTER TABLE media_storage ADD COLUMN IF NOT EXISTS MS_file_size bigint(20) DEFAULT NULL",
+    "ALTER TABLE media_storage ADD COLUMN IF NOT EXISTS MS_checksum char(64) DEFAULT NULL",
+    "CREATE INDEX IF NOT EXISTS MS_checksum ON media_storage (MS_checksum)",
+]
+
+def upgrade_schema():
+    """DESC: Adds the storage columns to databases created from apollo_db_v1.0.3.sql or earlier."""
+    conn, cursor = None, None
+    try:
+        conn = pool.connect()
+        cursor = conn.cursor()
+        for statement in SCHEMA_UPGRADE:
+            cursor.execute(statement)
+        conn.commit()
+    finally:
+        if cursor: cursor.close()
+        if conn: conn.close()
+
+def migrate_batch(batch_size, dry_run=False):
+    """DESC: Migrates up to `batch_size` legacy rows. Returns the number of rows handled."""
+    conn, cursor = None, None
+    try:
+        conn = pool.connect()
+        cursor = conn.cursor(pms_DictCursor)
+
+        cursor.execute("""
+            SELECT MS_media_id
+            FROM media_storage
+            WHERE MS_storage_key IS NULL AND MS_file_data IS NOT NULL
+            ORDER BY MS_media_id ASC
+            LIMIT %s
+        """, (batch_size,))
+        media_ids = [row["MS_media_id"] for row in cursor.fetchall()]
+
+        for media_id in media_ids:
+            cursor.execute("SELECT MS_file_data FROM media_storage WHERE MS_media_id = %s", (media_id,))
+            blob = cursor.fetchone()["MS_file_data"]
+
+            if dry_run:
+                print(f"[MIGRATE] Would move media {media_id} ({len(blob)} bytes)")
+                continue
+
+            storage_key, file_size, checksum = media_store.put_bytes(blob)
+            cursor.execute("""
+                UPDATE media_storage
+                SET MS_storage_key = %s, MS_file_size = %s, MS_checksum = %s, MS_file_data = NULL
+                WHERE MS_media_id = %s
+            """, (storage_key, file_size, checksum, media_id))
+            print(f"[MIGRATE] Moved media {media_id} ({file_size} bytes) -> {storage_key}")
+
+        conn.commit()
+        return len(media_ids)
+    except Exception:
+        if conn: conn.rollback()
+        raise
+    finally:
+        if cursor: cursor.close()
+        if conn: conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Move media_storage blobs into the media store.")
+    parser.add_argument("--batch-size", type=int, default=20, help="Rows migrated and committed per batch.")
+    parser.add_argument("--dry-run", action="store_true", help="List the next batch of rows that would be migrated without changing anything.")
+    args = parser.parse_args()
+
+    upgrade_schema()
+
+    total = 0
+    while True:
+        migrated = migrate_batch(args.batch_size, dry_run=args.dry_run)
+        total += migrated
+        if args.dry_run or migrated < args.batch_size:
+            break
+
+    print(f"[MIGRATE] Done. {total} media row(s) {'pending' if args.dry_run else 'migrated'}.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import argparse
+
+from app import pool
+
+"""
+TITLE: Verification Claim Migration Script
+
+Adds the claim columns used by the verification workers (PR_claim_status,
+PR_claim_owner, PR_lease_expires_at, PR_claim_attempts) to databases created from
+apollo_db_v1.0.4.sql or earlier. Reports that are already verified are marked
+`done`; everything else starts out `queued`. Safe to run more than once.
+
+Usage (from the server directory):
+    python migrate_verification.py
+    python migrate_verification.py --requeue-all
+"""
+
+SCHEMA_UPGRADE = [
+    "ALTER TABLE preverified_reports ADD COLUMN IF NOT EXISTS PR_claim_status enum('queued','processing','done','failed') NOT NULL DEFAULT 'queued'",
+    # Databases migrated before reports could fail have the enum without 'failed'.
+    "ALTER TABLE preverified_reports MODIFY COLUMN PR_claim_status enum('queued','processing','done','failed') NOT NULL DEFAULT 'queued'",
+    "ALTER TABLE preverified_reports ADD COLUMN IF NOT EXISTS PR_claim_owner varchar(128) DEFAULT NULL",
+    "ALTER TABLE preverified_reports ADD COLUMN IF NOT EXISTS PR_lease_expires_at datetime DEFAULT NULL",
+    "ALTER TABLE preverified_reports ADD COLUMN IF NOT EXISTS PR_claim_attempts int(11) NOT NULL DEFAULT 0",
+    "CREATE INDEX IF NOT EXISTS PR_claim ON preverified_reports (PR_verified, PR_claim_status, PR_report_id)",
+    "UPDATE preverified_reports SET PR_claim_status = 'done' WHERE PR_verified = 1 AND PR_claim_status = 'queued'",
+]
+
+REQUEUE_ALL = """
+    UPDATE preverified_reports
+    SET PR_claim_status = 'queued', PR_claim_owner = NULL, PR_lease_expires_at = NULL
+    WHERE PR_verified = 0 AND PR_claim_status = 'processing'
+"""
+
+def upgrade_schema(requeue_all=False):
+    """DESC: Adds the claim columns and index. With `requeue_all`, also releases every outstanding claim."""
+    conn, cursor = None, None
+    try:
+        conn = pool.connect()
+        cursor = conn.cursor()
+        for statement in SCHEMA_UPGRADE:
+            cursor.execute(statement)
+        if requeue_all:
+            cursor.execute(REQUEUE_ALL)
+            print(f"[MIGRATE] Requeued {cursor.rowcount} claimed report(s).")
+        conn.commit()
+    finally:
+        if cursor: cursor.close()
+        if conn: conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Add verification claim columns to preverified_reports.")
+    parser.add_argument("--requeue-all", action="store_true", help="Release every claim still held, e.g. after all workers were stopped.")
+    args = parser.parse_args()
+
+    upgrade_schema(requeue_all=args.requeue_all)
+    print("[MIGRATE] Done. preverified_reports has the verification claim columns.")
+
+if __name__ == "__main__":
+    main()
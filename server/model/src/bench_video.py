@@ -0,0 +1,122 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+import cv2
+import numpy as np
+from model.src.load import SAMPLING_MODES, load_csv, load_video
+
+"""
+TITLE: Hermes Video Sampling Benchmark
+
+Times every frame sampling mode of load_video() on the same clips and reports how far each mode's frames
+are from the 'seek' mode, which is how load_video() has always sampled.
+
+TABLE OF CONTENTS:
+1. Functions
+   - write_synthetic_clip : Writes a long synthetic clip for benchmarking.
+   - benchmark_sampling : Times each sampling mode on a list of videos.
+   - main : Command line entry point.
+
+Usage (from the server directory):
+    python -m model.src.bench_video --videos model/data/raw/video/fire/fire1.avi
+    python -m model.src.bench_video --csv model/data/labels.csv --limit 20
+    python -m model.src.bench_video --synthetic-seconds 120
+"""
+
+def write_synthetic_clip(path, seconds=60, fps=30, size=(1280, 720)):
+    """
+    Writes an MPEG-4 clip whose frames all differ, so a frame sampled from the wrong position is visible in
+    the pixel difference.
+
+    Args:
+        path (str): Where to write the clip.
+        seconds (int, optional): Clip length. Defaults to 60.
+        fps (int, optional): Frame rate. Defaults to 30.
+        size (tuple, optional): Frame (width, height). Defaults to (1280, 720).
+
+    Returns:
+        str: The path of the written clip.
+    """
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, size)
+    if not writer.isOpened():
+        raise ValueError(f"Could not open a video writer for {path}")
+    for i in range(seconds * fps):
+        frame = np.full((size[1], size[0], 3), (i * 7) % 256, dtype=np.uint8)
+        cv2.putText(frame, str(i), (size[0] // 10, size[1] // 2), cv2.FONT_HERSHEY_SIMPLEX, 6, (255, 255, 255), 8)
+        writer.write(frame)
+    writer.release()
+    return path
+
+def benchmark_sampling(video_paths, modes=SAMPLING_MODES, runs=3, num_frames=3):
+    """
+    Times load_video() in each sampling mode.
+
+    Args:
+        video_paths (list): Paths of the videos to sample.
+        modes (tuple, optional): Sampling modes to compare. Defaults to every mode.
+        runs (int, optional): Timed runs per video and mode; the fastest is kept. Defaults to 3.
+        num_frames (int, optional): Frames sampled per clip. Defaults to 3.
+
+    Returns:
+        dict: Per mode, the mean and total milliseconds per clip, the speedup over 'seek', and the mean
+        absolute pixel difference from the frames 'seek' returns.
+    """
+    timings = {mode: [] for mode in modes}
+    diffs = {mode: [] for mode in modes}
+
+    for path in video_paths:
+        reference = load_video(path, num_frames, mode='seek')
+        for mode in modes:
+            best = None
+            for _ in range(runs):
+                started = time.perf_counter()
+                frames = load_video(path, num_frames, mode=mode)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            timings[mode].append(best)
+            diffs[mode].append(float(np.mean(np.abs(frames - reference))) if frames.shape == reference.shape else None)
+
+    report = {}
+    for mode in modes:
+        mean_ms = float(np.mean(timings[mode])) * 1000
+        valid_diffs = [d for d in diffs[mode] if d is not None]
+        report[mode] = {
+            'clips': len(timings[mode]),
+            'mean_ms': round(mean_ms, 1),
+            'total_ms': round(float(np.sum(timings[mode])) * 1000, 1),
+            'mean_abs_diff_vs_seek': round(float(np.mean(valid_diffs)), 4) if valid_diffs else None,
+        }
+    if 'seek' in report:
+        for mode in modes:
+            report[mode]['speedup_vs_seek'] = round(report['seek']['mean_ms'] / report[mode]['mean_ms'], 2)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the frame sampling modes of load_video().")
+    parser.add_argument("--videos", nargs="*", default=[], help="Video files to benchmark.")
+    parser.add_argument("--csv", help="labels.csv whose video rows are benchmarked.")
+    parser.add_argument("--limit", type=int, default=20, help="Maximum number of videos taken from --csv.")
+    parser.add_argument("--synthetic-seconds", type=int, help="Also benchmark a synthetic 720p clip of this length.")
+    parser.add_argument("--modes", nargs="*", choices=SAMPLING_MODES, default=list(SAMPLING_MODES))
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    videos = list(args.videos)
+    if args.csv:
+        df = load_csv(args.csv)
+        videos += [path for path in df['file_path'] if 'video' in path][:args.limit]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.synthetic_seconds:
+            videos.append(write_synthetic_clip(os.path.join(tmp_dir, 'synthetic.mp4'), args.synthetic_seconds))
+        if not videos:
+            parser.error("Nothing to benchmark; pass --videos, --csv or --synthetic-seconds.")
+
+        report = benchmark_sampling(videos, args.modes, args.runs)
+
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
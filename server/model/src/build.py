@@ -1,7 +1,7 @@
 import os
 import tensorflow as tf
 from keras import layers, Model
-from model.src.load import load_csv, load_image, load_video, generate_csv
+from model.src.load import load_csv, build_dataset
 
 # Define the model architecture
 def create_model(image_shape, num_frames):
@@ -68,9 +68,9 @@ def main():
     # Load the data
     labels_df = load_csv('data/labels.csv')
 
-    # Create the data generators
-    train_generator = generate_csv(labels_df, batch_size=32)
-    validation_generator = generate_csv(labels_df, batch_size=32)
+    # Create the input pipelines
+    train_generator = build_dataset(labels_df, batch_size=32)
+    validation_generator = build_dataset(labels_df, batch_size=32, shuffle=False)
 
     # Create the model
     model = create_model((224, 224, 3), 3)
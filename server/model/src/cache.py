@@ -0,0 +1,265 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import tensorflow as tf
+from model.src.load import encode_labels, load_clip, load_csv, resolve_data_path, shard_dataset
+from model.src.preprocess import CLIP_SHAPE
+
+"""
+TITLE: Hermes Preprocessed Clip Cache
+
+Decodes every clip in labels.csv once and stores the result as uint8 frames in memory-mappable .npy shards,
+so training reads tensors instead of re-decoding every JPEG and re-seeking every video each epoch.
+
+LAYOUT (inside the cache directory):
+- manifest.json         : The cached clips, each keyed by its CSV file_path and recorded with the file's
+                          mtime and size, the shard it lives in, and its row within that shard; and the
+                          number of rows in every shard.
+- shard-XXXXX.npy       : uint8 arrays of shape (rows, 3, 224, 224, 3). Shards are never modified once written.
+
+INVALIDATION:
+Running the build again only decodes rows whose file is new or whose mtime or size changed; those go into
+new shards. Shards where fewer than half of the rows are still current are rewritten. Only clips are cached;
+labels are encoded from labels.csv when the dataset is built, so label edits need no rebuild.
+
+TABLE OF CONTENTS:
+1. Classes
+   - ClipCache : Read access to a built cache.
+2. Functions
+   - file_key : The mtime and size of a source file, which decide whether its cached entry is current.
+   - build_cache : Builds or incrementally updates a cache for a labels.csv.
+   - build_cached_dataset : tf.data pipeline over a cache, the zero-decode counterpart of build_dataset.
+   - main : Command line entry point.
+
+Usage (from the model directory):
+    python -m model.src.cache --csv data/labels.csv --cache data/cache
+"""
+
+MANIFEST_VERSION = 1
+
+def file_key(file_path):
+    """Returns the (mtime_ns, size) pair that decides whether a cached entry for a source file is current."""
+    st = os.stat(resolve_data_path(file_path))
+    return st.st_mtime_ns, st.st_size
+
+def _read_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, 'manifest.json')) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    if manifest.get('version') != MANIFEST_VERSION or tuple(manifest.get('clip_shape', ())) != CLIP_SHAPE:
+        return None
+    return manifest
+
+def _write_json(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+def _write_shard(cache_dir, shard_id, file_paths, workers, source=None):
+    """
+    Writes one shard, decoding each file straight into its row of a memory-mapped .npy file.
+
+    With `source` (a function returning the cached clip for a file path), rows are copied from older shards
+    instead of being decoded again.
+    """
+    name = f'shard-{shard_id:05d}.npy'
+    tmp_path = os.path.join(cache_dir, name + '.tmp')
+    shard = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.uint8, shape=(len(file_paths),) + CLIP_SHAPE)
+
+    def fill(row):
+        if source is not None:
+            shard[row] = source(file_paths[row])
+        else:
+            load_clip(file_paths[row], out=shard[row])
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(fill, range(len(file_paths))))
+
+    shard.flush()
+    del shard
+    os.replace(tmp_path, os.path.join(cache_dir, name))
+    return name
+
+def build_cache(csv_path, cache_dir, shard_size=256, workers=4):
+    """
+    Builds the cache for a labels.csv, or brings an existing one up to date.
+
+    Args:
+        csv_path (str): Path to labels.csv.
+        cache_dir (str): Directory holding the cache. Created if needed.
+        shard_size (int, optional): Clips per shard. Defaults to 256.
+        workers (int, optional): Decoding threads; OpenCV releases the GIL while decoding. Defaults to 4.
+
+    Returns:
+        dict: Counts of the clips reused, decoded, dropped and moved by shard compaction.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    df = load_csv(csv_path)
+    manifest = _read_manifest(cache_dir) or {
+        'version': MANIFEST_VERSION, 'clip_shape': list(CLIP_SHAPE), 'next_shard': 0, 'shards': {}, 'entries': {}
+    }
+    entries = manifest['entries']
+
+    wanted = {}
+    for file_path in dict.fromkeys(df['file_path']):
+        mtime_ns, size = file_key(file_path)
+        wanted[file_path] = {'mtime_ns': mtime_ns, 'size': size}
+
+    current = {
+        path: entry for path, entry in entries.items()
+        if path in wanted and (entry['mtime_ns'], entry['size']) == (wanted[path]['mtime_ns'], wanted[path]['size'])
+    }
+    stale = len(entries) - len(current)
+    to_decode = [path for path in wanted if path not in current]
+
+    # Shards that lost more than half of their rows are rewritten from their remaining current rows.
+    live_rows = {}
+    for path, entry in current.items():
+        live_rows.setdefault(entry['shard'], []).append(path)
+    compact = [name for name, paths in live_rows.items() if len(paths) * 2 < manifest['shards'][name]]
+    to_copy = [path for name in compact for path in live_rows[name]]
+
+    clip_cache = ClipCache(cache_dir, {'entries': current}) if to_copy else None
+    moved = {}
+    for start in range(0, len(to_copy), shard_size):
+        chunk = to_copy[start:start + shard_size]
+        name = _write_shard(cache_dir, manifest['next_shard'], chunk, workers, source=clip_cache.clip)
+        manifest['next_shard'] += 1
+        manifest['shards'][name] = len(chunk)
+        for row, path in enumerate(chunk):
+            moved[path] = {**current[path], 'shard': name, 'row': row}
+    current.update(moved)
+
+    started = time.perf_counter()
+    for start in range(0, len(to_decode), shard_size):
+        chunk = to_decode[start:start + shard_size]
+        name = _write_shard(cache_dir, manifest['next_shard'], chunk, workers)
+        manifest['next_shard'] += 1
+        manifest['shards'][name] = len(chunk)
+        for row, path in enumerate(chunk):
+            current[path] = {**wanted[path], 'shard': name, 'row': row}
+        print(f"[CACHE] Wrote {name} ({len(chunk)} clips)")
+
+    referenced = {entry['shard'] for entry in current.values()}
+    manifest['shards'] = {name: rows for name, rows in manifest['shards'].items() if name in referenced}
+    manifest['entries'] = current
+    _write_json(os.path.join(cache_dir, 'manifest.json'), manifest)
+
+    # Shards no longer referenced by any entry are removed.
+    for name in os.listdir(cache_dir):
+        if name.startswith('shard-') and name.endswith('.npy') and name not in referenced:
+            os.remove(os.path.join(cache_dir, name))
+
+    report = {
+        'clips': len(current),
+        'reused': len(wanted) - len(to_decode),
+        'decoded': len(to_decode),
+        'dropped': stale,
+        'compacted': len(to_copy),
+        'decode_seconds': round(time.perf_counter() - started, 2),
+    }
+    print(f"[CACHE] {json.dumps(report)}")
+    return report
+
+# ClipCache Class
+# Read access to a built cache. Shards are memory-mapped, so looking up a clip
+# reads only its pages from disk and nothing is decoded.
+class ClipCache:
+
+    def __init__(self, cache_dir, manifest=None):
+        self.cache_dir = cache_dir
+        manifest = manifest or _read_manifest(cache_dir)
+        if manifest is None:
+            raise ValueError(f"No clip cache in {cache_dir}; build it with `python -m model.src.cache`")
+        self.entries = manifest['entries']
+        self._shards = {}
+
+    def _shard(self, name):
+        shard = self._shards.get(name)
+        if shard is None:
+            shard = self._shards[name] = np.load(os.path.join(self.cache_dir, name), mmap_mode='r')
+        return shard
+
+    def clip(self, file_path):
+        """Returns the cached uint8 clip of a file, as a read-only memory-mapped view."""
+        entry = self.entries[file_path]
+        return self._shard(entry['shard'])[entry['row']]
+
+    def check(self, file_paths):
+        """Raises ValueError if any file is missing from the cache or has changed since it was cached."""
+        outdated = []
+        for file_path in dict.fromkeys(file_paths):
+            entry = self.entries.get(file_path)
+            if entry is None or (entry['mtime_ns'], entry['size']) != file_key(file_path):
+                outdated.append(file_path)
+        if outdated:
+            raise ValueError(
+                f"{len(outdated)} clip(s) are missing or outdated in {self.cache_dir}, e.g. {outdated[0]}; "
+                "rebuild it with `python -m model.src.cache`"
+            )
+
+    def gather(self, file_paths):
+        """Copies the cached clips of several files into one uint8 batch array."""
+        batch = np.empty((len(file_paths),) + CLIP_SHAPE, dtype=np.uint8)
+        for i, file_path in enumerate(file_paths):
+            batch[i] = self.clip(file_path)
+        return batch
+
+def build_cached_dataset(df, cache_dir, batch_size=8, shuffle=True, confidence_threshold=0.5, seed=None,
+                         drop_remainder=False, shard=None):
+    """
+    Builds the same (X, y) pipeline as build_dataset, reading clips from a cache built by build_cache instead
+    of decoding them. Rows are shuffled and batched as indices first; each batch is then gathered from the
+    memory-mapped shards in one call and normalized to float32 inside the graph.
+
+    Args:
+        df (pandas.DataFrame): DataFrame returned by load_csv; every file in it must be cached and current.
+        cache_dir (str): Directory of the cache.
+        batch_size (int, optional): Number of samples per batch. Defaults to 8.
+        shuffle (bool, optional): Reshuffle the rows every epoch. Defaults to True.
+        confidence_threshold (float, optional): Threshold for fire detection. Defaults to 0.5.
+        seed (int, optional): Shuffle seed. Defaults to None.
+        drop_remainder (bool, optional): Drop the last partial batch. Defaults to False.
+        shard (tuple, optional): (num_shards, index) to keep only this worker's share of the rows, chosen after
+            shuffling and before decoding. Every worker must pass the same seed. Defaults to None.
+
+    Returns:
+        tf.data.Dataset: Yields (X, y) exactly like build_dataset.
+    """
+    clip_cache = ClipCache(cache_dir)
+    clip_cache.check(df['file_path'])
+
+    file_paths = df['file_path'].to_numpy().astype(str)
+    labels = {key: tf.constant(value) for key, value in encode_labels(df, confidence_threshold).items()}
+
+    dataset = tf.data.Dataset.range(len(df))
+    if shuffle:
+        dataset = dataset.shuffle(len(df), seed=seed, reshuffle_each_iteration=True)
+    dataset = shard_dataset(dataset, shard, shuffle, seed)
+    dataset = dataset.batch(batch_size, drop_remainder=drop_remainder)
+
+    def gather(indices):
+        clips = tf.numpy_function(lambda i: clip_cache.gather(file_paths[i]), [indices], tf.uint8, stateful=False)
+        clips.set_shape((None,) + CLIP_SHAPE)
+        return tf.cast(clips, tf.float32) / 255.0, {key: tf.gather(value, indices) for key, value in labels.items()}
+
+    dataset = dataset.map(gather, num_parallel_calls=tf.data.AUTOTUNE, deterministic=not shuffle)
+    return dataset.prefetch(tf.data.AUTOTUNE)
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode labels.csv once into memory-mappable uint8 clip shards.")
+    parser.add_argument("--csv", default="data/labels.csv", help="labels.csv to cache.")
+    parser.add_argument("--cache", default="data/cache", help="Cache directory.")
+    parser.add_argument("--shard-size", type=int, default=256, help="Clips per shard.")
+    parser.add_argument("--workers", type=int, default=4, help="Decoding threads.")
+    args = parser.parse_args()
+    build_cache(args.csv, args.cache, args.shard_size, args.workers)
+
+if __name__ == "__main__":
+    main()
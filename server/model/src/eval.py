@@ -1,5 +1,5 @@
 import tensorflow as tf
-from model.src.load import load_csv, generate_csv
+from model.src.load import load_csv, build_dataset
 import numpy as np
 from sklearn.metrics import classification_report, confusion_matrix
 import seaborn as sns
@@ -11,10 +11,10 @@ def evaluate_model(model_path, csv_path):
     
     # Load test data
     df = load_csv(csv_path)
-    test_gen = generate_csv(df, batch_size=8)
+    test_ds = build_dataset(df, batch_size=8, shuffle=False)
     
     # Evaluate
-    results = model.evaluate(test_gen, steps=len(df)//8)
+    results = model.evaluate(test_ds)
     print(f"Test Loss: {results[0]}")
     print(f"Fire Detection Accuracy: {results[6]}")
     print(f"Type Classification Accuracy: {results[7]}")
@@ -26,14 +26,13 @@ def evaluate_model(model_path, csv_path):
     y_true = {'fire_detected': [], 'type_num': [], 'severity_num': [], 'spread_num': []}
     y_pred = {'fire_detected': [], 'type_num': [], 'severity_num': [], 'spread_num': []}
     
-    for i, (X_batch, y_batch) in enumerate(test_gen):
-        if i >= len(df)//8:
-            break
+    for X_batch, y_batch in test_ds:
         preds = model.predict(X_batch, verbose=0)
         
+        # The model has dictionary outputs, so predict() returns a dict keyed by output name.
         for key in y_true.keys():
             y_true[key].extend(y_batch[key].numpy())
-            y_pred[key].extend(preds[list(y_batch.keys()).index(key)])
+            y_pred[key].extend(preds[key])
     
     # Convert to numpy arrays
     for key in y_true.keys():
@@ -0,0 +1,215 @@
+import argparse
+import json
+import os
+import tensorflow as tf
+import numpy as np
+from model.src.load import load_clip, load_csv
+from model.src.model import FrameExtractor
+
+"""
+TITLE: Hermes Model Export Script
+
+Converts a trained Keras build into a TensorFlow Lite artifact for CPU-only inference servers, and
+reports how far the converted model's predictions drift from the float model's.
+
+QUANTIZATION MODES:
+- none    : Float32 TFLite graph, no quantization.
+- float16 : Weights stored as float16.
+- dynamic : Dynamic-range quantization. Weights are int8, activations are quantized on the fly.
+- int8    : Full integer quantization calibrated on a representative dataset drawn from labels.csv.
+            Inputs and outputs stay float32, so HermesModel feeds it the same clips as the Keras model.
+
+TABLE OF CONTENTS:
+1. Functions
+   - load_clip_for_row : Loads the model input clip for one labels.csv row.
+   - representative_dataset : Calibration generator for int8 quantization.
+   - export_tflite : Converts a .keras build into a .tflite artifact.
+   - accuracy_delta_report : Compares the TFLite artifact against the float model.
+   - main : Command line entry point.
+
+Usage (from the server directory):
+    python -m model.src.export --model model/models/deployed/HermesSavedBuild_20250530-155556.keras --quantization dynamic
+    python -m model.src.export --model model/models/deployed/HermesSavedBuild_20250530-155556.keras --quantization int8 --csv model/data/labels.csv
+"""
+
+QUANTIZATION_MODES = ('none', 'float16', 'dynamic', 'int8')
+
+def load_clip_for_row(row):
+    """
+    Loads the model input clip for one labels.csv row, the same way build_dataset does.
+
+    Args:
+        row (pandas.Series): A row of the dataframe returned by load_csv.
+
+    Returns:
+        numpy.ndarray: float32 array of shape (3, 224, 224, 3).
+    """
+    return load_clip(row['file_path'])
+
+def representative_dataset(df, num_samples=100, seed=42):
+    """
+    Builds the calibration generator the TFLite converter uses to pick int8 ranges.
+
+    Args:
+        df (pandas.DataFrame): Dataframe returned by load_csv.
+        num_samples (int, optional): Number of rows sampled for calibration. Defaults to 100.
+        seed (int, optional): Sampling seed, so repeated exports calibrate on the same rows. Defaults to 42.
+
+    Returns:
+        callable: A generator function yielding single-sample input lists of shape (1, 3, 224, 224, 3).
+    """
+    sample = df.sample(min(num_samples, len(df)), random_state=seed)
+
+    def generator():
+        for _, row in sample.iterrows():
+            try:
+                clip = load_clip_for_row(row)
+            except ValueError as e:
+                print(f"[EXPORT] Skipping {row['file_path']}: {e}")
+                continue
+            if clip.shape == (3, 224, 224, 3):
+                yield [np.expand_dims(clip, axis=0).astype(np.float32)]
+
+    return generator
+
+def export_tflite(model_path, output_path=None, quantization='dynamic', csv_path=None, num_samples=100):
+    """
+    Converts a trained Keras build into a TFLite artifact.
+
+    Args:
+        model_path (str): Path to the .keras build.
+        output_path (str, optional): Where to write the artifact. Defaults to `<build>.<quantization>.tflite`
+            next to the build.
+        quantization (str, optional): One of 'none', 'float16', 'dynamic' or 'int8'. Defaults to 'dynamic'.
+        csv_path (str, optional): labels.csv used for int8 calibration. Required for 'int8'.
+        num_samples (int, optional): Calibration samples for 'int8'. Defaults to 100.
+
+    Returns:
+        str: The path of the written artifact.
+    """
+    if quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization '{quantization}'; expected one of {QUANTIZATION_MODES}")
+    if quantization == 'int8' and not csv_path:
+        raise ValueError("int8 quantization needs a labels CSV for the representative dataset")
+
+    if output_path is None:
+        output_path = f"{os.path.splitext(model_path)[0]}.{quantization}.tflite"
+
+    model = tf.keras.models.load_model(model_path, custom_objects={'FrameExtractor': FrameExtractor})
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+
+    # The Bidirectional LSTM can need TF ops that have no TFLite builtin; the full TensorFlow
+    # interpreter HermesModel uses ships the Flex delegate that runs them.
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS, tf.lite.OpsSet.SELECT_TF_OPS]
+    converter._experimental_lower_tensor_list_ops = False
+
+    if quantization != 'none':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == 'float16':
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == 'int8':
+        converter.representative_dataset = representative_dataset(load_csv(csv_path), num_samples)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8, tf.lite.OpsSet.SELECT_TF_OPS]
+
+    tflite_model = converter.convert()
+    with open(output_path, 'wb') as f:
+        f.write(tflite_model)
+
+    size_mb = len(tflite_model) / (1024 * 1024)
+    print(f"[EXPORT] Wrote {output_path} ({size_mb:.1f}MB, quantization={quantization})")
+    return output_path
+
+def accuracy_delta_report(model_path, tflite_path, csv_path, num_samples=200, seed=7, report_path=None):
+    """
+    Runs the float Keras model and the TFLite artifact on the same labelled samples and summarizes the drift.
+
+    Args:
+        model_path (str): Path to the .keras build.
+        tflite_path (str): Path to the exported .tflite artifact.
+        csv_path (str): labels.csv to draw the samples from.
+        num_samples (int, optional): Number of rows compared. Defaults to 200.
+        seed (int, optional): Sampling seed. Defaults to 7.
+        report_path (str, optional): Where to write the JSON report. Defaults to `<artifact>.report.json`.
+
+    Returns:
+        dict: Agreement rates between the two models, mean absolute output differences, and each model's
+        fire detection accuracy against the labels.
+    """
+    from model.src.inference import HermesModel
+
+    float_model = HermesModel(model_path, dedupe_frames=False)
+    lite_model = HermesModel(tflite_path, backend='tflite')
+
+    df = load_csv(csv_path)
+    sample = df.sample(min(num_samples, len(df)), random_state=seed)
+
+    agree = {'fire_detected': 0, 'fire_type': 0, 'severity_level': 0, 'spread_potential': 0}
+    abs_diff = {'fire_detected': [], 'confidence_score': []}
+    correct = {'float': 0, 'tflite': 0}
+    compared = 0
+
+    for _, row in sample.iterrows():
+        try:
+            clip = load_clip_for_row(row)
+        except ValueError as e:
+            print(f"[EXPORT] Skipping {row['file_path']}: {e}")
+            continue
+        if clip.shape != (3, 224, 224, 3):
+            continue
+
+        expected = row['confidence_score'] >= 0.5
+        float_result = float_model.predict_batch([clip])[0]
+        lite_result = lite_model.predict_batch([clip])[0]
+        compared += 1
+
+        for key in agree:
+            agree[key] += float_result.get(key) == lite_result.get(key)
+        for key in abs_diff:
+            abs_diff[key].append(abs(float(float_result['raw_output'][key]) - float(lite_result['raw_output'][key])))
+        correct['float'] += float_result['fire_detected'] == expected
+        correct['tflite'] += lite_result['fire_detected'] == expected
+
+    if compared == 0:
+        raise ValueError("No samples could be loaded for the accuracy report")
+
+    report = {
+        'model': model_path,
+        'tflite': tflite_path,
+        'samples': compared,
+        'agreement': {key: round(count / compared, 4) for key, count in agree.items()},
+        'mean_abs_diff': {key: round(float(np.mean(values)), 6) for key, values in abs_diff.items()},
+        'fire_detection_accuracy': {key: round(count / compared, 4) for key, count in correct.items()},
+    }
+    report['fire_detection_accuracy']['delta'] = round(
+        report['fire_detection_accuracy']['tflite'] - report['fire_detection_accuracy']['float'], 4
+    )
+
+    report_path = report_path or f"{tflite_path}.report.json"
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"[EXPORT] Accuracy delta report written to {report_path}")
+    print(json.dumps(report, indent=2))
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a Hermes Keras build to TensorFlow Lite for CPU inference.")
+    parser.add_argument("--model", required=True, help="Path to the .keras build.")
+    parser.add_argument("--output", help="Output .tflite path. Defaults to <build>.<quantization>.tflite.")
+    parser.add_argument("--quantization", choices=QUANTIZATION_MODES, default="dynamic")
+    parser.add_argument("--csv", help="labels.csv for int8 calibration and the accuracy report.")
+    parser.add_argument("--calibration-samples", type=int, default=100)
+    parser.add_argument("--report-samples", type=int, default=200)
+    parser.add_argument("--no-report", action="store_true", help="Skip the accuracy delta report.")
+    args = parser.parse_args()
+
+    tflite_path = export_tflite(args.model, args.output, args.quantization, args.csv, args.calibration_samples)
+
+    if args.no_report:
+        return
+    if not args.csv:
+        print("[EXPORT] No --csv given; skipping the accuracy delta report.")
+        return
+    accuracy_delta_report(args.model, tflite_path, args.csv, args.report_samples)
+
+if __name__ == "__main__":
+    main()
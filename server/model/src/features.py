@@ -0,0 +1,167 @@
+import hashlib
+import os
+import numpy as np
+import tensorflow as tf
+from model.src.cache import ClipCache, file_key
+from model.src.load import encode_labels, load_clip, shard_dataset
+from model.src.preprocess import CLIP_SHAPE, allocate_batch, normalize_batch
+
+"""
+TITLE: Hermes Backbone Feature Cache
+
+Supports head-only training: the EfficientNetV2B0 backbone is frozen, its embedding of every frame is
+computed once and stored, and only the temporal and multi-task head layers (see split_hybrid_model) are
+trained on the stored vectors. One epoch over the cached features then costs about as much as a forward
+pass of the head, rather than a forward and backward pass of the backbone over every frame.
+
+The cache is a single .npz file holding, per source file, its (frames, features) embeddings plus the mtime
+and size they were computed from. It also stores a fingerprint of the backbone's weights, so embeddings
+from different weights are never mixed; rows whose file did not change are reused on the next run.
+
+TABLE OF CONTENTS:
+1. Functions
+   - backbone_fingerprint : Hashes the weights of a backbone.
+   - extract_features : Runs the backbone over the frames of a list of files.
+   - cache_features : Returns the embeddings of every row of a DataFrame, computing only the missing ones.
+   - build_feature_dataset : tf.data pipeline of (embeddings, labels) for training the head.
+"""
+
+def backbone_fingerprint(backbone):
+    """
+    Hashes a backbone's name, dtype policy and weights; embeddings computed with a different fingerprint are
+    discarded.
+
+    Args:
+        backbone (tf.keras.Model): The backbone returned by split_hybrid_model.
+
+    Returns:
+        str: A SHA-256 hex digest.
+    """
+    digest = hashlib.sha256(f"{backbone.name}:{backbone.dtype_policy.name}".encode())
+    for weight in backbone.weights:
+        digest.update(np.ascontiguousarray(weight.numpy()).tobytes())
+    return digest.hexdigest()
+
+def extract_features(backbone, file_paths, batch_size=16, clip_cache=None):
+    """
+    Runs the backbone over every frame of the given files in inference mode.
+
+    Args:
+        backbone (tf.keras.Model): The backbone returned by split_hybrid_model.
+        file_paths (list): Image or video paths, as in labels.csv.
+        batch_size (int, optional): Clips per backbone call. Defaults to 16.
+        clip_cache (ClipCache, optional): Reads the clips from a preprocessed cache instead of decoding them. The
+            caller checks that the files are current, see ClipCache.check.
+
+    Returns:
+        numpy.ndarray: float32 embeddings of shape (len(file_paths), frames, features).
+    """
+    num_frames = CLIP_SHAPE[0]
+    features = None
+    buffer = allocate_batch(batch_size, num_frames, dtype=np.uint8)
+
+    for start in range(0, len(file_paths), batch_size):
+        chunk = file_paths[start:start + batch_size]
+        for i, file_path in enumerate(chunk):
+            if clip_cache is not None:
+                buffer[i] = clip_cache.clip(file_path)
+            else:
+                load_clip(file_path, out=buffer[i])
+
+        frames = normalize_batch(buffer[:len(chunk)]).reshape((-1,) + CLIP_SHAPE[1:])
+        embeddings = backbone(frames, training=False).numpy().reshape(len(chunk), num_frames, -1)
+        if features is None:
+            features = np.empty((len(file_paths),) + embeddings.shape[1:], dtype=np.float32)
+        features[start:start + len(chunk)] = embeddings
+        print(f"[FEATURES] Embedded {start + len(chunk)}/{len(file_paths)} clips")
+
+    return features
+
+def cache_features(df, backbone, features_path, batch_size=16, clip_cache_dir=None):
+    """
+    Returns the backbone embeddings of every row of a DataFrame, reusing those stored in `features_path`
+    for files that have not changed since and for the same backbone weights, and storing the rest.
+
+    Args:
+        df (pandas.DataFrame): DataFrame returned by load_csv.
+        backbone (tf.keras.Model): The backbone returned by split_hybrid_model.
+        features_path (str): The .npz file holding the cached embeddings. Created if needed.
+        batch_size (int, optional): Clips per backbone call. Defaults to 16.
+        clip_cache_dir (str, optional): Preprocessed clip cache to read missing clips from; every missing file
+            must be cached and current in it.
+
+    Returns:
+        numpy.ndarray: float32 embeddings of shape (len(df), frames, features), aligned with the rows of `df`.
+    """
+    fingerprint = backbone_fingerprint(backbone)
+    file_paths = list(dict.fromkeys(df['file_path']))
+    keys = {file_path: file_key(file_path) for file_path in file_paths}
+
+    # Rows of files outside `df` are kept, so the training and validation splits can share one file.
+    rows = {}
+    try:
+        with np.load(features_path) as stored:
+            if str(stored['fingerprint']) == fingerprint:
+                for file_path, mtime_ns, size, embedding in zip(
+                    stored['file_path'], stored['mtime_ns'], stored['size'], stored['features']
+                ):
+                    rows[str(file_path)] = ((int(mtime_ns), int(size)), embedding)
+    except (FileNotFoundError, KeyError, ValueError):
+        pass
+
+    cached = {
+        file_path: rows[file_path][1] for file_path in file_paths
+        if file_path in rows and rows[file_path][0] == keys[file_path]
+    }
+    missing = [file_path for file_path in file_paths if file_path not in cached]
+    print(f"[FEATURES] {len(cached)} cached, {len(missing)} to embed")
+    if missing:
+        clip_cache = None
+        if clip_cache_dir:
+            clip_cache = ClipCache(clip_cache_dir)
+            # An outdated clip would be stored under the file's new mtime and size and never recomputed.
+            clip_cache.check(missing)
+        for file_path, embedding in zip(missing, extract_features(backbone, missing, batch_size, clip_cache)):
+            cached[file_path] = embedding
+            rows[file_path] = (keys[file_path], embedding)
+
+        os.makedirs(os.path.dirname(os.path.abspath(features_path)), exist_ok=True)
+        # Workers of a multi-worker run may write at once; each writes its own temporary file.
+        tmp_path = f'{features_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                fingerprint=fingerprint,
+                file_path=np.array(list(rows)),
+                mtime_ns=np.array([key[0] for key, _ in rows.values()], dtype=np.int64),
+                size=np.array([key[1] for key, _ in rows.values()], dtype=np.int64),
+                features=np.stack([embedding for _, embedding in rows.values()]),
+            )
+        os.replace(tmp_path, features_path)
+
+    return np.stack([cached[file_path] for file_path in df['file_path']])
+
+def build_feature_dataset(features, df, batch_size=32, shuffle=True, confidence_threshold=0.5, seed=None,
+                          drop_remainder=False, shard=None):
+    """
+    Builds an (embeddings, labels) pipeline for training the head returned by split_hybrid_model.
+
+    Args:
+        features (numpy.ndarray): Embeddings aligned with the rows of `df`, as returned by cache_features.
+        df (pandas.DataFrame): DataFrame returned by load_csv.
+        batch_size (int, optional): Number of samples per batch. Defaults to 32.
+        shuffle (bool, optional): Reshuffle the rows every epoch. Defaults to True.
+        confidence_threshold (float, optional): Threshold for fire detection. Defaults to 0.5.
+        seed (int, optional): Shuffle seed. Defaults to None.
+        drop_remainder (bool, optional): Drop the last partial batch. Defaults to False.
+        shard (tuple, optional): (num_shards, index) to keep only this worker's share of the rows, chosen after
+            shuffling and before decoding. Every worker must pass the same seed. Defaults to None.
+
+    Returns:
+        tf.data.Dataset: Yields (embeddings, labels) with the same label dictionary as build_dataset.
+    """
+    dataset = tf.data.Dataset.from_tensor_slices((features, encode_labels(df, confidence_threshold)))
+    if shuffle:
+        dataset = dataset.shuffle(len(df), seed=seed, reshuffle_each_iteration=True)
+    dataset = shard_dataset(dataset, shard, shuffle, seed)
+    return dataset.batch(batch_size, drop_remainder=drop_remainder).prefetch(tf.data.AUTOTUNE)
@@ -1,12 +1,13 @@
 
 import pprint
-import tempfile
-import cv2
+import time
+from collections import deque
 import tensorflow as tf
 import keras
 import numpy as np
-from model.src.load import load_image, load_video
-from model.src.model import FrameExtractor
+from model.src.load import decode_clip, load_clip
+from model.src.preprocess import CLIP_SHAPE, allocate_batch, normalize_batch
+from model.src.model import FrameExtractor, split_hybrid_model
 
 """
 Hermes Fire Detection Inference Module
@@ -18,37 +19,262 @@ and from binary blob data (such as uploaded files or streamed data).
 Classes:
     HermesModel: Loads a Keras model and provides methods to predict fire presence,
     type, severity, and spread potential from images or videos.
+    TFLiteRunner: Runs a TensorFlow Lite export (see export.py) behind the same interface,
+    selected with HermesModel(..., backend='tflite') or a .tflite model path.
 
 Example usage:
     model = HermesModel('models/deployed/HermesSavedBuild_20250530-155556.keras')
     result = model.predict_from_path('data/raw/img/no_fire/WEB11315.jpg')
     result_blob = model.predict_from_blob(blob_data, content_type='image/jpeg')
+    results = model.predict_batch([model.load_clip(path) for path in paths])
+    lite_model = HermesModel('models/deployed/HermesSavedBuild_20250530-155556.dynamic.tflite')
 """
 
+def configure_threads(intra_op_threads=None, inter_op_threads=None):
+    """
+    Sizes TensorFlow's CPU thread pools. Only takes effect before TensorFlow runs its first op.
+
+    Args:
+        intra_op_threads (int, optional): Threads used inside a single op (e.g. a convolution). None keeps the default.
+        inter_op_threads (int, optional): Threads used to run independent ops in parallel. None keeps the default.
+    """
+    try:
+        if intra_op_threads:
+            tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+        if inter_op_threads:
+            tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+    except RuntimeError as e:
+        print(f"[HERMES] TensorFlow is already initialized; keeping its current thread pools ({e})")
+
+def serving_function(model):
+    """
+    Traces a Keras model once into a fixed-signature tf.function, skipping the data adapter, callbacks and
+    step machinery Keras predict() sets up on every call.
+
+    Args:
+        model (tf.keras.Model): The model to serve. Its input_shape (with a None batch dimension) becomes the signature.
+
+    Returns:
+        callable: Takes a numpy batch and returns the model outputs as numpy arrays, in the model's output structure.
+    """
+    @tf.function(input_signature=[tf.TensorSpec(model.input_shape, tf.float32)])
+    def serve(inputs):
+        return model(inputs, training=False)
+
+    serve.get_concrete_function()
+
+    def run(batch):
+        outputs = serve(tf.convert_to_tensor(batch, dtype=tf.float32))
+        return tf.nest.map_structure(lambda tensor: tensor.numpy(), outputs)
+
+    return run
+
+class TFLiteRunner:
+    """
+    Runs a TFLite export through the TensorFlow Lite interpreter, exposing the same predict_on_batch()
+    interface and output dict as the Keras model. Not thread-safe; callers serialize predictions.
+    """
+
+    def __init__(self, model_path, num_threads=None):
+        self.interpreter = tf.lite.Interpreter(model_path=model_path, num_threads=num_threads)
+        self.runner = self.interpreter.get_signature_runner()
+        self.input_name = next(iter(self.runner.get_input_details()))
+
+    def predict_on_batch(self, batch):
+        # The signature runner resizes the input tensor when the batch size changes.
+        return self.runner(**{self.input_name: np.asarray(batch, dtype=np.float32)})
+
 class HermesModel:
-    def __init__(self, model_path, DETECTION_THRESHOLD=0.5):
-        self.model = tf.keras.models.load_model(model_path, custom_objects={'FrameExtractor': FrameExtractor}
+    def __init__(self, model_path, DETECTION_THRESHOLD=0.5, dedupe_frames=True, backend=None, num_threads=None,
+                 inter_op_threads=None, warmup=True):
+        configure_threads(num_threads, inter_op_threads)
+
+        # backend is 'keras' or 'tflite'; by default it follows the model file's extension.
+        self.backend = backend or ('tflite' if model_path.endswith('.tflite') else 'keras')
+        if self.backend == 'tflite':
+            self.model = TFLiteRunner(model_path, num_threads=num_threads)
+            self._run_model = self.model.predict_on_batch
+        elif self.backend == 'keras':
+            self.model = tf.keras.models.load_model(model_path, custom_objects={'FrameExtractor': FrameExtractor}
 )
+            self._run_model = serving_function(self.model)
+        else:
+            raise ValueError(f"Unknown backend '{self.backend}'; expected 'keras' or 'tflite'")
+
+        # With dedupe_frames, repeated frames (still images are stacked three times) only go through
+        # the CNN backbone once; see predict_batch().
+        self.backbone, self.head = None, None
+        if dedupe_frames and self.backend == 'keras':
+            try:
+                self.backbone, self.head = split_hybrid_model(self.model)
+                self._run_backbone = serving_function(self.backbone)
+                self._run_head = serving_function(self.head)
+            except (StopIteration, ValueError) as e:
+                self.backbone, self.head = None, None
+                print(f"[HERMES] Frame deduplication disabled; could not split the model: {e}")
         self.type_map = {0: 'small', 1: 'medium', 2: 'large', 3: 'none'}
         self.severity_map = {0: 'mild', 1: 'moderate', 2: 'severe', 3: 'none'}
         self.spread_map = {0: 'low', 1: 'medium', 2: 'high', 3: 'none'}
         self.DETECTION_THRESHOLD = DETECTION_THRESHOLD
+
+        # Latencies, in seconds, of the last 1000 single-clip predictions.
+        self._latencies = deque(maxlen=1000)
+        if warmup:
+            self.warmup()
+
+    def warmup(self):
+        """Runs one image-like and one video-like clip so kernels are initialized before the first real request."""
+        still = np.zeros((3, 224, 224, 3), dtype=np.float32)
+        moving = np.random.default_rng(0).random((3, 224, 224, 3), dtype=np.float32)
+        self.predict_batch([still])
+        self.predict_batch([moving])
+        self._latencies.clear()
+
+    def latency_stats(self):
+        """
+        Summarizes the latency of recent single-clip predictions (decoding excluded).
+
+        Returns:
+            dict: count, p50_ms, p99_ms and mean_ms over the last 1000 single-clip calls.
+        """
+        samples = np.array(self._latencies) * 1000
+        if len(samples) == 0:
+            return {'count': 0}
+        return {
+            'count': len(samples),
+            'p50_ms': round(float(np.percentile(samples, 50)), 2),
+            'p99_ms': round(float(np.percentile(samples, 99)), 2),
+            'mean_ms': round(float(samples.mean()), 2),
+        }
+
+    def benchmark(self, runs=100, still=False):
+        """
+        Measures single-clip prediction latency on synthetic input.
+
+        Args:
+            runs (int, optional): Number of timed predictions. Defaults to 100.
+            still (bool, optional): Use an image-like clip (three identical frames) instead of a video-like one.
+
+        Returns:
+            dict: The latency_stats() of the timed runs.
+        """
+        frame = np.random.default_rng(1).random((224, 224, 3), dtype=np.float32)
+        clip = np.stack([frame] * 3) if still else np.random.default_rng(2).random((3, 224, 224, 3), dtype=np.float32)
+        self._latencies.clear()
+        for _ in range(runs):
+            self.predict_batch([clip])
+        stats = self.latency_stats()
+        self._latencies.clear()
+        return stats
     
+    def load_clip(self, file_path, out=None):
+        """
+        Decodes an image or video file into a single model input clip.
+
+        Args:
+            file_path (str): Path to an image (.png/.jpg/.jpeg) or video file.
+            out (numpy.ndarray, optional): Slot of a buffer from allocate_batch() to decode into.
+
+        Returns:
+            numpy.ndarray: float32 array of shape (3, 224, 224, 3). Images are repeated across the three frames.
+        """
+        return load_clip(file_path, out)
+
+    def load_clip_from_blob(self, blob_data, content_type=None, out=None):
+        """
+        Decodes an in-memory image or video into a single model input clip, without touching the disk.
+
+        Args:
+            blob_data (bytes): The encoded image or video bytes.
+            content_type (str, optional): MIME type of the blob. When omitted, JPEG/PNG signatures are sniffed.
+            out (numpy.ndarray, optional): Slot of a buffer from allocate_batch() to decode into.
+
+        Returns:
+            numpy.ndarray: float32 array of shape (3, 224, 224, 3), preprocessed exactly like load_clip().
+        """
+        return decode_clip(blob_data, content_type, out)
+
+    @staticmethod
+    def allocate_batch(batch_size, dtype=np.float32):
+        """
+        Preallocates an input buffer for predict_batch(). Decode clips into its slots with the `out` argument
+        of load_clip() or load_clip_from_blob(), then pass the filled part, e.g. buffer[:n], to predict_batch().
+
+        Args:
+            batch_size (int): Number of clips the buffer holds.
+            dtype (numpy.dtype, optional): np.float32, or np.uint8 for a buffer a quarter of the size. Defaults to np.float32.
+
+        Returns:
+            numpy.ndarray: Uninitialized array of shape (batch_size, 3, 224, 224, 3).
+        """
+        return allocate_batch(batch_size, dtype=dtype)
+
     def predict_from_path(self, file_path):
-        if file_path.lower().endswith(('.png', '.jpg', '.jpeg')):
-            frames = np.stack([load_image(file_path)] * 3)  
-        else:
-            frames = load_video(file_path)
-        
-        frames = np.expand_dims(frames, axis=0)
-
-        predictions = self.model.predict(frames)
-        
-        spread_num = predictions['spread_num'][0]
-        severity_num = predictions['severity_num'][0]
-        type_num = predictions['type_num'][0]
-        confidence = predictions['confidence_score'][0][0]
-        fire_detected = predictions['fire_detected'][0][0]
+        return self.predict_batch([self.load_clip(file_path)])[0]
+
+    def predict_batch(self, clips):
+        """
+        Runs a single forward pass over several decoded clips.
+
+        Args:
+            clips (list of numpy.ndarray or numpy.ndarray): Clips of shape (3, 224, 224, 3), e.g. from
+                load_clip(), or a filled buffer from allocate_batch(), which is used without copying.
+
+        Returns:
+            list of dict: One result per clip, in input order, in the same format as predict_from_path().
+        """
+        if len(clips) == 0:
+            return []
+
+        batch = normalize_batch(clips if isinstance(clips, np.ndarray) else np.stack(clips))
+        if batch.shape[1:] != CLIP_SHAPE:
+            raise ValueError(f"Expected clips of shape (3, 224, 224, 3), got {batch.shape[1:]}")
+
+        started = time.perf_counter()
+        predictions = self._predict_deduplicated(batch) if self.head is not None else None
+        if predictions is None:
+            predictions = self._run_model(batch)
+        if len(clips) == 1:
+            self._latencies.append(time.perf_counter() - started)
+        return [self._format_result(predictions, i) for i in range(len(clips))]
+
+    def _predict_deduplicated(self, batch):
+        """
+        Runs the backbone once per unique frame in the batch and feeds the gathered features to the head.
+
+        Args:
+            batch (numpy.ndarray): Clips of shape (N, frames, 224, 224, 3).
+
+        Returns:
+            dict or None: The model outputs, or None when the batch has no repeated frames to save work on.
+        """
+        num_clips, num_frames = batch.shape[:2]
+        unique_frames, frame_index = [], np.empty((num_clips, num_frames), dtype=np.int64)
+
+        for n in range(num_clips):
+            for f in range(num_frames):
+                # Repeats only occur within a clip, so earlier frames of the same clip are the only candidates.
+                for prev in range(f):
+                    if np.array_equal(batch[n, f], batch[n, prev]):
+                        frame_index[n, f] = frame_index[n, prev]
+                        break
+                else:
+                    frame_index[n, f] = len(unique_frames)
+                    unique_frames.append(batch[n, f])
+
+        if len(unique_frames) == num_clips * num_frames:
+            return None
+
+        features = self._run_backbone(np.stack(unique_frames))
+        return self._run_head(features[frame_index])
+
+    def _format_result(self, predictions, i):
+        """Builds the result dict for the i-th item of a batched prediction."""
+        spread_num = predictions['spread_num'][i]
+        severity_num = predictions['severity_num'][i]
+        type_num = predictions['type_num'][i]
+        confidence = predictions['confidence_score'][i][0]
+        fire_detected = predictions['fire_detected'][i][0]
 
         fire_detected_index = 1 if fire_detected > self.DETECTION_THRESHOLD else 0
         confidence_percentage = confidence * 100
@@ -85,76 +311,7 @@ class HermesModel:
     def predict_from_blob(self, blob_data, content_type=None):
         if not isinstance(blob_data, (bytes, bytearray)):
             raise TypeError("blob_data must be bytes-like object")
-    
-        is_image = False
-        if content_type and content_type.startswith('image/'):
-            is_image = True
-        else:
-            if blob_data.startswith(b'\xFF\xD8\xFF'):  
-                is_image = True
-            elif blob_data.startswith(b'\x89PNG'):  
-                is_image = True
-
-        if is_image:
-            img = cv2.imdecode(
-                np.frombuffer(blob_data, dtype=np.uint8),
-                cv2.IMREAD_COLOR
-            )
-            if img is None:
-                raise ValueError("Failed to decode image BLOB")
-            
-            img = cv2.resize(img, (224, 224))
-            frames = np.stack([img] * 3)  
-        else:
-            with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as tmp:
-                tmp.write(blob_data)
-                tmp.flush()
-                frames = load_video(tmp.name)
-                
-                frames = np.array([cv2.resize(frame, (224, 224)) for frame in frames])
-
-        frames = np.expand_dims(frames, axis=0)
-        predictions = self.model.predict(frames)
-        
-        spread_num = predictions['spread_num'][0]
-        severity_num = predictions['severity_num'][0]
-        type_num = predictions['type_num'][0]
-        confidence = predictions['confidence_score'][0][0]
-        fire_detected = predictions['fire_detected'][0][0]
-
-        fire_detected_index = 1 if fire_detected > self.DETECTION_THRESHOLD else 0
-        confidence_percentage = confidence * 100
-
-        type_num_index = np.argmax(type_num)
-        spread_num_index = np.argmax(spread_num)
-        severity_num_index = np.argmax(severity_num)
-
-        fire_type_label = self.type_map[type_num_index]
-        spread_potential_label = self.spread_map[spread_num_index]
-        severity_level_label = self.severity_map[severity_num_index]
-
-        results = {
-            'fire_detected': bool(fire_detected_index),
-            'confidence_percentage': round(confidence_percentage, 2),
-            'raw_output': {
-                'fire_detected': fire_detected,
-                'confidence_score': confidence,
-            }
-        }
-
-        if fire_detected_index:
-            results.update({
-                'fire_type': fire_type_label,
-                'severity_level': severity_level_label,
-                'spread_potential': spread_potential_label,
-                'raw_output': {
-                    'type_num': type_num.tolist(),
-                    'severity_num': severity_num.tolist(),
-                    'spread_num': spread_num.tolist()
-                }
-            })
-
-        return results
+        return self.predict_batch([self.load_clip_from_blob(blob_data, content_type)])[0]
 
 # EXAMPLE USAGE
 if __name__ == "__main__":
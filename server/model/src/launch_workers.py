@@ -0,0 +1,124 @@
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+
+"""
+TITLE: Hermes Local Multi-Worker Launcher
+
+Starts several train.py processes on this machine as one MultiWorkerMirroredStrategy cluster, each with
+its own TF_CONFIG pointing at free localhost ports. This exercises the same code path as a real
+multi-node run (sharded input, all-reduce, chief-only checkpoints) without a second machine.
+Each worker's output is printed with a [WORKER n] prefix. If one worker fails, the others are stopped.
+
+TABLE OF CONTENTS:
+1. Functions
+   - free_ports : Reserves free localhost ports for the workers.
+   - worker_tf_config : Builds the TF_CONFIG of one worker.
+   - launch_workers : Runs the workers and waits for all of them.
+   - main : Command line entry point.
+
+Usage (from the model directory); arguments after `--` are passed to every worker's train.py:
+    python -m model.src.launch_workers --workers 2 -- --epochs 1 --batch-size 4 --intra-op-threads 4
+"""
+
+def free_ports(count):
+    """
+    Finds `count` free TCP ports on localhost.
+
+    Args:
+        count (int): Number of ports.
+
+    Returns:
+        list: Port numbers.
+    """
+    sockets = []
+    try:
+        for _ in range(count):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.bind(('localhost', 0))
+            sockets.append(sock)
+        return [sock.getsockname()[1] for sock in sockets]
+    finally:
+        for sock in sockets:
+            sock.close()
+
+def worker_tf_config(addresses, index):
+    """
+    Builds the TF_CONFIG of one worker of a cluster with no separate chief; worker 0 acts as chief.
+
+    Args:
+        addresses (list): "host:port" of every worker.
+        index (int): This worker's position in `addresses`.
+
+    Returns:
+        str: The JSON value of the TF_CONFIG environment variable.
+    """
+    return json.dumps({'cluster': {'worker': addresses}, 'task': {'type': 'worker', 'index': index}})
+
+def _forward_output(process, index):
+    for line in process.stdout:
+        print(f"[WORKER {index}] {line}", end='', flush=True)
+
+def launch_workers(num_workers, train_args):
+    """
+    Runs `num_workers` train.py processes as one cluster and waits for them to exit.
+
+    Args:
+        num_workers (int): Number of worker processes.
+        train_args (list): Arguments passed to every worker's train.py, after `--strategy multi_worker`.
+
+    Returns:
+        int: 0 if every worker succeeded, otherwise the first non-zero exit code.
+    """
+    addresses = [f'localhost:{port}' for port in free_ports(num_workers)]
+    processes, readers = [], []
+    for index in range(num_workers):
+        env = dict(os.environ, TF_CONFIG=worker_tf_config(addresses, index))
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'model.src.train', '--strategy', 'multi_worker', *train_args],
+            env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+        )
+        reader = threading.Thread(target=_forward_output, args=(process, index), daemon=True)
+        reader.start()
+        processes.append(process)
+        readers.append(reader)
+
+    exit_code = 0
+    try:
+        # The other workers would block in the all-reduce forever, so the first failure stops everyone.
+        while any(process.poll() is None for process in processes):
+            for index, process in enumerate(processes):
+                if process.poll() not in (None, 0) and exit_code == 0:
+                    exit_code = process.returncode
+                    print(f"[LAUNCHER] Worker {index} exited with {exit_code}; stopping the others")
+                    for other in processes:
+                        if other.poll() is None:
+                            other.terminate()
+            threading.Event().wait(0.5)
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        raise
+    finally:
+        for process in processes:
+            process.wait()
+        for reader in readers:
+            reader.join(timeout=5)
+
+    return exit_code or next((process.returncode for process in processes if process.returncode), 0)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run train.py as a local multi-worker cluster.")
+    parser.add_argument("--workers", type=int, default=2, help="Number of worker processes.")
+    parser.add_argument("train_args", nargs=argparse.REMAINDER, help="Arguments for train.py, after `--`.")
+    args = parser.parse_args()
+
+    train_args = args.train_args[1:] if args.train_args[:1] == ['--'] else args.train_args
+    sys.exit(launch_workers(args.workers, train_args))
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,11 @@
+import io
 import os
+import tempfile
 import cv2
 import numpy as np
 import pandas as pd
 import tensorflow as tf
+from model.src.preprocess import CLIP_SHAPE, resize_rgb, write_frame, write_frames, write_still
 
 def load_csv(csv_path):
     """
@@ -36,30 +39,87 @@ def load_csv(csv_path):
     
     return df
 
-def load_image(image_path, target_size=(224, 224)):
+def load_image(image_path, target_size=(224, 224), out=None):
     """
     Load and preprocess a single image to use for model analysis and inference.
     
     Args: 
         image_path (str): The string of image path file to be loaded. 
         target_size (tuple, optional): Target dimensions (height, width) for resizing. Defaults to (224, 224).
+        out (numpy.ndarray, optional): float32 or uint8 frame buffer to write into. Allocated when omitted.
 
     Returns:
         img (numpy.float32): The image converted into a numpy float32 array. 
     """
-    if not os.path.exists(image_path):
-        image_path = os.path.join('data', image_path) 
+    return write_frame(_read_image(image_path, target_size), _frame_buffer(out, target_size))
+
+def resolve_data_path(file_path):
+    """Returns `file_path` if it exists, otherwise the same path under the 'data' subdirectory."""
+    if not os.path.exists(file_path):
+        return os.path.join('data', file_path)
+    return file_path
+
+def _read_image(image_path, target_size):
+    image_path = resolve_data_path(image_path)
     
     img = cv2.imread(image_path)
     if img is None:
         raise ValueError(f"Could not read image at {image_path}")
-    
-    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)  
-    img = cv2.resize(img, target_size)
-    img = img.astype(np.float32) / 255.0 
-    return img
+    return resize_rgb(img, target_size)
 
-def load_video(video_path, num_frames=3, target_size=(224, 224)):
+def _frame_buffer(out, target_size):
+    if out is None:
+        out = np.empty((target_size[1], target_size[0], 3), dtype=np.float32)
+    return out
+
+def load_clip(file_path, out=None, mode=None):
+    """
+    Decodes an image or video file into a single model input clip.
+
+    Args:
+        file_path (str): Path to an image (.png/.jpg/.jpeg) or video file.
+        out (numpy.ndarray, optional): float32 or uint8 buffer of shape (3, 224, 224, 3), e.g. one slot of
+            preprocess.allocate_batch(). Allocated as float32 when omitted.
+        mode (str, optional): Video frame sampling mode. Defaults to DEFAULT_SAMPLING_MODE.
+
+    Returns:
+        numpy.ndarray: Clip of shape (3, 224, 224, 3). Images are repeated across the three frames.
+    """
+    out = np.empty(CLIP_SHAPE, dtype=np.float32) if out is None else out
+    if file_path.lower().endswith(('.png', '.jpg', '.jpeg')):
+        return write_still(_read_image(file_path, CLIP_SHAPE[1:3]), out)
+    return load_video(file_path, len(out), CLIP_SHAPE[1:3], mode or DEFAULT_SAMPLING_MODE, out=out)
+
+def decode_clip(blob_data, content_type=None, out=None, mode=None):
+    """
+    Decodes an in-memory image or video into a single model input clip, without touching the disk.
+
+    Args:
+        blob_data (bytes): The encoded image or video bytes.
+        content_type (str, optional): MIME type of the blob. When omitted, JPEG/PNG signatures are sniffed.
+        out (numpy.ndarray, optional): float32 or uint8 buffer of shape (3, 224, 224, 3). Allocated as
+            float32 when omitted.
+        mode (str, optional): Video frame sampling mode. Defaults to DEFAULT_SAMPLING_MODE.
+
+    Returns:
+        numpy.ndarray: Clip of shape (3, 224, 224, 3), preprocessed exactly like load_clip().
+    """
+    out = np.empty(CLIP_SHAPE, dtype=np.float32) if out is None else out
+    if is_image_blob(blob_data, content_type):
+        return write_still(_decode_image(blob_data, CLIP_SHAPE[1:3]), out)
+    return decode_video(blob_data, len(out), CLIP_SHAPE[1:3], mode or DEFAULT_SAMPLING_MODE, out=out)
+
+def is_image_blob(blob_data, content_type=None):
+    """Returns True if the blob is an image, going by its MIME type or else its JPEG/PNG signature."""
+    if content_type:
+        return content_type.startswith('image/')
+    return blob_data.startswith(b'\xFF\xD8\xFF') or blob_data.startswith(b'\x89PNG')
+
+# Frame sampling strategies for videos; see read_video_frames().
+SAMPLING_MODES = ('seek', 'sequential', 'time', 'keyframe')
+DEFAULT_SAMPLING_MODE = 'seek'
+
+def load_video(video_path, num_frames=3, target_size=(224, 224), mode=DEFAULT_SAMPLING_MODE, out=None):
     """
     Load and preprocess frames from a video for model input. Extracts evenly spaced frames.
 
@@ -67,82 +127,368 @@ def load_video(video_path, num_frames=3, target_size=(224, 224)):
         video_path (str): Path to the video file. If not found directly, searches in the 'data' subdirectory.
         num_frames (int, optional): Number of frames to extract. Defaults to 3.
         target_size (tuple, optional): Target dimensions (height, width) for resizing. Defaults to (224, 224).
+        mode (str, optional): Frame sampling mode, one of SAMPLING_MODES. Defaults to 'seek'.
+        out (numpy.ndarray, optional): float32 or uint8 buffer of shape (num_frames, height, width, 3) to
+            write into. Allocated as float32 when omitted.
 
     Returns:
         numpy.ndarray: Preprocessed frames as a float32 NumPy array with shape (num_frames, height, width, 3).
     """
 
-    if not os.path.exists(video_path):
-        video_path = os.path.join('data', video_path)
-    
-    cap = cv2.VideoCapture(video_path)
+    video_path = resolve_data_path(video_path)
+
+    return sample_video_frames(
+        lambda params: cv2.VideoCapture(video_path, cv2.CAP_ANY, params),
+        num_frames, target_size, mode, source=video_path, out=out
+    )
+
+def sample_video_frames(open_capture, num_frames=3, target_size=(224, 224), mode=DEFAULT_SAMPLING_MODE, source="video",
+                        out=None):
+    """
+    Opens a video through `open_capture` and extracts preprocessed frames with the given sampling mode.
+
+    Args:
+        open_capture (callable): Takes a list of cv2.VideoCapture open parameters and returns a new capture
+            of the video. Called twice in 'keyframe' mode.
+        num_frames (int, optional): Number of frames to extract. Defaults to 3.
+        target_size (tuple, optional): Target dimensions (height, width) for resizing. Defaults to (224, 224).
+        mode (str, optional): Frame sampling mode, one of SAMPLING_MODES. Defaults to 'seek'.
+        source (str, optional): Name of the video used in error messages.
+        out (numpy.ndarray, optional): Buffer to write the frames into; see load_video().
+
+    Returns:
+        numpy.ndarray: Preprocessed frames as a float32 NumPy array with shape (num_frames, height, width, 3).
+    """
+    if mode not in SAMPLING_MODES:
+        raise ValueError(f"Unknown sampling mode '{mode}'; expected one of {SAMPLING_MODES}")
+
+    frame_indices = None
+    if mode == 'keyframe':
+        frame_indices = find_keyframes(open_capture, num_frames)
+        if frame_indices is None:
+            mode = 'seek'
+
+    cap = open_capture([])
     if not cap.isOpened():
-        raise ValueError(f"Could not open video at {video_path}")
-    
-    frames = []
+        raise ValueError(f"Could not open video at {source}")
+
+    try:
+        if frame_indices is not None:
+            frames = _read_by_seeking(cap, frame_indices, target_size, source)
+        else:
+            frames = _sample_frames(cap, num_frames, target_size, source, mode)
+        return write_frames(frames, out)
+    finally:
+        cap.release()
+
+def read_video_frames(cap, num_frames=3, target_size=(224, 224), source="video", mode=DEFAULT_SAMPLING_MODE, out=None):
+    """
+    Extracts evenly spaced, preprocessed frames from an opened cv2.VideoCapture.
+
+    SAMPLING MODES:
+    - seek       : Seeks to each target frame. Every seek decodes from the keyframe before the target, so the
+                   cost is bounded by the GOP length rather than the clip length.
+    - sequential : One pass over the whole clip. Skipped frames are only grab()bed; retrieve() converts just
+                   the target frames. Works on streams that cannot seek.
+    - time       : Targets evenly spaced timestamps instead of frame indices, for variable frame rate
+                   recordings, by seeking with CAP_PROP_POS_MSEC.
+    - keyframe   : Needs a second capture, so it is handled by sample_video_frames(); here it acts like 'seek'.
+
+    CAP_PROP_FRAME_COUNT is only an estimate from the container. When it is missing, or a seek lands past
+    the real end of the clip, the frames are re-read with a sequential pass that finds the real length.
+
+    Args:
+        cap (cv2.VideoCapture): An opened capture. The caller is responsible for releasing it.
+        num_frames (int, optional): Number of frames to extract. Defaults to 3.
+        target_size (tuple, optional): Target dimensions (height, width) for resizing. Defaults to (224, 224).
+        source (str, optional): Name of the video used in error messages.
+        mode (str, optional): Frame sampling mode, one of SAMPLING_MODES. Defaults to 'seek'.
+        out (numpy.ndarray, optional): Buffer to write the frames into; see load_video().
+
+    Returns:
+        numpy.ndarray: Preprocessed frames as a float32 NumPy array with shape (num_frames, height, width, 3).
+    """
+    return write_frames(_sample_frames(cap, num_frames, target_size, source, mode), out)
+
+def _sample_frames(cap, num_frames, target_size, source, mode):
+    """Samples frames as a list of resized RGB uint8 frames; see read_video_frames()."""
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    
-    for i in range(num_frames):
-        frame_pos = min(i * (total_frames // num_frames), total_frames - 1)
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_pos)
+
+    if total_frames <= 0:
+        return _read_sequential(cap, num_frames, None, target_size, source)
+
+    frame_indices = [min(i * (total_frames // num_frames), total_frames - 1) for i in range(num_frames)]
+
+    if mode == 'sequential':
+        return _read_sequential(cap, num_frames, frame_indices, target_size, source)
+
+    if mode == 'time':
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        if fps > 0:
+            duration_ms = total_frames / fps * 1000
+            frames = _read_by_seeking(
+                cap, [i * duration_ms / num_frames for i in range(num_frames)], target_size, source,
+                prop=cv2.CAP_PROP_POS_MSEC, strict=False
+            )
+            if len(frames) == num_frames:
+                return frames
+
+    frames = _read_by_seeking(cap, frame_indices, target_size, source, strict=False)
+    if len(frames) == num_frames:
+        return frames
+
+    # The container overstated the frame count; find the real length with one sequential pass.
+    if not cap.set(cv2.CAP_PROP_POS_FRAMES, 0):
+        raise ValueError(f"No frames extracted from {source}")
+    return _read_sequential(cap, num_frames, None, target_size, source)
+
+def _read_by_seeking(cap, positions, target_size, source, prop=cv2.CAP_PROP_POS_FRAMES, strict=True):
+    """Reads one frame at each position of `prop`. Returns fewer frames than positions unless `strict`."""
+    frames = []
+    for position in positions:
+        cap.set(prop, position)
         ret, frame = cap.read()
         if ret:
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frame = cv2.resize(frame, target_size)
-            frame = frame.astype(np.float32) / 255.0  
-            frames.append(frame)
-    
-    cap.release()
-    
-    if len(frames) == 0:
-        raise ValueError(f"No frames extracted from {video_path}")
-    
-    return np.array(frames)
+            frames.append(resize_rgb(frame, target_size))
+
+    if strict and len(frames) == 0:
+        raise ValueError(f"No frames extracted from {source}")
+    return frames
+
+def _read_sequential(cap, num_frames, frame_indices, target_size, source):
+    """
+    Reads the capture front to back once, decoding every frame with grab() but converting only the ones kept.
 
-def generate_csv(df, batch_size=4, confidence_threshold=0.5):
+    With `frame_indices`, exactly those frames are kept; if the clip ends early, the last kept frame is
+    repeated. Without them the length is unknown, so every `stride`-th frame is kept and the stride doubles
+    whenever more than 16 * num_frames are held; the result is the kept frame nearest to each evenly spaced
+    target.
     """
-    Generates batches of video/image data and multi-task labels from a DataFrame indefinitely.
+    frames = []
+    index = 0
+
+    if frame_indices is not None:
+        wanted = set(frame_indices)
+        last = frame_indices[-1]
+        while index <= last and cap.grab():
+            if index in wanted:
+                ret, frame = cap.retrieve()
+                if ret:
+                    frames.extend([resize_rgb(frame, target_size)] * frame_indices.count(index))
+            index += 1
+        if len(frames) == 0:
+            raise ValueError(f"No frames extracted from {source}")
+        frames.extend([frames[-1]] * (num_frames - len(frames)))
+        return frames
+
+    kept, stride = [], 1
+    while cap.grab():
+        if index % stride == 0:
+            ret, frame = cap.retrieve()
+            if ret:
+                kept.append((index, resize_rgb(frame, target_size)))
+            if len(kept) > 16 * num_frames:
+                stride *= 2
+                kept = [item for item in kept if item[0] % stride == 0]
+        index += 1
+
+    if len(kept) == 0:
+        raise ValueError(f"No frames extracted from {source}")
+
+    # Same spacing as the seek path, over the frames actually decoded.
+    targets = [min(i * (index // num_frames), index - 1) for i in range(num_frames)]
+    positions = [item[0] for item in kept]
+    return [kept[min(range(len(kept)), key=lambda k: abs(positions[k] - target))][1] for target in targets]
+
+def find_keyframes(open_capture, num_frames):
+    """
+    Picks `num_frames` evenly spaced keyframes by scanning the video's packets without decoding them.
 
     Args:
-        df (pandas.DataFrame): DataFrame containing the labels for the fire training data.
-        batch_size (int, optional): Number of samples per batch. Defaults to 4.
+        open_capture (callable): See sample_video_frames().
+        num_frames (int): Number of frames to pick.
+
+    Returns:
+        list | None: Frame indices of the picked keyframes, or None if the backend cannot report keyframes.
+    """
+    cap = open_capture([cv2.CAP_PROP_FORMAT, -1])
+    try:
+        if not cap.isOpened() or cap.get(cv2.CAP_PROP_FORMAT) != -1:
+            return None
+        keyframes, index = [], 0
+        while cap.grab():
+            if cap.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME):
+                keyframes.append(index)
+            index += 1
+    except cv2.error:
+        return None
+    finally:
+        cap.release()
+
+    if not keyframes:
+        return None
+    return [keyframes[int(i * len(keyframes) / num_frames)] for i in range(num_frames)]
+
+def decode_image(buffer, target_size=(224, 224), out=None):
+    """
+    Decode and preprocess an encoded image (JPEG, PNG, ...) held in memory, the same way load_image() does.
+
+    Args:
+        buffer (bytes): The encoded image bytes.
+        target_size (tuple, optional): Target dimensions (height, width) for resizing. Defaults to (224, 224).
+        out (numpy.ndarray, optional): float32 or uint8 frame buffer to write into. Allocated when omitted.
+
+    Returns:
+        img (numpy.float32): The image converted into a numpy float32 array.
+    """
+    return write_frame(_decode_image(buffer, target_size), _frame_buffer(out, target_size))
+
+def _decode_image(buffer, target_size):
+    img = cv2.imdecode(np.frombuffer(buffer, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("Could not decode image buffer")
+    return resize_rgb(img, target_size)
+
+# Videos that cannot be decoded from memory are spooled here. /dev/shm is a
+# tmpfs on Linux, so the spool never touches the disk.
+VIDEO_SPOOL_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+def decode_video(buffer, num_frames=3, target_size=(224, 224), mode=DEFAULT_SAMPLING_MODE, out=None):
+    """
+    Decode and preprocess frames from an encoded video held in memory, the same way load_video() does.
+
+    The video is read straight from memory through OpenCV's FFmpeg stream reader (OpenCV 4.10+). Older
+    builds fall back to a temporary file in VIDEO_SPOOL_DIR that is deleted as soon as decoding finishes.
+
+    Args:
+        buffer (bytes): The encoded video bytes.
+        num_frames (int, optional): Number of frames to extract. Defaults to 3.
+        target_size (tuple, optional): Target dimensions (height, width) for resizing. Defaults to (224, 224).
+        mode (str, optional): Frame sampling mode, one of SAMPLING_MODES. Defaults to 'seek'.
+        out (numpy.ndarray, optional): Buffer to write the frames into; see load_video().
+
+    Returns:
+        numpy.ndarray: Preprocessed frames as a float32 NumPy array with shape (num_frames, height, width, 3).
+    """
+    # A capture reads from its stream until it is released, so every stream stays referenced until then.
+    streams = []
+
+    def open_stream(params):
+        streams.append(io.BytesIO(buffer))
+        return cv2.VideoCapture(streams[-1], cv2.CAP_FFMPEG, params)
+
+    try:
+        probe = open_stream([])
+    except Exception:
+        probe = None
+
+    if probe is not None and probe.isOpened():
+        # The probe is handed back as the first decoding capture instead of opening the stream again.
+        unused = [probe]
+        return sample_video_frames(
+            lambda params: unused.pop() if unused and not params else open_stream(params),
+            num_frames, target_size, mode, source="video buffer", out=out
+        )
+
+    with tempfile.NamedTemporaryFile(suffix=".mp4", dir=VIDEO_SPOOL_DIR) as tmp:
+        tmp.write(buffer)
+        tmp.flush()
+        return sample_video_frames(
+            lambda params: cv2.VideoCapture(tmp.name, cv2.CAP_ANY, params),
+            num_frames, target_size, mode, source="video buffer", out=out
+        )
+
+def encode_labels(df, confidence_threshold=0.5):
+    """
+    Encodes the multi-task labels of a whole dataframe at once.
+
+    Args:
+        df (pandas.DataFrame): DataFrame returned by load_csv.
+        confidence_threshold (float, optional): Threshold for fire detection. Defaults to 0.5.
+
+    Returns:
+        dict: float32 arrays keyed by model output:
+            * 'fire_detected': Binary labels [rows, 1]
+            * 'type_num': One-hot type labels [rows, 4]; 'none' (-1) encodes as all zeros, like tf.one_hot
+            * 'severity_num': One-hot severity labels [rows, 4]
+            * 'spread_num': One-hot spread labels [rows, 4]
+            * 'confidence_score': Regression targets [rows, 1]
+    """
+    confidence = df['confidence_score'].to_numpy(dtype=np.float32).reshape(-1, 1)
+    classes = np.arange(4)
+
+    def one_hot(column):
+        return (df[column].to_numpy().reshape(-1, 1) == classes).astype(np.float32)
+
+    return {
+        'fire_detected': (confidence >= confidence_threshold).astype(np.float32),
+        'type_num': one_hot('type_num'),
+        'severity_num': one_hot('severity_num'),
+        'spread_num': one_hot('spread_num'),
+        'confidence_score': confidence,
+    }
+
+def shard_dataset(dataset, shard, shuffle=False, seed=None):
+    """
+    Keeps one worker's share of a dataset of rows for multi-worker training.
+
+    Sharding after a seeded shuffle gives the workers disjoint rows that change every epoch, since each worker
+    draws the same permutation from the same seed.
+
+    Args:
+        dataset (tf.data.Dataset): Dataset of undecoded rows.
+        shard (tuple): (num_shards, index), or None to keep every row.
+        shuffle (bool, optional): Whether `dataset` was shuffled. Defaults to False.
+        seed (int, optional): The shuffle seed; required when shuffled and sharded. Defaults to None.
+
+    Returns:
+        tf.data.Dataset: Every num_shards-th row of `dataset`, starting at `index`.
+    """
+    if shard is None:
+        return dataset
+    if shuffle and seed is None:
+        raise ValueError("Sharding a shuffled dataset needs a seed shared by every worker")
+    num_shards, index = shard
+    return dataset.shard(num_shards, index)
+
+def build_dataset(df, batch_size=8, shuffle=True, confidence_threshold=0.5, seed=None, drop_remainder=False,
+                  shard=None):
+    """
+    Builds a tf.data input pipeline of decoded clips and multi-task labels from a DataFrame.
+
+    One pass over the dataset is one epoch: every row is seen exactly once, in a new order each epoch when
+    shuffling. Only file paths and labels are shuffled, so the shuffle buffer holds the whole dataframe.
+    Clips are decoded by load_clip() on parallel map calls (OpenCV releases the GIL), and batches are
+    prefetched while the model trains on the previous one.
+
+    Args:
+        df (pandas.DataFrame): DataFrame returned by load_csv.
+        batch_size (int, optional): Number of samples per batch. Defaults to 8.
+        shuffle (bool, optional): Reshuffle the rows every epoch. Defaults to True.
         confidence_threshold (float, optional): Threshold for fire detection. Defaults to 0.5.
+        seed (int, optional): Shuffle seed. Defaults to None.
+        drop_remainder (bool, optional): Drop the last partial batch. Defaults to False.
+        shard (tuple, optional): (num_shards, index) to keep only this worker's share of the rows, chosen after
+            shuffling and before decoding. Every worker must pass the same seed. Defaults to None.
 
-    Yields:
-        tuple: (X, y) where:
+    Returns:
+        tf.data.Dataset: Yields (X, y) where:
             - X: Tensor of shape (batch_size, num_frames=3, H=224, W=224, C=3) containing preprocessed frames
-            - y: Dictionary of tensors with keys:
-                * 'fire_detected': Binary labels [batch_size, 1]
-                * 'type_num': One-hot type labels [batch_size, 4]
-                * 'severity_num': One-hot severity labels [batch_size, 4]
-                * 'spread_num': One-hot spread labels [batch_size, 4]
-                * 'confidence_score': Regression targets [batch_size, 1]
-    """
-    while True:
-        batch = df.sample(batch_size)
-        X, y = [], {
-            'fire_detected': [],
-            'type_num': [],
-            'severity_num': [],
-            'spread_num': [],
-            'confidence_score': []
-        }
-        
-        for _, row in batch.iterrows():
-            frames = load_video(row['file_path']) if 'video' in row['file_path'] else [load_image(row['file_path'])] * 3
-            X.append(frames)
-            
-            y['fire_detected'].append([1.0] if row['confidence_score'] >= confidence_threshold else [0.0])  
-            y['confidence_score'].append([float(row['confidence_score'])]) 
-            
-            y['type_num'].append(tf.one_hot(row['type_num'], depth=4).numpy())
-            y['severity_num'].append(tf.one_hot(row['severity_num'], depth=4).numpy())
-            y['spread_num'].append(tf.one_hot(row['spread_num'], depth=4).numpy())
-        
-        yield tf.stack(X), {
-            'fire_detected': tf.convert_to_tensor(y['fire_detected'], dtype=tf.float32), 
-            'type_num': tf.convert_to_tensor(y['type_num'], dtype=tf.float32),  
-            'severity_num': tf.convert_to_tensor(y['severity_num'], dtype=tf.float32),
-            'spread_num': tf.convert_to_tensor(y['spread_num'], dtype=tf.float32),
-            'confidence_score': tf.convert_to_tensor(y['confidence_score'], dtype=tf.float32)  
-        }
+            - y: Dictionary of label tensors, see encode_labels()
+    """
+    labels = encode_labels(df, confidence_threshold)
+    dataset = tf.data.Dataset.from_tensor_slices((df['file_path'].to_numpy().astype(str), labels))
+
+    if shuffle:
+        dataset = dataset.shuffle(len(df), seed=seed, reshuffle_each_iteration=True)
+    dataset = shard_dataset(dataset, shard, shuffle, seed)
+
+    def decode(path, y):
+        clip = tf.numpy_function(lambda p: load_clip(p.decode()), [path], tf.float32, stateful=False)
+        clip.set_shape(CLIP_SHAPE)
+        return clip, y
+
+    # Order only matters when it is not already random.
+    dataset = dataset.map(decode, num_parallel_calls=tf.data.AUTOTUNE, deterministic=not shuffle)
+    dataset = dataset.batch(batch_size, drop_remainder=drop_remainder)
+    return dataset.prefetch(tf.data.AUTOTUNE)
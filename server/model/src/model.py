@@ -27,6 +27,7 @@ TABLE OF CONTENTS:
    - FrameExtractor : Custom layer for frame extraction from video sequences
 2. Functions
    - build_hybrid_model : Main model builder with multi-task outputs
+   - split_hybrid_model : Splits a built model into its CNN backbone and temporal head
 
 """
 
@@ -115,11 +116,12 @@ def build_hybrid_model(input_shape=(3, 224, 224, 3), num_classes=4):
     x = layers.Dense(256, activation='relu')(x)
     x = layers.Dropout(0.5)(x)
     
-    fire_detected = layers.Dense(1, activation='sigmoid', name='fire_detected')(x)  
-    type_num = layers.Dense(num_classes, activation='softmax', name='type_num')(x)
-    severity_num = layers.Dense(num_classes, activation='softmax', name='severity_num')(x)
-    spread_num = layers.Dense(num_classes, activation='softmax', name='spread_num')(x)
-    confidence_score = layers.Dense(1, activation='sigmoid', name='confidence_score')(x)
+    # Outputs stay float32 under a mixed precision policy, so the sigmoids, softmaxes and losses do too.
+    fire_detected = layers.Dense(1, activation='sigmoid', name='fire_detected', dtype='float32')(x)  
+    type_num = layers.Dense(num_classes, activation='softmax', name='type_num', dtype='float32')(x)
+    severity_num = layers.Dense(num_classes, activation='softmax', name='severity_num', dtype='float32')(x)
+    spread_num = layers.Dense(num_classes, activation='softmax', name='spread_num', dtype='float32')(x)
+    confidence_score = layers.Dense(1, activation='sigmoid', name='confidence_score', dtype='float32')(x)
     
     return models.Model(
         inputs=input_layer,
@@ -131,3 +133,45 @@ def build_hybrid_model(input_shape=(3, 224, 224, 3), num_classes=4):
             'confidence_score': confidence_score
         }
     )
+
+
+def split_hybrid_model(model):
+    """
+    Splits a model built by build_hybrid_model into two callables that share its trained weights:
+    1. backbone: the EfficientNetV2B0 feature extractor, mapping (frames, height, width, channels) to (frames, features).
+    2. head: the temporal/classification layers, mapping (num_frames, features) per sample to the five outputs.
+
+    Running backbone on every frame and feeding the stacked features to head gives the same outputs as the full
+    model, but lets callers run the backbone once per unique frame (e.g. still images repeated across frames).
+
+    Args:
+        model: A tf.keras.Model produced by build_hybrid_model (freshly built or loaded from disk).
+
+    Returns:
+        tuple: (backbone, head), both tf.keras.Model instances.
+    """
+    backbone = next(layer for layer in model.layers if isinstance(layer, models.Model))
+    num_frames = model.input_shape[1]
+    feature_dim = backbone.output_shape[-1]
+
+    output_names = ['fire_detected', 'type_num', 'severity_num', 'spread_num', 'confidence_score']
+    dense = next(
+        layer for layer in model.layers
+        if isinstance(layer, layers.Dense) and layer.name not in output_names
+    )
+    dropout = next(layer for layer in model.layers if isinstance(layer, layers.Dropout))
+
+    features = layers.Input(shape=(num_frames, feature_dim))
+    if num_frames > 1:
+        # Concatenate + Reshape in the full model only regroup the per-frame features into this same layout.
+        lstm = next(layer for layer in model.layers if isinstance(layer, layers.Bidirectional))
+        x = lstm(features)
+    else:
+        x = layers.Reshape((feature_dim,))(features)
+
+    x = dropout(dense(x))
+    head = models.Model(
+        inputs=features,
+        outputs={name: model.get_layer(name)(x) for name in output_names}
+    )
+    return backbone, head
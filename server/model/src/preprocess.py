@@ -0,0 +1,129 @@
+import cv2
+import numpy as np
+
+"""
+TITLE: Hermes Preprocessing Primitives
+
+Every image and video frame the model sees goes through these functions, whether it was read from a path
+or decoded from an uploaded blob, so both routes produce the same pixels. Frames are resized while still
+in OpenCV's BGR uint8 layout, converted to RGB, and then written once into the caller's buffer, with the
+[0, 1] normalization folded into that write for float32 buffers.
+
+Buffers are model input batches of shape (batch, frames, height, width, 3). float32 buffers hold
+normalized values and can be fed to the model directly; uint8 buffers hold raw RGB values, take a quarter
+of the memory, and are normalized by normalize_batch() right before inference.
+
+TABLE OF CONTENTS:
+1. Functions
+   - allocate_batch : Preallocates a model input buffer.
+   - resize_rgb : Resizes a decoded BGR frame and converts it to RGB uint8.
+   - write_frame : Writes an RGB uint8 frame into a float32 or uint8 buffer slot.
+   - write_frames : Writes a sequence of RGB uint8 frames into a clip buffer.
+   - write_still : Writes one image into every frame of a clip buffer.
+   - normalize_batch : Returns a float32, normalized view of a batch buffer.
+"""
+
+CLIP_SHAPE = (3, 224, 224, 3)
+SCALE = np.float32(255.0)
+
+def allocate_batch(batch_size, num_frames=3, target_size=(224, 224), dtype=np.float32):
+    """
+    Preallocates a model input buffer that clips can be decoded straight into.
+
+    Args:
+        batch_size (int): Number of clips.
+        num_frames (int, optional): Frames per clip. Defaults to 3.
+        target_size (tuple, optional): Frame dimensions as passed to cv2.resize. Defaults to (224, 224).
+        dtype (numpy.dtype, optional): np.float32 for normalized values or np.uint8 for raw RGB. Defaults to np.float32.
+
+    Returns:
+        numpy.ndarray: Uninitialized array of shape (batch_size, num_frames, height, width, 3).
+    """
+    return np.empty((batch_size, num_frames, target_size[1], target_size[0], 3), dtype=dtype)
+
+def resize_rgb(frame, target_size=(224, 224)):
+    """
+    Resizes a decoded BGR frame and converts it to RGB.
+
+    Resizing first gives the same pixels as converting first, but the color conversion then only touches
+    the downscaled frame.
+
+    Args:
+        frame (numpy.ndarray): uint8 BGR frame as returned by OpenCV.
+        target_size (tuple, optional): Frame dimensions as passed to cv2.resize. Defaults to (224, 224).
+
+    Returns:
+        numpy.ndarray: uint8 RGB frame.
+    """
+    frame = cv2.resize(frame, target_size)
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame)
+
+def write_frame(frame, out):
+    """
+    Writes an RGB uint8 frame into one buffer slot, normalizing to [0, 1] if the buffer is float32.
+
+    Args:
+        frame (numpy.ndarray): uint8 RGB frame from resize_rgb().
+        out (numpy.ndarray): Destination of the same height and width, float32 or uint8.
+
+    Returns:
+        numpy.ndarray: `out`.
+    """
+    if out.dtype == np.uint8:
+        out[...] = frame
+    else:
+        # Same float32 division as astype(np.float32) / 255.0, without the intermediate array.
+        np.divide(frame, SCALE, out=out, dtype=np.float32)
+    return out
+
+def write_frames(frames, out=None, dtype=np.float32):
+    """
+    Writes a sequence of RGB uint8 frames into a clip buffer.
+
+    Args:
+        frames (list of numpy.ndarray): uint8 RGB frames from resize_rgb().
+        out (numpy.ndarray, optional): Destination of shape (len(frames), height, width, 3). Allocated when omitted.
+        dtype (numpy.dtype, optional): dtype of the allocated buffer. Defaults to np.float32.
+
+    Returns:
+        numpy.ndarray: `out`.
+    """
+    if out is None:
+        out = np.empty((len(frames),) + frames[0].shape, dtype=dtype)
+    elif len(out) != len(frames):
+        raise ValueError(f"Expected {len(out)} frames, got {len(frames)}")
+
+    for frame, slot in zip(frames, out):
+        write_frame(frame, slot)
+    return out
+
+def write_still(frame, out):
+    """
+    Writes one image into every frame of a clip buffer; the normalization runs once.
+
+    Args:
+        frame (numpy.ndarray): uint8 RGB frame from resize_rgb().
+        out (numpy.ndarray): Clip buffer of shape (frames, height, width, 3).
+
+    Returns:
+        numpy.ndarray: `out`.
+    """
+    write_frame(frame, out[0])
+    out[1:] = out[0]
+    return out
+
+def normalize_batch(batch):
+    """
+    Returns a batch as normalized float32, the dtype the model takes.
+
+    Args:
+        batch (numpy.ndarray): float32 batch, returned unchanged, or uint8 batch, divided by 255.
+
+    Returns:
+        numpy.ndarray: float32 batch with values in [0, 1].
+    """
+    if batch.dtype == np.float32:
+        return batch
+    if batch.dtype == np.uint8:
+        return np.divide(batch, SCALE, dtype=np.float32)
+    return batch.astype(np.float32)
@@ -1,8 +1,18 @@
+import os
+import shutil
+import tempfile
+import time
+from functools import partial
+import numpy as np
 import tensorflow as tf
-from model.src.load import load_csv, generate_csv
-from model.src.model import build_hybrid_model
+from model.src.cache import build_cached_dataset
+from model.src.features import build_feature_dataset, cache_features
+from model.src.load import load_csv, build_dataset
+from model.src.model import build_hybrid_model, split_hybrid_model
+from model.src.train_config import configure_runtime, is_chief, parse_train_config, worker_shard
 import matplotlib.pyplot as plt
 import datetime
+import json
 
 """
 TITLE: Hermes Model Training Script
@@ -12,24 +22,43 @@ A training script made in order to publish Keras builds for Hermes.
 TABLE OF CONTENTS:
 1. Functions
    - main : Main function to initialize, train and save a new model.
+   - compile_model : Compiles the model, or its head, with the multi-task losses and metrics.
+   - distribute_dataset : Builds a dataset for the distribution strategy, sharded per worker if needed.
+   - training_callbacks : Callbacks shared by every training phase.
+   - float32_build : Copies a trained model into a float32 build for deployment.
    - plot_history: A helper function to help plot and saved a graph of the model's history.
+   - save_build_metadata: Writes the version metadata the server's model registry reads.
+2. Classes
+   - BestModelCheckpoint : Saves the full model on val_loss improvements, whichever part of it is being fit.
+   - ThroughputLogger : Logs samples per second and a breakdown of step times.
 
 """
 
-def main():
+def main(argv=None):
     """
     Function that handles the training of the model based on the model.py script. The function:
     1. Loads the data from the .csv file within the 'data' module
-    2. Parses the data into dataframes, loaded into generators for efficiency
+    2. Parses the data into dataframes, loaded into tf.data pipelines that decode in parallel
     3. Builds a local model from model.py and compiles with optimizer, loss and metrics.
     4. Initiates callback functions like model checkpoints, early stopping and learning rate reduction.
     5. Trains the initialized model with the training and validation generators
     6. Saves the model once done into the 'models' module
     7. Plots the history of the training with the helper function 'plot_history'
 
+    Every setting comes from parse_train_config (defaults, `--config FILE`, then command line flags).
+    With `--cache DIR`, clips are read from a cache built by `python -m model.src.cache` instead of being
+    decoded every epoch.
+
+    With `--head-only`, the backbone stays frozen: its frame embeddings are cached in `--features` and only
+    the LSTM and output layers are trained on them. `--fine-tune-epochs N` then unfreezes the backbone and
+    trains the full model for N more epochs at a lower learning rate.
+
+    With `--strategy multi_worker`, every worker listed in TF_CONFIG runs this function. Each decodes only its
+    share of the rows, gradients are all-reduced after every step, and only the chief writes to
+    'models/checkpoints' and 'models/deployed'. `batch_size` is then per worker.
+
     Args:
-        csv_path (str): Path to metadata CSV with image/video paths and labels
-        batch_size (int): Samples per batch (default=32)
+        argv (list, optional): Command line arguments. Defaults to sys.argv.
 
     Returns: 
         Two Keras files, one made as a model checkpoint and one made as a final model, saved in models module.
@@ -37,19 +66,180 @@ def main():
     Note:
         Validation metrics are logged but don't affect training. 
     """
+    config = parse_train_config(argv)
+    strategy = configure_runtime(config)
+    chief = is_chief(strategy)
     
-    df = load_csv('data/labels.csv')
+    df = load_csv(config['csv'])
     train_df = df.sample(frac=0.8, random_state=42)
     val_df = df.drop(train_df.index)
     
-    train_gen = generate_csv(train_df, batch_size=8)
-    val_gen = generate_csv(val_df, batch_size=8)
-    
-    model = build_hybrid_model()
+    with strategy.scope():
+        model = build_hybrid_model()
     model.summary()  
+
+    timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    # Every worker saves, since saving reads the replicated variables, but only the chief's files are kept.
+    scratch_dir = None if chief else tempfile.mkdtemp(prefix='hermes-worker-')
+    output_dir = scratch_dir or 'models'
+    checkpoint_path = f'{output_dir}/checkpoints/HermesBestModel_{timestamp}.keras'
+    os.makedirs(os.path.dirname(checkpoint_path), exist_ok=True)
+    throughput = []
+
+    if config['head_only']:
+        with strategy.scope():
+            backbone, head = split_hybrid_model(model)
+            backbone.trainable = False
+            compile_model(head, config['head_learning_rate'], config)
+        # Each worker embeds and trains the head on a fixed share of the rows, so the embedding pass is split
+        # between the workers rather than repeated by each of them.
+        shard = worker_shard(strategy)
+        train_part = train_df.iloc[shard[1]::shard[0]] if shard else train_df
+        val_part = val_df.iloc[shard[1]::shard[0]] if shard else val_df
+        train_features = cache_features(train_part, backbone, config['features'], clip_cache_dir=config['cache'])
+        val_features = cache_features(val_part, backbone, config['features'], clip_cache_dir=config['cache'])
+
+        train_ds, train_steps, train_samples = distribute_dataset(
+            strategy, partial(build_feature_dataset, train_features, train_part, seed=42),
+            len(train_df), config['head_batch_size'], presharded=True
+        )
+        val_ds, val_steps, _ = distribute_dataset(
+            strategy, partial(build_feature_dataset, val_features, val_part, shuffle=False),
+            len(val_df), config['head_batch_size'], training=False, presharded=True
+        )
+        logger = ThroughputLogger(train_samples, config['log_every_steps'])
+        # The head shares its layers with `model`, so checkpoints save the full model.
+        history = head.fit(
+            train_ds,
+            validation_data=val_ds,
+            epochs=config['epochs'],
+            steps_per_epoch=train_steps,
+            validation_steps=val_steps,
+            callbacks=training_callbacks(checkpoint_path, model) + [logger]
+        )
+        throughput.append({'phase': 'head', **logger.summary()})
+        epochs = config['fine_tune_epochs']
+        backbone.trainable = True
+    else:
+        epochs = config['epochs']
+
+    if epochs:
+        if config['cache']:
+            build_train = partial(build_cached_dataset, train_df, config['cache'], seed=42)
+            build_val = partial(build_cached_dataset, val_df, config['cache'], shuffle=False)
+        else:
+            build_train = partial(build_dataset, train_df, seed=42)
+            build_val = partial(build_dataset, val_df, shuffle=False)
+        train_ds, train_steps, train_samples = distribute_dataset(
+            strategy, build_train, len(train_df), config['batch_size']
+        )
+        val_ds, val_steps, _ = distribute_dataset(strategy, build_val, len(val_df), config['batch_size'], training=False)
+
+        # Fine-tuning after head-only training starts from trained heads, so it has its own, lower rate.
+        learning_rate = config['fine_tune_learning_rate'] if config['head_only'] else config['learning_rate']
+        with strategy.scope():
+            compile_model(model, learning_rate, config)
+        logger = ThroughputLogger(train_samples, config['log_every_steps'])
+
+        # Each epoch is one full pass over the training rows.
+        history = model.fit(
+            train_ds,
+            validation_data=val_ds,
+            epochs=epochs,
+            steps_per_epoch=train_steps,
+            validation_steps=val_steps,
+            callbacks=training_callbacks(checkpoint_path, model) + [logger]
+        )
+        throughput.append({'phase': 'fine_tune' if config['head_only'] else 'full', **logger.summary()})
+
+    file_name = f'{output_dir}/deployed/HermesSavedBuild_{datetime.datetime.now().strftime("%Y%m%d-%H%M%S")}.keras'
+    file_name_2 = f'{output_dir}/deployed/HermesSavedBuild_{datetime.datetime.now().strftime("%Y%m%d-%H%M%S")}.png'
+    os.makedirs(os.path.dirname(file_name), exist_ok=True)
+    
+    float32_build(model, config).save(file_name)
+    if scratch_dir:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+        return
+
+    save_build_metadata(file_name, history, len(train_df), len(val_df), config, throughput)
     
+    plot_history(history, file_name_2)
+
+def distribute_dataset(strategy, build, rows, batch_size, training=True, presharded=False):
+    """
+    Builds a training or validation dataset for the strategy.
+
+    On a single host this is just `build(batch_size=batch_size)`. Under a multi-worker strategy, each worker
+    builds its own shard of the rows through `distribute_datasets_from_function`, and every epoch runs the same
+    number of steps on every worker, since a worker that ran out of batches early would leave the others waiting
+    in the all-reduce. Training drops partial batches and repeats, with the per-worker batch capped so that one
+    global batch fits in the rows. Validation keeps partial batches and reads each shard once; shards differ by at
+    most one row, and those extra rows are skipped.
+
+    Args:
+        strategy: tf.distribute.Strategy. The strategy returned by configure_runtime.
+        build: callable. A dataset builder taking batch_size, drop_remainder and shard keyword arguments.
+        rows: int. Number of rows the builder covers, over all workers.
+        batch_size: int. Samples per step on each worker.
+        training: bool. Whether the dataset is for training rather than validation (default=True).
+        presharded: bool. Whether `build` already covers only this worker's rows, so it is given no shard
+            (default=False).
+
+    Returns:
+        tuple: (dataset, steps per epoch or None to run until the dataset ends, samples per epoch over all workers).
+    """
+    if not isinstance(strategy, tf.distribute.MultiWorkerMirroredStrategy):
+        return build(batch_size=batch_size), None, rows
+
+    replicas = strategy.num_replicas_in_sync
+    rows_per_replica = rows // replicas
+    if rows_per_replica == 0:
+        raise ValueError(f"{rows} rows cannot be split across {replicas} workers")
+
+    def shard_of(input_context):
+        return None if presharded else (input_context.num_input_pipelines, input_context.input_pipeline_id)
+
+    if not training:
+        # Every shard has at least rows_per_replica rows, so every worker has this many batches.
+        steps = -(-rows_per_replica // batch_size)
+
+        def dataset_fn(input_context):
+            return build(batch_size=batch_size, shard=shard_of(input_context))
+
+        return strategy.distribute_datasets_from_function(dataset_fn), steps, rows_per_replica * replicas
+
+    if batch_size > rows_per_replica:
+        print(f"[TRAIN] Batch size capped at {rows_per_replica} per worker: {rows} rows hold no global batch of "
+              f"{batch_size * replicas}")
+        batch_size = rows_per_replica
+    global_batch_size = batch_size * replicas
+    steps = rows // global_batch_size
+
+    def dataset_fn(input_context):
+        per_replica_batch_size = input_context.get_per_replica_batch_size(global_batch_size)
+        return build(batch_size=per_replica_batch_size, drop_remainder=True, shard=shard_of(input_context)).repeat()
+
+    return strategy.distribute_datasets_from_function(dataset_fn), steps, steps * global_batch_size
+
+def compile_model(model, learning_rate=1e-4, config=None):
+    """
+    Compiles a Hermes model, or the head returned by split_hybrid_model, with its five losses and metrics.
+
+    Args:
+        model: tf.keras.Model. The full model or its head; both have the same named outputs.
+        learning_rate: float. Adam learning rate (default=1e-4).
+        config: dict. The run's configuration, for gradient accumulation and XLA (default=no accumulation, no XLA).
+    """
+    config = config or {}
+    accumulation_steps = config.get('gradient_accumulation_steps', 1)
+    # Keras applies the summed gradients every `accumulation_steps` steps, so the effective batch grows by
+    # that factor while activation memory stays that of one batch.
+    optimizer = tf.keras.optimizers.Adam(
+        learning_rate=learning_rate,
+        gradient_accumulation_steps=accumulation_steps if accumulation_steps > 1 else None
+    )
     model.compile(
-        optimizer=tf.keras.optimizers.Adam(learning_rate=1e-4),
+        optimizer=optimizer,
         loss={
             'fire_detected': 'binary_crossentropy',
             'type_num': 'categorical_crossentropy',
@@ -63,37 +253,161 @@ def main():
             'severity_num': ['accuracy'],
             'spread_num': ['accuracy'],
             'confidence_score': ['mae']
-        }
+        },
+        jit_compile=config.get('xla', False)
     )
 
-    ModelCheckpoint = tf.keras.callbacks.ModelCheckpoint
-    EarlyStopping = tf.keras.callbacks.EarlyStopping
-    ReduceLROnPlateau = tf.keras.callbacks.ReduceLROnPlateau
+def training_callbacks(checkpoint_path, model):
+    """
+    Builds the checkpoint, early stopping and learning rate callbacks shared by every training phase.
 
-    timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
-    callbacks = [
-        ModelCheckpoint(f'models/checkpoints/HermesBestModel_{timestamp}.keras', 
-                    save_best_only=True, 
-                    monitor='val_loss'),
-        EarlyStopping(patience=30, restore_best_weights=True),
-        ReduceLROnPlateau(factor=0.5, patience=3)
+    Args:
+        checkpoint_path: str. Where the best model is saved.
+        model: tf.keras.Model. The full model, saved by the checkpoint even when only its head is being fit.
+
+    Returns:
+        list: Keras callbacks.
+    """
+    return [
+        BestModelCheckpoint(checkpoint_path, model),
+        tf.keras.callbacks.EarlyStopping(patience=30, restore_best_weights=True),
+        tf.keras.callbacks.ReduceLROnPlateau(factor=0.5, patience=3)
     ]
 
-    history = model.fit(
-        train_gen,
-        steps_per_epoch=len(train_df)//8,
-        validation_data=val_gen,
-        validation_steps=len(val_df)//8,
-        epochs=25,
-        callbacks=callbacks
-    )
+def float32_build(model, config):
+    """
+    Returns a float32 copy of a model trained under a mixed precision policy, for the deployed build. The server
+    runs inference with the policy saved in the build, and its CPUs may lack native bfloat16; checkpoints keep
+    the training policy.
 
-    file_name = f'models/deployed/HermesSavedBuild_{datetime.datetime.now().strftime("%Y%m%d-%H%M%S")}.keras'
-    file_name_2 = f'models/deployed/HermesSavedBuild_{datetime.datetime.now().strftime("%Y%m%d-%H%M%S")}.png'
-    
-    model.save(file_name)
-    
-    plot_history(history, file_name_2)
+    Args:
+        model: tf.keras.Model. The full model built by build_hybrid_model.
+        config: dict. The run's configuration, for compiling the copy like the trained model.
+
+    Returns:
+        tf.keras.Model: `model` itself if it is already float32, otherwise a compiled float32 copy of its weights.
+    """
+    if model.dtype_policy.name == 'float32':
+        return model
+
+    # Mixed precision keeps its variables in float32, so the weights copy over unchanged.
+    policy = tf.keras.mixed_precision.global_policy()
+    tf.keras.mixed_precision.set_global_policy('float32')
+    try:
+        build = build_hybrid_model()
+    finally:
+        tf.keras.mixed_precision.set_global_policy(policy)
+    build.set_weights(model.get_weights())
+    compile_model(build, config['learning_rate'], config)
+    print(f"[TRAIN] Saving the deployed build as float32; it was trained under {model.dtype_policy.name}")
+    return build
+
+# BestModelCheckpoint Class
+# Saves `model` whenever val_loss improves. Unlike Keras' ModelCheckpoint, the
+# saved model need not be the one being fit, so head-only training still
+# checkpoints a complete, servable build.
+class BestModelCheckpoint(tf.keras.callbacks.Callback):
+
+    def __init__(self, file_path, model):
+        super().__init__()
+        self.file_path = file_path
+        self.full_model = model
+        self.best = float('inf')
+
+    def on_epoch_end(self, epoch, logs=None):
+        val_loss = (logs or {}).get('val_loss')
+        if val_loss is not None and val_loss < self.best:
+            self.best = val_loss
+            self.full_model.save(self.file_path)
+
+# ThroughputLogger Class
+# Logs training throughput per epoch, and every `log_every_steps` steps if set.
+# Step times are split into the first step, which includes tracing and XLA
+# compilation, the steady-state steps (input pipeline plus forward and
+# backward pass, since the batch is fetched inside the step), and the host
+# gap between steps spent in callbacks and Keras bookkeeping. Steps that take
+# longer as the batch grows point to compute; flat step times with a growing
+# host gap point to per-step overhead. Samples per second only counts the time
+# from the first step to the last, so validation is left out.
+class ThroughputLogger(tf.keras.callbacks.Callback):
+
+    def __init__(self, samples_per_epoch, log_every_steps=0):
+        super().__init__()
+        self.samples_per_epoch = samples_per_epoch
+        self.log_every_steps = log_every_steps
+        self.epochs = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._epoch_started = time.perf_counter()
+        self._step_times = []
+        self._gaps = []
+        self._first_start = None
+        self._last_end = None
+
+    def on_train_batch_begin(self, batch, logs=None):
+        self._step_started = time.perf_counter()
+        if self._first_start is None:
+            self._first_start = self._step_started
+        if self._last_end is not None:
+            self._gaps.append(self._step_started - self._last_end)
+
+    def on_train_batch_end(self, batch, logs=None):
+        self._last_end = time.perf_counter()
+        self._step_times.append(self._last_end - self._step_started)
+        if self.log_every_steps and (batch + 1) % self.log_every_steps == 0:
+            recent = self._step_times[-self.log_every_steps:]
+            print(f"\n[TRAIN] step {batch + 1}: {np.mean(recent) * 1000:.1f} ms/step")
+
+    def on_epoch_end(self, epoch, logs=None):
+        seconds = time.perf_counter() - self._epoch_started
+        train_seconds = self._last_end - self._first_start if self._step_times else 0.0
+        steady = np.array(self._step_times[1:] or self._step_times) * 1000
+        stats = {
+            'epoch': epoch + 1,
+            'seconds': round(seconds, 2),
+            'steps': len(self._step_times),
+            'samples_per_second': round(self.samples_per_epoch / train_seconds, 2) if train_seconds else None,
+            'first_step_ms': round(self._step_times[0] * 1000, 1) if self._step_times else None,
+            'step_ms_p50': round(float(np.percentile(steady, 50)), 1) if steady.size else None,
+            'step_ms_p90': round(float(np.percentile(steady, 90)), 1) if steady.size else None,
+            'host_gap_ms_mean': round(float(np.mean(self._gaps)) * 1000, 2) if self._gaps else None,
+            # Epoch time after the last training step is mostly the validation pass.
+            'after_steps_seconds': round(seconds - train_seconds, 2),
+        }
+        self.epochs.append(stats)
+        print(f"\n[TRAIN] {json.dumps(stats)}")
+
+    def summary(self):
+        """Returns the last epoch's throughput and every epoch's samples per second."""
+        if not self.epochs:
+            return {}
+        return {**self.epochs[-1], 'samples_per_second_by_epoch': [e['samples_per_second'] for e in self.epochs]}
+
+def save_build_metadata(file_name, history, train_samples, val_samples, config=None, throughput=None):
+    """
+    Writes a `<build>.json` sidecar next to a saved build, read by the server's model registry.
+
+    Args:
+        file_name: str. Path of the saved .keras build.
+        history: Keras.callbacks.history. The training history of the build.
+        train_samples: int. Number of training rows.
+        val_samples: int. Number of validation rows.
+        config: dict. The training configuration of the build (optional).
+        throughput: list. ThroughputLogger summaries of each training phase (optional).
+    """
+    metadata = {
+        'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'epochs': len(history.history['loss']),
+        'train_samples': train_samples,
+        'val_samples': val_samples,
+        'final_metrics': {key: round(float(values[-1]), 6) for key, values in history.history.items()},
+    }
+    if config is not None:
+        metadata['training_config'] = config
+    if throughput:
+        metadata['throughput'] = throughput
+    with open(f'{file_name}.json', 'w') as f:
+        json.dump(metadata, f, indent=2)
 
 def plot_history(history, file_name_2):
     """
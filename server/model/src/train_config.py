@@ -0,0 +1,199 @@
+import argparse
+import json
+import tensorflow as tf
+from model.src.inference import configure_threads
+
+"""
+TITLE: Hermes Training Configuration
+
+Every setting of a training run, read from the defaults below, then an optional JSON config file, then the
+command line, with each layer overriding the one before it. configure_runtime() applies the settings that
+have to be in place before the model is built: thread pools, the mixed precision policy and the
+distribution strategy.
+
+Example config file (every key is optional):
+    {
+        "batch_size": 16,
+        "precision": "auto",
+        "xla": true,
+        "intra_op_threads": 16,
+        "gradient_accumulation_steps": 4
+    }
+
+TABLE OF CONTENTS:
+1. Functions
+   - parse_train_config : Builds the run's configuration from defaults, a config file and the command line.
+   - resolve_precision : Resolves the 'auto' precision policy for the current CPU.
+   - configure_runtime : Applies the thread and precision settings and creates the distribution strategy.
+   - is_chief : Whether this process is the worker that writes checkpoints and builds.
+   - worker_shard : This process's position among the workers of a cluster.
+"""
+
+DEFAULT_TRAIN_CONFIG = {
+    'csv': 'data/labels.csv',
+    'cache': None,
+    'features': 'data/features.npz',
+    'head_only': False,
+    'epochs': 25,
+    'fine_tune_epochs': 0,
+    'batch_size': 8,
+    'head_batch_size': 32,
+    'learning_rate': 1e-4,
+    'head_learning_rate': 1e-3,
+    'fine_tune_learning_rate': 1e-5,
+    'gradient_accumulation_steps': 1,
+    'precision': 'float32',
+    'xla': False,
+    'intra_op_threads': 0,
+    'inter_op_threads': 0,
+    'log_every_steps': 0,
+    'strategy': 'default',
+}
+
+PRECISION_POLICIES = ('float32', 'mixed_bfloat16', 'mixed_float16', 'auto')
+STRATEGIES = ('default', 'multi_worker')
+
+# CPU flags of the instructions that run bfloat16 matrix math natively; without them bfloat16 is emulated
+# and slower than float32.
+BFLOAT16_CPU_FLAGS = ('avx512_bf16', 'amx_bf16')
+
+def parse_train_config(argv=None):
+    """
+    Builds the configuration of a training run.
+
+    Args:
+        argv (list, optional): Command line arguments. Defaults to sys.argv.
+
+    Returns:
+        dict: Every key of DEFAULT_TRAIN_CONFIG, with the config file's and the command line's values applied.
+    """
+    parser = argparse.ArgumentParser(description="Train a new Hermes build.")
+    parser.add_argument("--config", help="JSON file of settings; command line flags override it.")
+    parser.add_argument("--csv", help="labels.csv to train on.")
+    parser.add_argument("--cache", help="Read clips from this preprocessed cache instead of decoding them.")
+    parser.add_argument("--head-only", action=argparse.BooleanOptionalAction,
+                        help="Freeze the backbone and train the head on cached embeddings.")
+    parser.add_argument("--features", help="Embedding cache used by --head-only.")
+    parser.add_argument("--epochs", type=int, help="Epochs of full-model training, or of the head with --head-only.")
+    parser.add_argument("--fine-tune-epochs", type=int, help="Full-model epochs after --head-only.")
+    parser.add_argument("--batch-size", type=int, help="Clips per step when training the full model.")
+    parser.add_argument("--head-batch-size", type=int, help="Samples per step when training the head only.")
+    parser.add_argument("--learning-rate", type=float, help="Adam learning rate of full-model training.")
+    parser.add_argument("--head-learning-rate", type=float, help="Adam learning rate of head-only training.")
+    parser.add_argument("--fine-tune-learning-rate", type=float, help="Adam learning rate of the fine-tune phase.")
+    parser.add_argument("--gradient-accumulation-steps", type=int,
+                        help="Steps whose gradients are summed before each weight update.")
+    parser.add_argument("--precision", choices=PRECISION_POLICIES,
+                        help="Keras dtype policy; 'auto' picks mixed_bfloat16 on CPUs with native bfloat16.")
+    parser.add_argument("--xla", action=argparse.BooleanOptionalAction, help="Compile train steps with XLA.")
+    parser.add_argument("--intra-op-threads", type=int, help="Threads inside a single op; 0 keeps the default.")
+    parser.add_argument("--inter-op-threads", type=int, help="Threads running independent ops; 0 keeps the default.")
+    parser.add_argument("--log-every-steps", type=int, help="Also log throughput every N steps; 0 logs per epoch.")
+    parser.add_argument("--strategy", choices=STRATEGIES,
+                        help="'multi_worker' trains across the workers listed in the TF_CONFIG environment variable.")
+    args = vars(parser.parse_args(argv))
+
+    config = dict(DEFAULT_TRAIN_CONFIG)
+    config_path = args.pop('config')
+    if config_path:
+        with open(config_path) as f:
+            file_config = json.load(f)
+        unknown = set(file_config) - set(DEFAULT_TRAIN_CONFIG)
+        if unknown:
+            parser.error(f"Unknown settings in {config_path}: {', '.join(sorted(unknown))}")
+        config.update(file_config)
+    config.update({key: value for key, value in args.items() if value is not None})
+
+    if config['precision'] not in PRECISION_POLICIES:
+        parser.error(f"precision must be one of {', '.join(PRECISION_POLICIES)}")
+    if config['strategy'] not in STRATEGIES:
+        parser.error(f"strategy must be one of {', '.join(STRATEGIES)}")
+    if config['gradient_accumulation_steps'] < 1:
+        parser.error("gradient_accumulation_steps must be at least 1")
+    return config
+
+def resolve_precision(precision):
+    """
+    Resolves the 'auto' policy to mixed_bfloat16 if the CPU has native bfloat16 instructions, float32 otherwise.
+
+    Args:
+        precision (str): One of PRECISION_POLICIES.
+
+    Returns:
+        str: A Keras dtype policy name.
+    """
+    if precision != 'auto':
+        return precision
+    try:
+        with open('/proc/cpuinfo') as f:
+            flags = f.read().split()
+    except OSError:
+        return 'float32'
+    return 'mixed_bfloat16' if any(flag in flags for flag in BFLOAT16_CPU_FLAGS) else 'float32'
+
+def configure_runtime(config):
+    """
+    Sizes TensorFlow's thread pools, sets the global dtype policy and creates the distribution strategy.
+    Must run before anything else touches TensorFlow, since a multi-worker strategy has to be created first.
+
+    Args:
+        config (dict): The run's configuration from parse_train_config. Its 'precision' is replaced by the
+            resolved policy.
+
+    Returns:
+        tf.distribute.Strategy: The strategy to build and compile the model under.
+    """
+    configure_threads(config['intra_op_threads'], config['inter_op_threads'])
+    config['precision'] = resolve_precision(config['precision'])
+    tf.keras.mixed_precision.set_global_policy(config['precision'])
+
+    if config['strategy'] == 'multi_worker':
+        # Reads the cluster from TF_CONFIG; ring all-reduce is the implementation that runs on CPUs.
+        strategy = tf.distribute.MultiWorkerMirroredStrategy(
+            communication_options=tf.distribute.experimental.CommunicationOptions(
+                implementation=tf.distribute.experimental.CommunicationImplementation.RING
+            )
+        )
+    else:
+        strategy = tf.distribute.get_strategy()
+
+    print(f"[TRAIN] {json.dumps(config)}")
+    print(f"[TRAIN] {type(strategy).__name__} with {strategy.num_replicas_in_sync} replica(s)")
+    return strategy
+
+def is_chief(strategy):
+    """
+    Whether this process writes the checkpoints and the saved build: the 'chief' task if the cluster has one,
+    otherwise worker 0, and always a process that is not part of a cluster.
+
+    Args:
+        strategy (tf.distribute.Strategy): The strategy returned by configure_runtime.
+
+    Returns:
+        bool: True for the chief.
+    """
+    resolver = getattr(strategy, 'cluster_resolver', None)
+    if resolver is None or not resolver.task_type:
+        return True
+    if resolver.task_type == 'chief':
+        return True
+    return resolver.task_type == 'worker' and resolver.task_id == 0 and 'chief' not in resolver.cluster_spec().as_dict()
+
+def worker_shard(strategy):
+    """
+    This process's position among the workers of a cluster, numbered the way MultiWorkerMirroredStrategy numbers
+    its input pipelines: the 'chief' task first if there is one, then the workers in order.
+
+    Args:
+        strategy (tf.distribute.Strategy): The strategy returned by configure_runtime.
+
+    Returns:
+        tuple: (num_workers, index), or None for a process that is not part of a cluster.
+    """
+    resolver = getattr(strategy, 'cluster_resolver', None)
+    if resolver is None or not resolver.task_type:
+        return None
+    cluster = resolver.cluster_spec().as_dict()
+    chiefs = len(cluster.get('chief', []))
+    index = resolver.task_id if resolver.task_type == 'chief' else chiefs + resolver.task_id
+    return chiefs + len(cluster.get('worker', [])), index
@@ -0,0 +1,173 @@
+import queue
+import threading
+import time
+
+# StageStats Class
+# Throughput counters for one pipeline stage. `busy_seconds` is time spent in
+# the stage's handler minus time spent blocked handing items downstream or
+# idling in Pipeline.idle(), so items_per_busy_second is what the stage could
+# sustain on its own, while items_per_second is what it actually delivered
+# since the pipeline started.
+class StageStats:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self.items = 0
+        self.emitted = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.idle_seconds = 0.0
+
+    def record(self, items, seconds, blocked, idle):
+        with self._lock:
+            self.items += items
+            self.busy_seconds += max(0.0, seconds - blocked - idle)
+            self.blocked_seconds += blocked
+            self.idle_seconds += idle
+
+    def record_emit(self):
+        with self._lock:
+            self.emitted += 1
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def stats(self):
+        with self._lock:
+            elapsed = time.monotonic() - self._started
+            return {
+                "items": self.items,
+                "emitted": self.emitted,
+                "errors": self.errors,
+                "busy_seconds": round(self.busy_seconds, 2),
+                "blocked_seconds": round(self.blocked_seconds, 2),
+                "idle_seconds": round(self.idle_seconds, 2),
+                "items_per_second": round(self.items / elapsed, 2) if elapsed > 0 else None,
+                "items_per_busy_second": round(self.items / self.busy_seconds, 2) if self.busy_seconds > 0 else None,
+            }
+
+# PipelineStage Class
+# One stage of a Pipeline: `workers` threads running `handler`. A source stage
+# has no inbox; its handler is called in a loop with the pipeline and returns
+# how many items it produced. Every other stage reads from a bounded inbox of
+# `queue_size` items; its handler gets one item at a time, or with
+# `batch_size` > 1 a list of up to that many items, collected for at most
+# `max_wait` seconds after the first arrives.
+class PipelineStage:
+
+    def __init__(self, name, handler, workers=1, queue_size=None, batch_size=1, max_wait=0.0, source=False):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.source = source
+        self.inbox = None if source else queue.Queue(maxsize=queue_size or 0)
+        self.stats = StageStats()
+
+    def take(self):
+        """DESC: Blocks for the next item, or for the next batch when the stage is batched."""
+        item = self.inbox.get()
+        if self.batch_size <= 1:
+            return item
+
+        batch = [item]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self.inbox.get(timeout=remaining) if remaining > 0 else self.inbox.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+# Pipeline Class
+# Runs work through a chain of stages connected by bounded queues. Handlers
+# pass items on with emit(stage, item), which blocks while that stage's inbox
+# is full; that is what propagates backpressure from the slowest stage back to
+# the source. A handler may emit to any stage, not just the next one.
+class Pipeline:
+
+    def __init__(self, name):
+        self.name = name
+        self._stages = {}
+        self._threads = []
+        self._local = threading.local()
+
+    def add_stage(self, name, handler, **options):
+        self._stages[name] = PipelineStage(name, handler, **options)
+        return self
+
+    def start(self):
+        """DESC: Starts every stage's worker threads. Safe to call more than once."""
+        if self._threads:
+            return
+        for stage in self._stages.values():
+            for i in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._run, args=(stage,), daemon=True, name=f"{self.name}-{stage.name}-{i + 1}"
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def emit(self, stage_name, item):
+        """DESC: Hands an item to a stage, blocking while its inbox is full."""
+        stage = self._stages[stage_name]
+        try:
+            stage.inbox.put_nowait(item)
+        except queue.Full:
+            started = time.monotonic()
+            stage.inbox.put(item)
+            self._local.blocked = getattr(self._local, "blocked", 0.0) + time.monotonic() - started
+        current = getattr(self._local, "stage", None)
+        if current is not None:
+            current.stats.record_emit()
+
+    def idle(self, wait, *args):
+        """DESC: Calls `wait(*args)` and books the time as idle rather than busy. Returns what `wait` returns."""
+        started = time.monotonic()
+        try:
+            return wait(*args)
+        finally:
+            self._local.idle = getattr(self._local, "idle", 0.0) + time.monotonic() - started
+
+    def free_slots(self, stage_name):
+        """DESC: How many more items a stage's inbox takes before emit() blocks."""
+        inbox = self._stages[stage_name].inbox
+        return max(0, inbox.maxsize - inbox.qsize()) if inbox.maxsize else None
+
+    def pending(self, stage_name):
+        return self._stages[stage_name].inbox.qsize()
+
+    def stats(self):
+        stages = {}
+        for name, stage in self._stages.items():
+            stages[name] = {"workers": stage.workers, **stage.stats.stats()}
+            if stage.inbox is not None:
+                stages[name]["queued"] = stage.inbox.qsize()
+                stages[name]["queue_size"] = stage.inbox.maxsize
+        return stages
+
+    def _run(self, stage):
+        self._local.stage = stage
+        while True:
+            items = None if stage.source else stage.take()
+            self._local.blocked, self._local.idle = 0.0, 0.0
+            started = time.monotonic()
+            count = 0
+            try:
+                if stage.source:
+                    count = stage.handler(self) or 0
+                else:
+                    count = len(items) if stage.batch_size > 1 else 1
+                    stage.handler(items, self)
+            except Exception as e:
+                stage.stats.record_error()
+                print(f"[PIPELINE] {self.name} stage '{stage.name}' failed: {str(e)}")
+                if stage.source:
+                    self.idle(time.sleep, 1)
+            finally:
+                stage.stats.record(count, time.monotonic() - started, self._local.blocked, self._local.idle)
@@ -0,0 +1,177 @@
+import threading
+import time
+from collections import deque
+
+# PoolTimeout Class
+# Raised when every pooled connection (including overflow) is checked out and
+# none was returned within the configured wait time.
+class PoolTimeout(Exception):
+    pass
+
+# PooledConnection Class
+# A thin proxy over a raw pymysql connection. Everything is forwarded to the
+# underlying connection except close(), which hands the connection back to its
+# pool instead of tearing down the socket. This keeps the familiar
+# `conn = pool.connect() ... finally: conn.close()` shape of the handlers.
+class PooledConnection:
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """DESC: Returns the connection to the pool. Safe to call more than once."""
+        if self._released:
+            return
+        self._released = True
+        self._pool._release(self._raw, self._created_at)
+
+# ConnectionPool Class
+# A bounded pool of MySQL connections shared by every handler and by the
+# verification thread. Holds up to `size` idle connections and allows up to
+# `max_overflow` extra connections under bursts; callers beyond that wait up
+# to `timeout` seconds for a connection to be returned.
+class ConnectionPool:
+
+    def __init__(self, creator, size=10, max_overflow=5, timeout=30, recycle=3600, pre_ping=True):
+        self._creator = creator
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+
+        self._idle = deque()
+        self._checked_out = 0
+        self._cond = threading.Condition()
+
+        self._hits = 0
+        self._misses = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._timeouts = 0
+        self._stale = 0
+
+    def connect(self):
+        """DESC: Checks a connection out of the pool, opening a new one only when no idle connection is available."""
+        raw, created_at = self._checkout()
+
+        if raw is not None and not self._is_usable(raw, created_at):
+            self._discard(raw)
+            with self._cond:
+                self._stale += 1
+            raw = None
+
+        if raw is None:
+            try:
+                raw = self._creator()
+                created_at = time.monotonic()
+            except Exception:
+                with self._cond:
+                    self._checked_out -= 1
+                    self._cond.notify()
+                raise
+
+        return PooledConnection(self, raw, created_at)
+
+    def stats(self):
+        """DESC: Returns a snapshot of the pool's occupancy and wait/hit counters."""
+        with self._cond:
+            requests = self._hits + self._misses
+            return {
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "idle": len(self._idle),
+                "checked_out": self._checked_out,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / requests, 4) if requests else 0.0,
+                "waits": self._waits,
+                "avg_wait_ms": round(self._wait_time * 1000 / self._waits, 2) if self._waits else 0.0,
+                "timeouts": self._timeouts,
+                "stale_discarded": self._stale,
+            }
+
+    def dispose(self):
+        """DESC: Closes every idle connection. Checked-out connections are closed as they are returned."""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+        for raw, _ in idle:
+            self._discard(raw)
+
+    def _checkout(self):
+        """DESC: Reserves a slot. Returns an idle (raw, created_at) pair, or (None, None) if the caller must open a new connection."""
+        waited_since = None
+        with self._cond:
+            while True:
+                if self._idle or self._checked_out < self.size + self.max_overflow:
+                    if waited_since is not None:
+                        self._wait_time += time.monotonic() - waited_since
+                    self._checked_out += 1
+                    if self._idle:
+                        self._hits += 1
+                        return self._idle.pop()
+                    self._misses += 1
+                    return None, None
+
+                if waited_since is None:
+                    waited_since = time.monotonic()
+                    self._waits += 1
+
+                remaining = waited_since + self.timeout - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    self._wait_time += time.monotonic() - waited_since
+                    raise PoolTimeout(
+                        f"Timed out after {self.timeout}s waiting for a database connection "
+                        f"(size={self.size}, max_overflow={self.max_overflow})"
+                    )
+                self._cond.wait(remaining)
+
+    def _release(self, raw, created_at):
+        """DESC: Takes a connection back. Any open transaction is rolled back so the next borrower starts clean."""
+        keep = raw.open
+        if keep:
+            try:
+                raw.rollback()
+            except Exception:
+                keep = False
+
+        with self._cond:
+            self._checked_out -= 1
+            if keep and len(self._idle) < self.size:
+                self._idle.append((raw, created_at))
+                raw = None
+            self._cond.notify()
+
+        if raw is not None:
+            self._discard(raw)
+
+    def _is_usable(self, raw, created_at):
+        """DESC: Rejects connections past their recycle age and, when pre-ping is enabled, ones the server has dropped."""
+        if self.recycle and time.monotonic() - created_at > self.recycle:
+            return False
+        if self.pre_ping:
+            try:
+                raw.ping(reconnect=False)
+            except Exception:
+                return False
+        return True
+
+    def _discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
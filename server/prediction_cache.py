@@ -0,0 +1,148 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+def prediction_cache_key(checksum, model_version, threshold):
+    """DESC: Builds the cache key for a prediction: the media's SHA-256, the model version and the detection threshold."""
+    return f"{checksum}:{model_version}:{float(threshold)}"
+
+def _jsonable(value):
+    # Model outputs carry numpy scalars and arrays; both have tolist().
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Cannot cache a value of type {type(value).__name__}")
+
+# PredictionCache Class
+# Caches HermesModel results so a clip that was already verified, whether it
+# is retried, re-verified after its postverified report was deleted, or
+# uploaded again, costs a lookup instead of a forward pass. Keys come from
+# prediction_cache_key(), so a new model version or threshold never reuses an
+# old result. The first tier is an in-memory LRU of `max_entries` results.
+# With `sqlite_path` set, results are also written to a SQLite file holding at
+# most `sqlite_max_entries` rows, so they survive restarts and are shared by
+# every process on the host; memory misses fall through to it.
+class PredictionCache:
+
+    def __init__(self, max_entries=1024, sqlite_path=None, sqlite_max_entries=100000):
+        self.max_entries = max_entries
+        self.sqlite_path = sqlite_path
+        self.sqlite_max_entries = sqlite_max_entries
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if sqlite_path:
+            os.makedirs(os.path.dirname(os.path.abspath(sqlite_path)), exist_ok=True)
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False, timeout=30)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS prediction_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    result TEXT NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            self._db.execute("CREATE INDEX IF NOT EXISTS prediction_cache_last_used ON prediction_cache (last_used)")
+            self._db.commit()
+
+        self._sqlite_writes = 0
+
+        self._hits = 0
+        self._sqlite_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._sqlite_evictions = 0
+
+    def get(self, key):
+        """DESC: Returns a copy of the cached result for `key`, or None on a miss."""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return json.loads(result)
+
+            if self._db is not None:
+                row = self._db.execute("SELECT result FROM prediction_cache WHERE cache_key = ?", (key,)).fetchone()
+                if row:
+                    self._db.execute("UPDATE prediction_cache SET last_used = ? WHERE cache_key = ?", (time.time(), key))
+                    self._db.commit()
+                    self._remember(key, row[0])
+                    self._sqlite_hits += 1
+                    return json.loads(row[0])
+
+            self._misses += 1
+            return None
+
+    def put(self, key, result):
+        """DESC: Stores a prediction result under `key` in every tier."""
+        encoded = json.dumps(result, default=_jsonable)
+        with self._lock:
+            self._remember(key, encoded)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO prediction_cache (cache_key, result, last_used) VALUES (?, ?, ?)",
+                    (key, encoded, time.time())
+                )
+                self._sqlite_writes += 1
+                # Trimming scans the table, so it runs every 100 writes; the file may briefly exceed its limit.
+                if self._sqlite_writes % 100 == 0:
+                    self._trim_sqlite()
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM prediction_cache")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._sqlite_hits + self._misses
+            stats = {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": round((self._hits + self._sqlite_hits) / lookups, 4) if lookups else None,
+            }
+            if self._db is not None:
+                stats["sqlite"] = {
+                    "path": self.sqlite_path,
+                    "entries": self._db.execute("SELECT COUNT(*) FROM prediction_cache").fetchone()[0],
+                    "max_entries": self.sqlite_max_entries,
+                    "hits": self._sqlite_hits,
+                    "evictions": self._sqlite_evictions,
+                }
+            return stats
+
+    def _remember(self, key, encoded):
+        self._entries[key] = encoded
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def _trim_sqlite(self):
+        cursor = self._db.execute("""
+            DELETE FROM prediction_cache WHERE cache_key IN (
+                SELECT cache_key FROM prediction_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.sqlite_max_entries,))
+        self._sqlite_evictions += max(cursor.rowcount, 0)
+
+
+def create_prediction_cache(app):
+    """DESC: Builds the prediction cache from the PREDICTION_CACHE_* settings in the Flask config, or None if disabled."""
+    if not app.config.get("PREDICTION_CACHE_ENABLED", True):
+        return None
+    return PredictionCache(
+        max_entries=app.config.get("PREDICTION_CACHE_MAX_ENTRIES", 1024),
+        sqlite_path=app.config.get("PREDICTION_CACHE_SQLITE_PATH"),
+        sqlite_max_entries=app.config.get("PREDICTION_CACHE_SQLITE_MAX_ENTRIES", 100000)
+    )
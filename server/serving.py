@@ -0,0 +1,203 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+# ModelNotReady Class
+# Raised when the model is requested before it has finished loading, or after
+# loading failed.
+class ModelNotReady(Exception):
+    pass
+
+# ModelRegistry Class
+# A view over the deployed builds in `root` (model/models/deployed). Every
+# .keras or .tflite file is a version, identified by its file name. Optional
+# metadata is read from a `<file>.json` sidecar written by train.py. The
+# version the server should start with is recorded in `active.json`, so a
+# hot swap survives a restart.
+class ModelRegistry:
+
+    EXTENSIONS = (".keras", ".tflite")
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+
+    def _active_path(self):
+        return os.path.join(self.root, "active.json")
+
+    def versions(self):
+        """DESC: Lists every deployed build, newest first, with its size, timestamp and sidecar metadata."""
+        if not os.path.isdir(self.root):
+            return []
+        versions = []
+        for name in os.listdir(self.root):
+            if name.endswith(self.EXTENSIONS):
+                versions.append(self.describe(name))
+        return sorted(versions, key=lambda v: v["modified_at"], reverse=True)
+
+    def describe(self, version):
+        path = self.path_for(version)
+        st = os.stat(path)
+        metadata = {}
+        try:
+            with open(f"{path}.json") as f:
+                metadata = json.load(f)
+        except (FileNotFoundError, ValueError):
+            pass
+        return {
+            "version": version,
+            "backend": "tflite" if version.endswith(".tflite") else "keras",
+            "size": st.st_size,
+            "modified_at": datetime.fromtimestamp(st.st_mtime, tz=timezone.utc).isoformat(),
+            "metadata": metadata,
+        }
+
+    def path_for(self, version):
+        """DESC: Resolves a version name to its file, raising ValueError for anything that is not a deployed build."""
+        if os.path.basename(version) != version or not version.endswith(self.EXTENSIONS):
+            raise ValueError(f"Invalid model version '{version}'")
+        path = os.path.join(self.root, version)
+        if not os.path.isfile(path):
+            raise ValueError(f"Model version '{version}' is not deployed")
+        return path
+
+    def active_version(self):
+        """DESC: The version recorded by the last swap, or None if none was recorded."""
+        try:
+            with open(self._active_path()) as f:
+                return json.load(f).get("version")
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def set_active_version(self, version):
+        tmp_path = self._active_path() + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": version, "activated_at": datetime.now(timezone.utc).isoformat()}, f)
+        os.replace(tmp_path, self._active_path())
+
+# ModelHolder Class
+# Holds the model the verification workers use and loads versions on a
+# background thread, so the HTTP layer can start serving before TensorFlow is
+# even imported. `loader(version)` imports, builds and warms up a model. A new
+# version is swapped in only once it is fully warmed up; until then workers
+# keep using the current one. The replaced model stays in memory so
+# rollback() is instant.
+class ModelHolder:
+
+    def __init__(self, loader, version, on_swap=None):
+        self._loader = loader
+        self._on_swap = on_swap
+        self._initial_version = version
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._started = False
+
+        self._model, self._version = None, None
+        self._previous_model, self._previous_version = None, None
+
+        self._status = "not_loaded"
+        self._loading_version = None
+        self._error = None
+        self._load_seconds = None
+        self._swapped_at = None
+
+    @property
+    def model(self):
+        """DESC: The active model, or None while the first version is still loading."""
+        return self._model
+
+    @property
+    def version(self):
+        return self._version
+
+    @property
+    def ready(self):
+        return self._model is not None
+
+    def start(self):
+        """DESC: Starts loading the initial version in the background. Safe to call more than once."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self.load(self._initial_version)
+
+    def load(self, version):
+        """DESC: Loads and warms up `version` in the background, then swaps it in. Returns False if a load is already running."""
+        with self._lock:
+            if self._loading_version is not None:
+                return False
+            self._started = True
+            self._loading_version = version
+            self._status = "loading" if self._model is None else "ready"
+            self._error = None
+        threading.Thread(target=self._load, args=(version,), daemon=True, name="ModelLoaderThread").start()
+        return True
+
+    def rollback(self):
+        """DESC: Swaps the previously active model back in. Returns the restored version."""
+        with self._lock:
+            if self._previous_model is None:
+                raise ModelNotReady("No previous model version to roll back to")
+            self._model, self._previous_model = self._previous_model, self._model
+            self._version, self._previous_version = self._previous_version, self._version
+            self._swapped_at = time.time()
+            version = self._version
+        print(f"[MODEL] Rolled back to {version}.")
+        if self._on_swap:
+            self._on_swap(version)
+        return version
+
+    def get(self, timeout=None):
+        """DESC: Returns the active model, starting the initial load if needed and blocking up to `timeout` seconds for it."""
+        return self.get_versioned(timeout)[0]
+
+    def get_versioned(self, timeout=None):
+        """DESC: Like get(), but returns (model, version) read together, so a concurrent swap cannot pair them wrongly."""
+        self.start()
+        if not self._ready.wait(timeout):
+            raise ModelNotReady(f"Model is still {self._status}")
+        with self._lock:
+            model, version = self._model, self._version
+        if model is None:
+            raise ModelNotReady(f"Model failed to load: {self._error}")
+        return model, version
+
+    def status(self):
+        with self._lock:
+            return {
+                "status": self._status,
+                "version": self._version,
+                "loading_version": self._loading_version,
+                "previous_version": self._previous_version,
+                "error": self._error,
+                "load_seconds": self._load_seconds,
+                "swapped_at": self._swapped_at,
+            }
+
+    def _load(self, version):
+        print(f"[MODEL] Loading {version} in the background...")
+        started = time.perf_counter()
+        try:
+            model = self._loader(version)
+            with self._lock:
+                # The swap is a single reference change; in-flight batches finish on the old model.
+                if self._model is not None:
+                    self._previous_model, self._previous_version = self._model, self._version
+                self._model, self._version = model, version
+                self._status = "ready"
+                self._load_seconds = round(time.perf_counter() - started, 2)
+                self._swapped_at = time.time()
+            print(f"[MODEL] {version} loaded, warmed up and swapped in after {self._load_seconds}s.")
+            if self._on_swap:
+                self._on_swap(version)
+        except Exception as e:
+            with self._lock:
+                self._status = "ready" if self._model is not None else "failed"
+                self._error = str(e)
+            print(f"[MODEL] Failed to load {version}: {str(e)}")
+        finally:
+            with self._lock:
+                self._loading_version = None
+            self._ready.set()
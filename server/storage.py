@@ -0,0 +1,353 @@
+import hashlib
+import os
+import tempfile
+from datetime import datetime, timezone
+
+CHUNK_SIZE = 1024 * 1024
+
+# MediaStoreError Class
+# Raised when a media object cannot be written to or read from a store.
+class MediaStoreError(Exception):
+    pass
+
+# SpooledUpload Class
+# The write target handed to Werkzeug's multipart parser for each uploaded
+# file. Bytes go straight to a temp file in chunks while the SHA-256 and size
+# are updated incrementally, so an upload never sits in memory and the media
+# store does not need a second pass over it. Closing an uncommitted spool
+# deletes its temp file.
+class SpooledUpload:
+
+    def __init__(self, spool_dir):
+        os.makedirs(spool_dir, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(dir=spool_dir, suffix=".upload")
+        self._file = os.fdopen(fd, "w+b")
+        self._digest = hashlib.sha256()
+        self.size = 0
+
+    @property
+    def checksum(self):
+        return self._digest.hexdigest()
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def write(self, data):
+        self._digest.update(data)
+        self.size += len(data)
+        return self._file.write(data)
+
+    def read(self, size=-1):
+        return self._file.read(size)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def writable(self):
+        return True
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        return self._file.seek(offset, whence)
+
+    def tell(self):
+        return self._file.tell()
+
+    def flush(self):
+        self._file.flush()
+
+    def finalize(self):
+        """DESC: Flushes the spool to disk and closes it. Returns the temp file path for the store to adopt."""
+        if not self._file.closed:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+        return self.path
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+# MediaStore Class
+# The interface every media backend implements. Objects are content-addressed:
+# the storage key is derived from the SHA-256 of the bytes, so identical
+# uploads share one object and the key doubles as an integrity check.
+class MediaStore:
+
+    @staticmethod
+    def key_for(checksum):
+        """DESC: Maps a SHA-256 hex digest onto a sharded key such as `ab/cd/abcd...`."""
+        return f"{checksum[:2]}/{checksum[2:4]}/{checksum}"
+
+    def put_file(self, fileobj):
+        """DESC: Stores the contents of a readable file object. Returns (storage_key, size, checksum)."""
+        raise NotImplementedError
+
+    def put_bytes(self, data):
+        """DESC: Stores an in-memory bytes object. Returns (storage_key, size, checksum)."""
+        raise NotImplementedError
+
+    def put_upload(self, stream):
+        """DESC: Stores an uploaded file stream. SpooledUpload streams are adopted without re-reading;
+        anything else is copied through put_file()."""
+        if isinstance(stream, SpooledUpload):
+            return self.put_spooled(stream)
+        return self.put_file(stream)
+
+    def put_spooled(self, spool):
+        return self.put_path(spool.finalize(), spool.checksum, spool.size)
+
+    def put_path(self, path, checksum, size):
+        """DESC: Stores a finished file whose checksum and size are already known. The file may be consumed."""
+        with open(path, "rb") as f:
+            return self.put_file(f)
+
+    @property
+    def spool_dir(self):
+        """DESC: Directory uploads are spooled into before being committed to the store."""
+        return os.path.join(tempfile.gettempdir(), "apollo_uploads")
+
+    def open(self, key, start=0, length=None):
+        """DESC: Returns a readable binary file object for the stored media, positioned at byte `start`.
+        When `length` is given, only that many bytes are guaranteed to be readable."""
+        raise NotImplementedError
+
+    def stat(self, key):
+        """DESC: Returns (size, last_modified) for the stored media; last_modified is a UTC datetime."""
+        raise NotImplementedError
+
+    def read(self, key):
+        """DESC: Returns the full contents of the stored media as bytes."""
+        with self.open(key) as f:
+            return f.read()
+
+    def size(self, key):
+        raise NotImplementedError
+
+    def exists(self, key):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+# LocalMediaStore Class
+# Keeps media on the local filesystem under `root`, sharded two directory
+# levels deep by the first four hex characters of the checksum so that no
+# single directory grows unbounded.
+class LocalMediaStore(MediaStore):
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.tmp_dir = os.path.join(self.root, "tmp")
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def path_for(self, key):
+        return os.path.join(self.root, *key.split("/"))
+
+    @property
+    def spool_dir(self):
+        # Same filesystem as the store, so committing a spool is a rename.
+        return self.tmp_dir
+
+    def put_path(self, path, checksum, size):
+        # Files on the same filesystem are adopted by rename; anything else is copied.
+        if os.stat(path).st_dev != os.stat(self.tmp_dir).st_dev:
+            with open(path, "rb") as f:
+                return self.put_file(f)
+        return self._commit(path, checksum, size)
+
+    def put_file(self, fileobj):
+        digest = hashlib.sha256()
+        size = 0
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                while True:
+                    chunk = fileobj.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    tmp.write(chunk)
+                    size += len(chunk)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            return self._commit(tmp_path, digest.hexdigest(), size)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def put_bytes(self, data):
+        checksum = hashlib.sha256(data).hexdigest()
+        key = self.key_for(checksum)
+        if self.exists(key):
+            return key, len(data), checksum
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            return self._commit(tmp_path, checksum, len(data))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _commit(self, tmp_path, checksum, size):
+        """DESC: Moves a fully written temp file into its content-addressed location, deduplicating identical media."""
+        key = self.key_for(checksum)
+        final_path = self.path_for(key)
+        if os.path.exists(final_path):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.replace(tmp_path, final_path)
+        return key, size, checksum
+
+    def open(self, key, start=0, length=None):
+        try:
+            f = open(self.path_for(key), "rb")
+        except FileNotFoundError:
+            raise MediaStoreError(f"Media object '{key}' not found")
+        if start:
+            f.seek(start)
+        return f
+
+    def stat(self, key):
+        try:
+            st = os.stat(self.path_for(key))
+        except FileNotFoundError:
+            raise MediaStoreError(f"Media object '{key}' not found")
+        return st.st_size, datetime.fromtimestamp(st.st_mtime, tz=timezone.utc)
+
+    def size(self, key):
+        return os.path.getsize(self.path_for(key))
+
+    def exists(self, key):
+        return os.path.exists(self.path_for(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self.path_for(key))
+        except FileNotFoundError:
+            pass
+
+# S3MediaStore Class
+# Keeps media in an S3-compatible bucket. Setting `endpoint_url` points it at
+# a self-hosted service such as MinIO instead of AWS. Requires boto3.
+class S3MediaStore(MediaStore):
+
+    def __init__(self, bucket, endpoint_url=None, access_key=None, secret_key=None, region=None, prefix="media"):
+        try:
+            import boto3
+        except ImportError:
+            raise MediaStoreError("The S3 media backend requires boto3 (pip install boto3)")
+
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+            region_name=region
+        )
+
+    def object_name(self, key):
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def put_file(self, fileobj):
+        # The object name depends on the checksum, so the upload is spooled
+        # while hashing and sent once the digest is known.
+        digest = hashlib.sha256()
+        size = 0
+        with tempfile.SpooledTemporaryFile(max_size=8 * CHUNK_SIZE) as spool:
+            while True:
+                chunk = fileobj.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                spool.write(chunk)
+                size += len(chunk)
+
+            checksum = digest.hexdigest()
+            key = self.key_for(checksum)
+            if not self.exists(key):
+                spool.seek(0)
+                self.client.upload_fileobj(spool, self.bucket, self.object_name(key))
+        return key, size, checksum
+
+    def put_path(self, path, checksum, size):
+        key = self.key_for(checksum)
+        if not self.exists(key):
+            self.client.upload_file(path, self.bucket, self.object_name(key))
+        return key, size, checksum
+
+    def put_bytes(self, data):
+        checksum = hashlib.sha256(data).hexdigest()
+        key = self.key_for(checksum)
+        if not self.exists(key):
+            self.client.put_object(Bucket=self.bucket, Key=self.object_name(key), Body=data)
+        return key, len(data), checksum
+
+    def open(self, key, start=0, length=None):
+        kwargs = {"Bucket": self.bucket, "Key": self.object_name(key)}
+        if length is not None:
+            kwargs["Range"] = f"bytes={start}-{start + length - 1}"
+        elif start:
+            kwargs["Range"] = f"bytes={start}-"
+        try:
+            return self.client.get_object(**kwargs)["Body"]
+        except self.client.exceptions.NoSuchKey:
+            raise MediaStoreError(f"Media object '{key}' not found")
+
+    def stat(self, key):
+        head = self.client.head_object(Bucket=self.bucket, Key=self.object_name(key))
+        return head["ContentLength"], head["LastModified"]
+
+    def size(self, key):
+        return self.client.head_object(Bucket=self.bucket, Key=self.object_name(key))["ContentLength"]
+
+    def exists(self, key):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.object_name(key))
+            return True
+        except Exception:
+            return False
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self.object_name(key))
+
+
+def create_media_store(config):
+    """DESC: Builds the media backend selected by MEDIA_STORAGE_BACKEND in the Flask config."""
+    backend = config.get("MEDIA_STORAGE_BACKEND", "local")
+
+    if backend == "local":
+        return LocalMediaStore(config.get("MEDIA_STORAGE_ROOT", "storage/media"))
+    if backend == "s3":
+        return S3MediaStore(
+            bucket=config["MEDIA_S3_BUCKET"],
+            endpoint_url=config.get("MEDIA_S3_ENDPOINT_URL"),
+            access_key=config.get("MEDIA_S3_ACCESS_KEY"),
+            secret_key=config.get("MEDIA_S3_SECRET_KEY"),
+            region=config.get("MEDIA_S3_REGION"),
+            prefix=config.get("MEDIA_S3_PREFIX", "media")
+        )
+    raise MediaStoreError(f"Unknown media storage backend '{backend}'")
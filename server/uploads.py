@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+
+CHUNK_SIZE = 1024 * 1024
+
+# UploadSessionError Class
+# Raised for invalid resumable upload operations. `status` is the HTTP status
+# the route should answer with.
+class UploadSessionError(Exception):
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+# UploadSessionStore Class
+# Keeps resumable upload sessions on disk. Each session is a pair of files in
+# `root`: `<upload_id>.part`, which chunks are written into at their byte
+# offsets, and `<upload_id>.json`, which records the report, the expected size
+# and the byte ranges received so far. Sessions idle for longer than `ttl`
+# seconds are removed by collect_garbage().
+class UploadSessionStore:
+
+    def __init__(self, root, ttl=86400, max_chunk_size=8 * 1024 * 1024):
+        self.root = os.path.abspath(root)
+        self.ttl = ttl
+        self.max_chunk_size = max_chunk_size
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _meta_path(self, upload_id):
+        return os.path.join(self.root, f"{upload_id}.json")
+
+    def part_path(self, upload_id):
+        return os.path.join(self.root, f"{upload_id}.part")
+
+    def _write_meta(self, session):
+        tmp_path = self._meta_path(session["upload_id"]) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(session, f)
+        os.replace(tmp_path, self._meta_path(session["upload_id"]))
+
+    def create(self, report, media_type, content_type, total_size, checksum=None):
+        """DESC: Opens a new session and preallocates its part file. Returns the session dict."""
+        upload_id = uuid.uuid4().hex
+        now = time.time()
+        session = {
+            "upload_id": upload_id,
+            "report": report,
+            "media_type": media_type,
+            "content_type": content_type,
+            "total_size": total_size,
+            "checksum": checksum,
+            "received": [],
+            "created_at": now,
+            "updated_at": now,
+        }
+        with open(self.part_path(upload_id), "wb") as f:
+            f.truncate(total_size)
+        self._write_meta(session)
+        return session
+
+    def get(self, upload_id):
+        """DESC: Loads a session by ID, raising a 404 UploadSessionError if it does not exist."""
+        if not upload_id.isalnum():
+            raise UploadSessionError("Invalid upload ID", 400)
+        try:
+            with open(self._meta_path(upload_id)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise UploadSessionError(f"Upload session '{upload_id}' not found or expired", 404)
+
+    def write_chunk(self, upload_id, offset, stream, length):
+        """DESC: Writes `length` bytes from `stream` at `offset` and records the range. Returns the updated session."""
+        session = self.get(upload_id)
+
+        if length is None:
+            raise UploadSessionError("Chunk requests must declare a Content-Length", 411)
+        if length > self.max_chunk_size:
+            raise UploadSessionError(f"Chunk exceeds the maximum chunk size of {self.max_chunk_size} bytes", 413)
+        if offset < 0 or offset + length > session["total_size"]:
+            raise UploadSessionError(
+                f"Chunk [{offset}, {offset + length}) falls outside the declared size of {session['total_size']} bytes"
+            )
+
+        written = 0
+        with open(self.part_path(upload_id), "r+b") as f:
+            f.seek(offset)
+            while written < length:
+                data = stream.read(min(CHUNK_SIZE, length - written))
+                if not data:
+                    break
+                f.write(data)
+                written += len(data)
+
+        if written != length:
+            raise UploadSessionError(f"Chunk ended after {written} of {length} bytes; resend it", 400)
+
+        with self._lock:
+            session = self.get(upload_id)
+            session["received"] = merge_ranges(session["received"] + [[offset, offset + length]])
+            session["updated_at"] = time.time()
+            self._write_meta(session)
+        return session
+
+    def assemble(self, upload_id):
+        """DESC: Verifies every byte has arrived and checksums the part file.
+        Returns (session, part_path, checksum, size)."""
+        session = self.get(upload_id)
+        missing = missing_ranges(session["received"], session["total_size"])
+        if missing:
+            raise UploadSessionError(f"Upload is incomplete; missing byte ranges {missing}", 409)
+
+        digest = hashlib.sha256()
+        with open(self.part_path(upload_id), "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+        checksum = digest.hexdigest()
+
+        if session.get("checksum") and session["checksum"].lower() != checksum:
+            raise UploadSessionError("Checksum mismatch; the assembled file does not match the declared SHA-256", 422)
+
+        return session, self.part_path(upload_id), checksum, session["total_size"]
+
+    def mark_stored(self, upload_id, stored):
+        """DESC: Records that the assembled file is now in the media store, so a retried finalize can skip assembly."""
+        with self._lock:
+            session = self.get(upload_id)
+            session["stored"] = list(stored)
+            session["updated_at"] = time.time()
+            self._write_meta(session)
+        return session
+
+    def discard(self, upload_id):
+        for path in (self._meta_path(upload_id), self.part_path(upload_id)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def collect_garbage(self):
+        """DESC: Removes sessions that have not received a chunk within the TTL. Returns the number removed."""
+        cutoff = time.time() - self.ttl
+        removed = 0
+        for name in os.listdir(self.root):
+            if not name.endswith(".json"):
+                continue
+            upload_id = name[:-len(".json")]
+            try:
+                if self.get(upload_id)["updated_at"] < cutoff:
+                    self.discard(upload_id)
+                    removed += 1
+            except (UploadSessionError, ValueError):
+                continue
+
+        # Part files whose metadata is already gone.
+        for name in os.listdir(self.root):
+            if name.endswith(".part") and not os.path.exists(self._meta_path(name[:-len(".part")])):
+                path = os.path.join(self.root, name)
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+        return removed
+
+
+def merge_ranges(ranges):
+    """DESC: Merges overlapping or touching [start, end) ranges into a sorted list."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+def missing_ranges(received, total_size):
+    """DESC: Returns the [start, end) ranges of a `total_size` file not covered by `received`."""
+    missing, position = [], 0
+    for start, end in received:
+        if start > position:
+            missing.append([position, start])
+        position = max(position, end)
+    if position < total_size:
+        missing.append([position, total_size])
+    return missing
@@ -0,0 +1,315 @@
+import os
+import socket
+import threading
+import time
+from collections import deque
+
+import pymysql.cursors
+
+pms_DictCursor = pymysql.cursors.DictCursor
+
+# SET clauses that put a report back on the claim queue; any write that resets PR_verified to 0 adds them.
+VERIFICATION_REQUEUE_FIELDS = (
+    "PR_claim_status = 'queued'", "PR_claim_owner = NULL", "PR_lease_expires_at = NULL", "PR_claim_attempts = 0"
+)
+
+def claim_owner_id():
+    """DESC: Identifies the calling worker thread across hosts and processes, e.g. `web-1:4711:VerificationWorker-2`."""
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"[:128]
+
+# VerificationClaims Class
+# A claim-based work queue over `preverified_reports`. Workers claim unverified
+# rows with a conditional UPDATE that only succeeds while a row is still
+# `queued`, so concurrent workers in any number of processes or machines never
+# pick up the same report. A claimed row is marked `processing` with its owner
+# and a lease expiry; if the owner dies, requeue_expired() hands the row back
+# once the lease runs out. All lease times use the database clock so workers
+# on different machines agree. Claims rely on plain SELECT and UPDATE only, so
+# they run on MariaDB 10.4, which the shipped schema targets.
+# Every claim counts as an attempt. A report whose media is missing or cannot
+# be decoded is marked `failed` at once with fail(), and one whose lease has
+# expired `max_attempts` times is marked `failed` instead of being requeued,
+# so a report that can never be verified stops costing claims. Reports of a
+# batch that failed as a whole are handed back at once with release(), which
+# does not count the claim.
+
+class VerificationClaims:
+
+    def __init__(self, pool, lease_seconds=120, requeue_interval=30, max_attempts=3):
+        self._pool = pool
+        self.lease_seconds = lease_seconds
+        self.requeue_interval = requeue_interval
+        self.max_attempts = max_attempts
+
+        self._lock = threading.Lock()
+        self._last_requeue = 0.0
+
+        self._claimed = 0
+        self._completed = 0
+        self._requeued = 0
+        self._lost = 0
+        self._failed = 0
+
+    def claim(self, owner, limit, attempts=3):
+        """
+        DESC: Claims up to `limit` queued reports for `owner`, oldest first. Returns the claimed rows, each with the
+        MS_checksum of its media (None for media stored before checksums were recorded).
+
+        Queued ids are read without locking and then claimed with an UPDATE that skips any row another worker
+        claimed in between; the rows read back are those this call won. When it loses every row to other
+        workers, it tries the next queued ids, up to `attempts` times.
+        """
+        conn, cursor = None, None
+        try:
+            conn = self._pool.connect()
+            cursor = conn.cursor(pms_DictCursor)
+
+            rows = []
+            for _ in range(attempts):
+                cursor.execute("""
+                    SELECT PR_report_id FROM preverified_reports
+                    WHERE PR_verified = 0 AND PR_claim_status = 'queued'
+                    ORDER BY PR_report_id ASC
+                    LIMIT %s
+                """, (limit,))
+                candidate_ids = [row["PR_report_id"] for row in cursor.fetchall()]
+                if not candidate_ids:
+                    break
+
+                placeholders = ", ".join(["%s"] * len(candidate_ids))
+                cursor.execute(f"""
+                    UPDATE preverified_reports
+                    SET PR_claim_status = 'processing',
+                        PR_claim_owner = %s,
+                        PR_lease_expires_at = NOW() + INTERVAL %s SECOND,
+                        PR_claim_attempts = PR_claim_attempts + 1
+                    WHERE PR_report_id IN ({placeholders})
+                      AND PR_verified = 0 AND PR_claim_status = 'queued'
+                """, (owner, self.lease_seconds, *candidate_ids))
+                if cursor.rowcount == 0:
+                    conn.commit()
+                    continue
+
+                # Only candidates can match, so earlier claims this owner still holds are never returned twice.
+                # The media's SHA-256, recorded by the media store, comes along so workers need not hash the bytes.
+                cursor.execute(f"""
+                    SELECT pr.*, ms.MS_checksum FROM preverified_reports pr
+                    LEFT JOIN media_storage ms ON ms.MS_media_id = COALESCE(pr.PR_video, pr.PR_image)
+                    WHERE pr.PR_report_id IN ({placeholders})
+                      AND pr.PR_claim_status = 'processing' AND pr.PR_claim_owner = %s
+                    ORDER BY pr.PR_report_id ASC
+                """, (*candidate_ids, owner))
+                rows = cursor.fetchall()
+                break
+
+            conn.commit()
+            with self._lock:
+                self._claimed += len(rows)
+            return rows
+        except Exception:
+            if conn: conn.rollback()
+            raise
+        finally:
+            if cursor: cursor.close()
+            if conn: conn.close()
+
+    def finish(self, cursor, report_id, owner, report_status):
+        """
+        DESC: Marks a claimed report as verified on an open cursor, without committing. Returns False, and changes
+        nothing, if `owner` no longer holds the claim (its lease expired and the report was requeued).
+        """
+        cursor.execute("""
+            UPDATE preverified_reports
+            SET PR_verified = 1,
+                PR_report_status = %s,
+                PR_claim_status = 'done',
+                PR_claim_owner = NULL,
+                PR_lease_expires_at = NULL
+            WHERE PR_report_id = %s AND PR_verified = 0
+              AND PR_claim_status = 'processing' AND PR_claim_owner = %s
+        """, (report_status, report_id, owner))
+
+        finished = cursor.rowcount == 1
+        with self._lock:
+            if finished:
+                self._completed += 1
+            else:
+                self._lost += 1
+        return finished
+
+    def fail(self, report_id, owner, reason):
+        """DESC: Marks a claimed report as failed so it is not claimed again. Returns False if `owner` no longer holds the claim."""
+        conn, cursor = None, None
+        try:
+            conn = self._pool.connect()
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE preverified_reports
+                SET PR_claim_status = 'failed', PR_claim_owner = NULL, PR_lease_expires_at = NULL
+                WHERE PR_report_id = %s AND PR_verified = 0
+                  AND PR_claim_status = 'processing' AND PR_claim_owner = %s
+            """, (report_id, owner))
+            failed = cursor.rowcount == 1
+            conn.commit()
+        finally:
+            if cursor: cursor.close()
+            if conn: conn.close()
+
+        if failed:
+            print(f"[VERIFY] Report {report_id} failed verification: {reason}")
+            with self._lock:
+                self._failed += 1
+        return failed
+
+    def release(self, report_ids, owner, reason):
+        """
+        DESC: Hands claimed reports back to the queue after a failure that was not theirs, such as a failed
+        inference batch, without counting the claim as an attempt. Returns how many `owner` still held.
+        """
+        if not report_ids:
+            return 0
+        conn, cursor = None, None
+        try:
+            conn = self._pool.connect()
+            cursor = conn.cursor()
+            placeholders = ", ".join(["%s"] * len(report_ids))
+            cursor.execute(f"""
+                UPDATE preverified_reports
+                SET PR_claim_status = 'queued', PR_claim_owner = NULL, PR_lease_expires_at = NULL,
+                    PR_claim_attempts = GREATEST(PR_claim_attempts - 1, 0)
+                WHERE PR_report_id IN ({placeholders}) AND PR_verified = 0
+                  AND PR_claim_status = 'processing' AND PR_claim_owner = %s
+            """, (*report_ids, owner))
+            released = cursor.rowcount
+            conn.commit()
+        finally:
+            if cursor: cursor.close()
+            if conn: conn.close()
+
+        if released:
+            print(f"[VERIFY] Requeued report(s) {', '.join(str(report_id) for report_id in report_ids)}: {reason}")
+        with self._lock:
+            self._requeued += released
+        return released
+
+    def requeue_expired(self, force=False):
+        """
+        DESC: Returns reports whose lease has expired to the queue, or marks them failed once they have been claimed
+        max_attempts times. Runs at most once per requeue_interval unless forced.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_requeue < self.requeue_interval:
+                return 0
+            self._last_requeue = now
+
+        conn, cursor = None, None
+        try:
+            conn = self._pool.connect()
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE preverified_reports
+                SET PR_claim_status = 'failed', PR_claim_owner = NULL, PR_lease_expires_at = NULL
+                WHERE PR_verified = 0 AND PR_claim_status = 'processing' AND PR_lease_expires_at < NOW()
+                  AND PR_claim_attempts >= %s
+            """, (self.max_attempts,))
+            failed = cursor.rowcount
+            cursor.execute("""
+                UPDATE preverified_reports
+                SET PR_claim_status = 'queued', PR_claim_owner = NULL, PR_lease_expires_at = NULL
+                WHERE PR_verified = 0 AND PR_claim_status = 'processing' AND PR_lease_expires_at < NOW()
+            """)
+            requeued = cursor.rowcount
+            conn.commit()
+        finally:
+            if cursor: cursor.close()
+            if conn: conn.close()
+
+        if requeued:
+            print(f"[VERIFY] Requeued {requeued} report(s) with expired leases.")
+        if failed:
+            print(f"[VERIFY] Gave up on {failed} report(s) after {self.max_attempts} expired leases.")
+        with self._lock:
+            self._requeued += requeued
+            self._failed += failed
+        return requeued
+
+    def stats(self):
+        with self._lock:
+            return {
+                "lease_seconds": self.lease_seconds,
+                "max_attempts": self.max_attempts,
+                "claimed": self._claimed,
+                "completed": self._completed,
+                "requeued": self._requeued,
+                "lost_leases": self._lost,
+                "failed": self._failed,
+            }
+
+# VerificationWakeup Class
+# Lets upload handlers wake idle verification workers in the same process the
+# moment new reports are committed. Every notify() bumps a sequence number; a
+# worker reads the sequence before it looks for work and passes it to wait(),
+# which returns at once if anything was signalled in between, so a wakeup can
+# never be lost. Workers in other processes do not see these signals and fall
+# back to polling the claim query with an idle backoff.
+class VerificationWakeup:
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._sequence = 0
+        self._signals = 0
+
+    @property
+    def sequence(self):
+        with self._cond:
+            return self._sequence
+
+    def notify(self):
+        with self._cond:
+            self._sequence += 1
+            self._signals += 1
+            self._cond.notify_all()
+
+    def wait(self, since, timeout):
+        """DESC: Blocks until notify() is called after sequence `since`, or `timeout` seconds pass. Returns True if woken."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._sequence != since, timeout)
+
+    def stats(self):
+        with self._cond:
+            return {"signals": self._signals}
+
+# LatencyTracker Class
+# Keeps the last `window` samples of a latency, in seconds, and summarizes
+# them as percentiles in milliseconds.
+class LatencyTracker:
+
+    def __init__(self, window=1000):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._count = 0
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+            self._count += 1
+
+    def stats(self):
+        with self._lock:
+            samples = sorted(self._samples)
+            count = self._count
+        if not samples:
+            return {"count": count}
+
+        def percentile(p):
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))] * 1000, 1)
+
+        return {
+            "count": count,
+            "avg_ms": round(sum(samples) * 1000 / len(samples), 1),
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(samples[-1] * 1000, 1),
+        }